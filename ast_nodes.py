@@ -0,0 +1,242 @@
+# AST node definitions for the mini-language
+# The parser builds these nodes directly, so later stages (SSA, SMT) can walk
+# structure instead of re-scanning source strings.
+
+# Operator groups
+ARITH_OPS = ('+', '-', '*', '/')
+COMPARE_OPS = ('<', '>', '<=', '>=', '==', '!=')
+LOGIC_OPS = ('&&', '||')
+
+# Binding strength used when printing expressions back to source form
+PRECEDENCE = {
+    '||': 1,
+    '&&': 2,
+    '<': 3, '>': 3, '<=': 3, '>=': 3, '==': 3, '!=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5,
+}
+UNARY_PRECEDENCE = 6
+
+
+class Node:
+    """Base class for all AST nodes. Stores the source position of the node."""
+    __slots__ = ('lineno', 'col')
+    _fields = ()
+
+    def __init__(self, lineno=0, col=0):
+        self.lineno = lineno
+        self.col = col
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({args})"
+
+
+# Expression nodes
+
+class Expr(Node):
+    __slots__ = ()
+
+    # Whether the expression produces a truth value rather than an integer
+    is_boolean = False
+
+    def __str__(self):
+        return format_expr(self)
+
+
+class Num(Expr):
+    __slots__ = ('value',)
+    _fields = ('value',)
+
+    def __init__(self, value, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.value = value
+
+
+class Var(Expr):
+    __slots__ = ('name',)
+    _fields = ('name',)
+
+    def __init__(self, name, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.name = name
+
+
+class UnaryOp(Expr):
+    __slots__ = ('op', 'operand')
+    _fields = ('op', 'operand')
+
+    def __init__(self, op, operand, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.op = op
+        self.operand = operand
+
+    @property
+    def is_boolean(self):
+        return self.op == '!'
+
+
+class BinOp(Expr):
+    __slots__ = ('op', 'left', 'right')
+    _fields = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.op = op
+        self.left = left
+        self.right = right
+
+    @property
+    def is_boolean(self):
+        return self.op in COMPARE_OPS or self.op in LOGIC_OPS
+
+
+# Statement nodes
+
+class Stmt(Node):
+    __slots__ = ()
+
+
+class Assign(Stmt):
+    __slots__ = ('var', 'expr')
+    _fields = ('var', 'expr')
+
+    def __init__(self, var, expr, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.var = var
+        self.expr = expr
+
+
+class If(Stmt):
+    __slots__ = ('condition', 'body', 'orelse')
+    _fields = ('condition', 'body', 'orelse')
+
+    def __init__(self, condition, body, orelse=None, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.condition = condition
+        self.body = body
+        self.orelse = orelse  # None when there is no else branch
+
+
+class While(Stmt):
+    __slots__ = ('condition', 'body')
+    _fields = ('condition', 'body')
+
+    def __init__(self, condition, body, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.condition = condition
+        self.body = body
+
+
+class For(Stmt):
+    __slots__ = ('init', 'condition', 'update', 'body')
+    _fields = ('init', 'condition', 'update', 'body')
+
+    def __init__(self, init, condition, update, body, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.init = init      # Assign or None
+        self.condition = condition
+        self.update = update  # Assign or None
+        self.body = body
+
+
+class Assert(Stmt):
+    __slots__ = ('condition',)
+    _fields = ('condition',)
+
+    def __init__(self, condition, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.condition = condition
+
+
+class Invariant(Stmt):
+    """
+    Loop invariant annotation. Inside a loop body it states a property of
+    the loop state at the head of every iteration (and at exit); elsewhere
+    it is checked like an assertion.
+    """
+    __slots__ = ('condition',)
+    _fields = ('condition',)
+
+    def __init__(self, condition, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.condition = condition
+
+
+def apply_op(op, left, right=None):
+    """
+    Apply an operator to integer operands with the semantics of the SMT
+    encoding: truth values are 1/0, any non-zero integer is true, and
+    division is Euclidean (the remainder is never negative).
+
+    Args:
+        op (str): Binary operator, or '!'/'-' with right None for the unary ones
+        left (int): First (or only) operand
+        right (int): Second operand
+
+    Returns:
+        int: The result, or None for a division by zero (unspecified in the
+            SMT encoding)
+    """
+    if right is None:
+        return int(not left) if op == '!' else -left
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        if right == 0:
+            return None
+        return (left - left % abs(right)) // right
+    if op == '<':
+        return int(left < right)
+    if op == '>':
+        return int(left > right)
+    if op == '<=':
+        return int(left <= right)
+    if op == '>=':
+        return int(left >= right)
+    if op == '==':
+        return int(left == right)
+    if op == '!=':
+        return int(left != right)
+    if op == '&&':
+        return int(bool(left) and bool(right))
+    if op == '||':
+        return int(bool(left) or bool(right))
+    raise ValueError(f"Unknown operator: {op}")
+
+
+def format_expr(expr, leaf=None, parent_prec=0, right_side=False):
+    """
+    Render an expression back to source text, adding parentheses only where
+    operator precedence requires them.
+
+    Args:
+        expr (Expr): The expression to render
+        leaf (callable): Optional function returning the text for a variable
+            (or other non-constant leaf) node; defaults to the variable name
+        parent_prec (int): Precedence of the enclosing operator
+        right_side (bool): Whether expr is the right operand of the enclosing operator
+
+    Returns:
+        str: Source form of the expression
+    """
+    if isinstance(expr, Num):
+        return str(expr.value)
+    if isinstance(expr, UnaryOp):
+        operand = format_expr(expr.operand, leaf, UNARY_PRECEDENCE)
+        return f"{expr.op}{operand}"
+    if isinstance(expr, BinOp):
+        prec = PRECEDENCE[expr.op]
+        left = format_expr(expr.left, leaf, prec)
+        right = format_expr(expr.right, leaf, prec, True)
+        text = f"{left} {expr.op} {right}"
+        if prec < parent_prec or (right_side and prec == parent_prec):
+            return f"({text})"
+        return text
+    if leaf is not None:
+        return leaf(expr)
+    return expr.name
@@ -0,0 +1,298 @@
+# Headless batch verification
+# Verifies every program in a set of directories and/or manifest files in a
+# pool of worker processes and streams one JSON object per program, e.g.
+#
+#   python batch.py examples/verification/ --workers 4 --output results.jsonl
+#
+# or checks program pairs for equivalence, either the pairN_prog1/pairN_prog2
+# files of a directory or candidates against one reference program:
+#
+#   python batch.py --pairs examples/equivalence/
+#   python batch.py --reference ref.txt candidates/ --outputs y
+#
+# Each worker process builds its own SMTGenerator, so every worker has a
+# separate Z3 context.
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Generator of the current worker process, created by init_worker
+_generator = None
+
+def init_worker(cache_path, timeout=None, rlimit=None, portfolio=None, encoding=(None, False)):
+    """
+    Create the worker's SMTGenerator (and cache connection, if any). With
+    portfolio set, hard checks race that many solver configurations in
+    processes of their own. encoding is the (width, check_overflow) of the
+    integer encoding (see SMTGenerator.set_encoding).
+    """
+    global _generator
+    from smt import SMTGenerator
+    from strategy import default_tiers
+    cache = None
+    if cache_path:
+        from cache import VerificationCache
+        cache = VerificationCache(cache_path)
+    strategy = default_tiers
+    if portfolio:
+        from portfolio import portfolio_strategy
+        strategy = portfolio_strategy(portfolio)
+    _generator = SMTGenerator(cache=cache, timeout=timeout, rlimit=rlimit, strategy=strategy)
+    _generator.set_encoding(*encoding)
+
+def verify_file(path, unroll_depth, include_model, mode="verify"):
+    """
+    Verify one program file in a worker process. Mode "bmc" searches for an
+    assertion failure by bounded model checking up to unroll_depth instead,
+    and mode "prove" proves the assertions by k-induction with k up to
+    unroll_depth.
+
+    Returns:
+        dict: JSON-serializable result record for the file
+    """
+    from pipeline import verify_source, bmc_source, prove_source
+    start = time.perf_counter()
+    try:
+        with open(path) as f:
+            program_text = f.read()
+    except OSError as e:
+        return {"path": path, "result": "error", "stage": "read", "error": str(e), "timings": {}}
+
+    if mode == "bmc":
+        record = bmc_source(program_text, unroll_depth, _generator)
+    elif mode == "prove":
+        record = prove_source(program_text, unroll_depth, _generator)
+    else:
+        record = verify_source(program_text, unroll_depth, _generator)
+        if not include_model:
+            del record["model"]
+    record["timings"]["total"] = time.perf_counter() - start
+    return dict(path=path, unroll_depth=unroll_depth, **record)
+
+def check_group(reference_path, reference_text, candidates, output_vars, unroll_depth):
+    """
+    Check candidates against one reference program in a worker process,
+    encoding the reference once.
+
+    Args:
+        candidates (list): (pair name, path, source) of every candidate
+
+    Returns:
+        list: JSON-serializable result records, one per candidate
+    """
+    from pipeline import check_candidates
+    records = check_candidates(reference_text, [text for _, _, text in candidates],
+                               output_vars, unroll_depth, _generator)
+    return [dict(pair=name, reference=reference_path, candidate=path, unroll_depth=unroll_depth, **record)
+            for (name, path, _), record in zip(candidates, records)]
+
+# Equivalence example files, e.g. "pair3_prog1.txt"
+PAIR_FILE = re.compile(r"^(?P<name>.+)_prog(?P<side>[12])\.txt$")
+
+def discover_pairs(directory):
+    """
+    Return (name, prog1 path, prog2 path) for every pair of programs named
+    <name>_prog1.txt / <name>_prog2.txt in a directory, ordered by name
+    (numbers compared numerically, so pair10 follows pair9).
+    """
+    sides = {}
+    for file_name in os.listdir(directory):
+        match = PAIR_FILE.match(file_name)
+        if match:
+            sides.setdefault(match.group("name"), {})[match.group("side")] = os.path.join(directory, file_name)
+
+    def natural_key(name):
+        return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+    return [(name, files["1"], files["2"]) for name, files in sorted(sides.items(), key=lambda item: natural_key(item[0]))
+            if "1" in files and "2" in files]
+
+def group_pairs(pairs, chunk_size):
+    """
+    Group (name, reference path, candidate path) pairs by reference source,
+    so that each group encodes its reference only once; large groups are
+    split into chunks of chunk_size candidates to spread them over workers.
+
+    Returns:
+        list: (reference path, reference source, [(name, candidate path, candidate source)])
+    """
+    groups = {}
+    for name, reference_path, candidate_path in pairs:
+        with open(reference_path) as f:
+            reference_text = f.read()
+        with open(candidate_path) as f:
+            candidate_text = f.read()
+        group = groups.setdefault(reference_text, (reference_path, []))
+        group[1].append((name, candidate_path, candidate_text))
+
+    jobs = []
+    for reference_text, (reference_path, candidates) in groups.items():
+        for start in range(0, len(candidates), chunk_size):
+            jobs.append((reference_path, reference_text, candidates[start:start + chunk_size]))
+    return jobs
+
+def read_manifest(manifest_path):
+    """
+    Return the program paths listed in a manifest file, one per line.
+    Blank lines and lines starting with '#' are ignored; relative paths are
+    taken relative to the manifest's directory.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    paths = []
+    with open(manifest_path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(os.path.normpath(os.path.join(base_dir, line)))
+    return paths
+
+def collect_programs(inputs, manifests, extension=".txt"):
+    """
+    Expand directories into the program files they contain (recursively,
+    sorted by path) and append the entries of the manifest files.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(extension))
+        else:
+            paths.append(item)
+    for manifest in manifests:
+        paths.extend(read_manifest(manifest))
+    return paths
+
+def run_jobs(jobs, output, workers=None, cache_path=None, limits=(None, None), portfolio=None,
+             encoding=(None, False)):
+    """
+    Run (function, args) jobs in a process pool, writing the records they
+    return to output as JSON lines as soon as they are available (so in
+    completion order). A job returns a single record or a list of records.
+    limits is the (timeout, rlimit) of every solver check; portfolio is the
+    number of configurations raced by each check, if any; encoding is the
+    (width, check_overflow) integer encoding of the workers.
+
+    Returns:
+        dict: Number of records per result
+    """
+    counts = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(cache_path,) + tuple(limits) + (portfolio, encoding)) as executor:
+        futures = [executor.submit(function, *args) for function, args in jobs]
+        for future in as_completed(futures):
+            records = future.result()
+            if isinstance(records, dict):
+                records = [records]
+            for record in records:
+                counts[record["result"]] = counts.get(record["result"], 0) + 1
+                output.write(json.dumps(record) + "\n")
+            output.flush()
+    return counts
+
+def run_batch(paths, output, workers=None, unroll_depth=3, cache_path=None, include_model=False,
+              limits=(None, None), portfolio=None, mode="verify", encoding=(None, False)):
+    """
+    Verify programs in a process pool, streaming one JSON line per program.
+
+    Returns:
+        dict: Number of results per verdict
+    """
+    jobs = [(verify_file, (path, unroll_depth, include_model, mode)) for path in paths]
+    return run_jobs(jobs, output, workers, cache_path, limits, portfolio, encoding)
+
+def run_equivalence_batch(pairs, output, workers=None, unroll_depth=3, cache_path=None,
+                          output_vars=None, chunk_size=50, limits=(None, None), portfolio=None,
+                          encoding=(None, False)):
+    """
+    Check (name, reference path, candidate path) pairs for equivalence in a
+    process pool, streaming one JSON line per pair.
+
+    Returns:
+        dict: Number of results per verdict
+    """
+    jobs = [(check_group, (reference_path, reference_text, candidates, output_vars, unroll_depth))
+            for reference_path, reference_text, candidates in group_pairs(pairs, chunk_size)]
+    return run_jobs(jobs, output, workers, cache_path, limits, portfolio, encoding)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Verify many programs and report JSON-lines results")
+    arg_parser.add_argument("inputs", nargs="*", help="program files or directories of programs")
+    arg_parser.add_argument("--manifest", action="append", default=[],
+                            help="file listing program paths, one per line (may be repeated)")
+    arg_parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    arg_parser.add_argument("--unroll-depth", type=int, default=3, help="number of times to unroll loops")
+    arg_parser.add_argument("--output", help="write results to this file instead of stdout")
+    arg_parser.add_argument("--cache", help="path of a verification cache database to use")
+    arg_parser.add_argument("--timeout", type=int, default=None,
+                            help="time limit of each solver check in milliseconds")
+    arg_parser.add_argument("--rlimit", type=int, default=None, help="Z3 resource limit of each solver check")
+    arg_parser.add_argument("--portfolio", type=int, default=None, metavar="N",
+                            help="race N solver configurations in separate processes on checks the cheap "
+                                 "tier cannot answer (best combined with a small --workers)")
+    arg_parser.add_argument("--bits", type=int, default=None, metavar="WIDTH",
+                            help="encode integers as WIDTH-bit machine integers (e.g. 32 or 64) that wrap "
+                                 "around, instead of unbounded integers; '/' keeps the Euclidean division of "
+                                 "unbounded integers (the remainder is never negative), not C's truncating "
+                                 "division")
+    arg_parser.add_argument("--overflow-checks", action="store_true",
+                            help="with --bits, fail every operation that overflows, like an assertion")
+    modes = arg_parser.add_mutually_exclusive_group()
+    modes.add_argument("--bmc", dest="mode", action="store_const", const="bmc", default="verify",
+                       help="search for assertion failures by bounded model checking, deepening the "
+                            "unrolling one iteration at a time up to --unroll-depth")
+    modes.add_argument("--prove", dest="mode", action="store_const", const="prove",
+                       help="prove that no assertion can fail for any number of loop iterations, by "
+                            "k-induction with k up to --unroll-depth")
+    arg_parser.add_argument("--models", action="store_true", help="include the model of satisfiable programs")
+    arg_parser.add_argument("--pairs", action="append", default=[],
+                            help="check the <name>_prog1/<name>_prog2 pairs of a directory for equivalence")
+    arg_parser.add_argument("--reference", help="check the input programs for equivalence with this program")
+    arg_parser.add_argument("--outputs", help="comma-separated output variables compared for equivalence "
+                                              "(default: the variables both programs assign)")
+    arg_parser.add_argument("--chunk-size", type=int, default=50,
+                            help="candidates checked per job against one encoding of their reference")
+    args = arg_parser.parse_args()
+
+    pairs = []
+    for directory in args.pairs:
+        pairs.extend(discover_pairs(directory))
+    paths = collect_programs(args.inputs, args.manifest)
+    if args.reference:
+        pairs.extend((os.path.basename(path), args.reference, path) for path in paths)
+        paths = []
+    if not paths and not pairs:
+        arg_parser.error("no programs to check")
+    output_vars = [v.strip() for v in args.outputs.split(",")] if args.outputs else None
+    limits = (args.timeout, args.rlimit)
+    if args.overflow_checks and not args.bits:
+        arg_parser.error("--overflow-checks requires --bits")
+    encoding = (args.bits, args.overflow_checks)
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    counts = {}
+    try:
+        if paths:
+            counts = run_batch(paths, output, args.workers, args.unroll_depth, args.cache, args.models, limits,
+                               args.portfolio, args.mode, encoding)
+        if pairs:
+            for result, count in run_equivalence_batch(pairs, output, args.workers, args.unroll_depth, args.cache,
+                                                       output_vars, args.chunk_size, limits,
+                                                       args.portfolio, encoding).items():
+                counts[result] = counts.get(result, 0) + count
+    finally:
+        if args.output:
+            output.close()
+
+    summary = ", ".join(f"{result}: {count}" for result, count in sorted(counts.items()))
+    print(f"Checked {len(paths) + len(pairs)} programs and pairs in {time.perf_counter() - start:.2f}s ({summary})",
+          file=sys.stderr)
+    return 1 if "error" in counts else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Import-time benchmark for the parser front end
+# Measures cold-start cost of "from parser import parse_program" and of the
+# first parse (which loads the cached LALR tables from parsetab.py) in fresh
+# interpreter processes, the way worker processes pay for them.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Code executed in each fresh interpreter; prints the two timings in seconds
+PROBE = """
+import time
+t0 = time.perf_counter()
+from parser import parse_program
+t1 = time.perf_counter()
+parse_program("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);")
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+def run_probe(repo_dir):
+    """
+    Run the probe in a new interpreter and return (import_time, first_parse_time).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=repo_dir, capture_output=True, text=True, check=True,
+    )
+    lines = result.stdout.strip().splitlines()
+    if len(lines) != 1:
+        # Anything besides the timing line means importing had side effects
+        raise RuntimeError(f"Import produced output on stdout:\n{result.stdout}")
+    import_time, parse_time = (float(v) for v in lines[0].split())
+    return import_time, parse_time
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark cold-start import of parser.py")
+    arg_parser.add_argument("--runs", type=int, default=20, help="number of fresh processes to start")
+    args = arg_parser.parse_args()
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Warm-up run makes sure parsetab.py exists before timing
+    run_probe(repo_dir)
+
+    import_times = []
+    parse_times = []
+    for _ in range(args.runs):
+        import_time, parse_time = run_probe(repo_dir)
+        import_times.append(import_time * 1000)
+        parse_times.append(parse_time * 1000)
+
+    print(f"Runs: {args.runs}")
+    print(f"from parser import parse_program: median {statistics.median(import_times):.2f} ms, "
+          f"min {min(import_times):.2f} ms")
+    print(f"first parse_program call (table load): median {statistics.median(parse_times):.2f} ms, "
+          f"min {min(parse_times):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# Scaling benchmark for the parse -> SSA -> SMT pipeline
+# Generates synthetic programs of controllable size and measures each
+# pipeline stage: time (best of several runs, as timeit does) and peak memory
+# of Python objects (tracemalloc; Z3's own memory is not traced). Sweeping one
+# size parameter gives a scaling curve. Results can be written as JSON and
+# compared against an earlier run, so CI can fail on regressions.
+import argparse
+import gc
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+
+STAGES = ["parse_program", "convert_to_ssa", "generate_constraints", "check", "check_equivalence"]
+PARAMETERS = ["statements", "variables", "depth", "loops", "unroll"]
+
+# Stages faster than this (in ms) are too noisy to count as regressions
+NOISE_MS = 1.0
+# Growth of a scaling exponent counted as a regression: it does not depend on
+# the machine, but small sweeps still move it by a few tenths between runs
+EXPONENT_SLACK = 0.5
+
+
+def generate_program(statements=20, variables=4, depth=1, loops=1, seed=0, commuted=False):
+    """
+    Generate a synthetic program.
+
+    The statements (linear assignments and satisfiable assertions) are split
+    into loops + 1 groups: the first loops groups become the bodies of while
+    loops bounded by an input, and every group is nested in up to depth
+    levels of if/else. The same arguments always give the same program.
+
+    Args:
+        statements (int): Number of assignments and assertions
+        variables (int): Number of program variables (v0, v1, ...)
+        depth (int): Nesting depth of if/else blocks
+        loops (int): Number of while loops
+        seed (int): Random seed
+        commuted (bool): Write every commutative operation the other way
+            round, giving an equivalent program with different SSA
+
+    Returns:
+        str: Program source
+    """
+    rng = random.Random(seed)
+    names = [f"v{index}" for index in range(variables)]
+
+    def add(left, right):
+        return f"{right} + {left}" if commuted else f"{left} + {right}"
+
+    def simple():
+        target, left, right = rng.choice(names), rng.choice(names), rng.choice(names)
+        constant = rng.randint(1, 9)
+        kind = rng.random()
+        if kind < 0.15:
+            return f"assert({target} != {add(left, str(constant))});"
+        if kind < 0.5:
+            return f"{target} := {add(left, right)};"
+        if kind < 0.75:
+            return f"{target} := {left} - {constant};"
+        scaled = f"{right} * {constant}" if commuted else f"{constant} * {right}"
+        return f"{target} := {add(scaled, left)};"
+
+    def condition():
+        left, right = rng.choice(names), rng.choice(names)
+        constant = rng.randint(-5, 5)
+        return f"{add(right, str(constant))} > {left}" if commuted else f"{left} < {add(right, str(constant))}"
+
+    def nest(group, levels):
+        if levels == 0 or len(group) < 2:
+            return " ".join(group)
+        cond = condition()
+        half = len(group) // 2
+        return (f"if ({cond}) {{ {nest(group[:half], levels - 1)} }} "
+                f"else {{ {nest(group[half:], levels - 1)} }}")
+
+    body = [simple() for _ in range(statements)]
+    size = max(1, math.ceil(len(body) / (loops + 1)))
+    groups = [body[start:start + size] for start in range(0, len(body), size)]
+    groups += [[] for _ in range(loops + 1 - len(groups))]
+    lines = []
+    for index, group in enumerate(groups):
+        code = nest(group, depth)
+        if index < loops:
+            counter = f"k{index}"
+            lines.append(f"{counter} := 0;")
+            lines.append(f"while ({counter} < {names[index % variables]}) {{ {counter} := {counter} + 1; {code} }}")
+        elif code:
+            lines.append(code)
+    return "\n".join(lines)
+
+
+def stage_runs(program_text, variant_text, unroll_depth):
+    """
+    Return (stage, setup, run) for every stage: setup prepares the stage's
+    inputs (untimed) and run performs the stage on them.
+    """
+    statements = parse_program(program_text)
+
+    def converted(text=None):
+        return SSAConverter().convert_to_ssa(parse_program(text) if text else statements, unroll_depth)
+
+    def encoded():
+        generator = SMTGenerator()
+        program = converted()
+        generator.add_constraints(generator.generate_constraints(program))
+        return generator
+
+    def equivalence_inputs():
+        generator = SMTGenerator()
+        return generator, converted(), converted(variant_text)
+
+    def check_equivalence(inputs):
+        generator, program, variant = inputs
+        outputs = [name for name in program.var_names if not name.startswith("k")]
+        generator.check_equivalence(program, variant, outputs)
+
+    return [
+        ("parse_program", lambda: program_text, parse_program),
+        ("convert_to_ssa", lambda: statements,
+         lambda parsed: SSAConverter().convert_to_ssa(parsed, unroll_depth)),
+        ("generate_constraints", lambda: (SMTGenerator(), converted()),
+         lambda inputs: inputs[0].generate_constraints(inputs[1])),
+        ("check", encoded, lambda generator: generator.run_check()),
+        ("check_equivalence", equivalence_inputs, check_equivalence),
+    ]
+
+
+def measure(setup, run, repeat):
+    """
+    Return (best time in ms, peak traced memory in KiB) of a stage. The
+    memory is measured in a separate run, since tracing slows it down; an
+    untimed first run pays for one-off costs (Z3 start-up, import caches).
+    """
+    run(setup())
+    times = []
+    for _ in range(repeat):
+        inputs = setup()
+        # As timeit does: garbage collection would make times depend on what ran before
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(inputs)
+            times.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+    inputs = setup()
+    tracemalloc.start()
+    try:
+        run(inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1024
+
+
+def calibrate(repeat=5):
+    """
+    Return the best time in ms of a fixed pure-Python workload. Comparing
+    stage times relative to it cancels out the speed of the machine (or of a
+    busy CI runner) between a run and its baseline.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table = {}
+        for number in range(200000):
+            table[number % 1000] = table.get(number % 1000, 0) + number
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def run_benchmark(sweep, values, settings, repeat=5, seed=0):
+    """
+    Measure every stage for each value of the swept parameter.
+
+    Args:
+        sweep (str): Parameter to vary (one of PARAMETERS)
+        values (list): Values it takes
+        settings (dict): Values of the other parameters
+        repeat (int): Timed runs per stage (the best is reported)
+        seed (int): Random seed of the generated programs
+
+    Returns:
+        list: One point per value: {"value", "parameters", "stages":
+            {stage: {"time_ms", "peak_kib"}}}
+    """
+    points = []
+    for value in values:
+        params = dict(settings, **{sweep: value})
+        shape = {name: params[name] for name in ("statements", "variables", "depth", "loops")}
+        program_text = generate_program(seed=seed, **shape)
+        variant_text = generate_program(seed=seed, commuted=True, **shape)
+        point = {"value": value, "parameters": params, "stages": {}}
+        for stage, setup, run in stage_runs(program_text, variant_text, params["unroll"]):
+            time_ms, peak_kib = measure(setup, run, repeat)
+            point["stages"][stage] = {"time_ms": round(time_ms, 3), "peak_kib": round(peak_kib, 1)}
+        points.append(point)
+    return points
+
+
+def scaling_exponents(points):
+    """
+    Fit time ~ value ** k for every stage (least squares on a log-log scale)
+    and return stage -> k, or None when fewer than two positive values were swept.
+    """
+    exponents = {}
+    usable = [point for point in points if point["value"] > 0]
+    for stage in STAGES:
+        xs = [math.log(point["value"]) for point in usable]
+        ys = [math.log(max(point["stages"][stage]["time_ms"], 1e-6)) for point in usable]
+        if len(set(xs)) < 2:
+            exponents[stage] = None
+            continue
+        mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+        slope = (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) /
+                 sum((x - mean_x) ** 2 for x in xs))
+        exponents[stage] = round(slope, 2)
+    return exponents
+
+
+def compare(result, baseline, tolerance):
+    """
+    Compare a run against a baseline of the same sweep. Times are taken
+    relative to each run's calibration (see calibrate).
+
+    Returns:
+        list: Messages, one per stage and value that got more than tolerance
+            times slower (ignoring stages under NOISE_MS), and one per stage
+            whose scaling exponent grew by more than EXPONENT_SLACK (when both
+            runs swept the same values)
+    """
+    regressions = []
+    if baseline.get("sweep") != result["sweep"]:
+        return [f"Baseline sweeps {baseline.get('sweep')}, not {result['sweep']}"]
+    speed = baseline["calibration_ms"] / result["calibration_ms"]
+    earlier = {point["value"]: point for point in baseline["points"]}
+    for point in result["points"]:
+        old = earlier.get(point["value"])
+        if old is None:
+            continue
+        for stage, numbers in point["stages"].items():
+            if stage not in old["stages"]:
+                continue
+            before, now = old["stages"][stage]["time_ms"], numbers["time_ms"]
+            ratio = now * speed / max(before, 1e-6)
+            if now > NOISE_MS and ratio > tolerance:
+                regressions.append(f"{result['sweep']}={point['value']} {stage}: "
+                                   f"{before:.2f} ms -> {now:.2f} ms ({ratio:.1f}x on equal machines)")
+    if [point["value"] for point in baseline["points"]] == [point["value"] for point in result["points"]]:
+        for stage, exponent in result["exponents"].items():
+            before = baseline["exponents"].get(stage)
+            if exponent is not None and before is not None and exponent > before + EXPONENT_SLACK:
+                regressions.append(f"{stage} scales as {result['sweep']}^{exponent}, was ^{before}")
+    return regressions
+
+
+def print_table(result):
+    sweep = result["sweep"]
+    header = f"{sweep:>12}" + "".join(f"{stage:>22}" for stage in STAGES)
+    for title, key, unit in (("Time", "time_ms", "ms"), ("Peak memory", "peak_kib", "KiB")):
+        print(f"{title} ({unit}):")
+        print(header)
+        for point in result["points"]:
+            print(f"{point['value']:>12}" + "".join(f"{point['stages'][stage][key]:>22.2f}" for stage in STAGES))
+        print()
+    print("Scaling exponent (time ~ " + sweep + "^k):")
+    for stage, exponent in result["exponents"].items():
+        print(f"  {stage}: {'-' if exponent is None else exponent}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic programs")
+    arg_parser.add_argument("--sweep", choices=PARAMETERS, default="statements",
+                            help="parameter to vary (default: statements)")
+    arg_parser.add_argument("--values", type=int, nargs="+", default=[10, 20, 40, 80, 160],
+                            help="values of the swept parameter")
+    arg_parser.add_argument("--statements", type=int, default=40, help="assignments and assertions")
+    arg_parser.add_argument("--variables", type=int, default=4, help="program variables")
+    arg_parser.add_argument("--depth", type=int, default=1, help="nesting depth of if/else")
+    arg_parser.add_argument("--loops", type=int, default=1, help="while loops")
+    arg_parser.add_argument("--unroll", type=int, default=3, help="loop unrolling depth")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage (the best counts)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed of the generated programs")
+    arg_parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    arg_parser.add_argument("--baseline", metavar="FILE",
+                            help="compare against results written by an earlier --json run")
+    arg_parser.add_argument("--tolerance", type=float, default=2.0,
+                            help="slowdown factor reported as a regression (default: 2.0)")
+    args = arg_parser.parse_args()
+
+    settings = {name: getattr(args, name) for name in PARAMETERS}
+    calibration = calibrate()
+    points = run_benchmark(args.sweep, args.values, settings, args.repeat, args.seed)
+    # Calibrating on both sides of the run absorbs some drift in machine speed
+    calibration = min(calibration, calibrate())
+    result = {"sweep": args.sweep, "settings": settings, "repeat": args.repeat, "seed": args.seed,
+              "python": sys.version.split()[0], "calibration_ms": round(calibration, 3),
+              "points": points, "exponents": scaling_exponents(points)}
+    print_table(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
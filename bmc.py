@@ -0,0 +1,126 @@
+# Bounded model checking with incremental unrolling
+# Searches for an execution that violates an assertion, unrolling loops one
+# iteration deeper at a time. SSA values are numbered in program order, so
+# the program unrolled to depth k+1 starts with the same instructions as the
+# program unrolled to depth k; those stay asserted in the solver and only the
+# rest of the program is encoded again for the new depth.
+from z3 import Bool, Implies, Not, Or, sat, unsat
+
+from ssa import SSAConverter
+from smt import SMTGenerator, model_value
+
+class BoundedModelChecker:
+    """
+    Incremental bounded model checker.
+
+    At every depth the instructions shared with the previous depth are
+    asserted unconditionally; the remaining instructions of the depth (the
+    last iteration, the loop-exit assumption and whatever follows the loop)
+    and the "some assertion fails" property are asserted under a fresh
+    literal, which is assumed for that depth's check and retired afterwards.
+    A run of depth k is an execution in which every loop exits within k
+    iterations, so the first depth with a failing run is the minimal
+    failing depth.
+    """
+
+    def __init__(self, generator=None):
+        self.generator = generator if generator is not None else SMTGenerator()
+        self.reset()
+
+    def reset(self):
+        """Drop all solver state."""
+        self.generator.reset()
+        self.solver = self.generator.solver
+        self.base = []              # fingerprints of the instructions asserted unconditionally
+        self.base_violations = []   # failure conditions of the assertions among them
+        self.history = []           # (depth, result, reused instructions) of every depth checked
+
+    def check(self, statements, max_depth=10, min_depth=0):
+        """
+        Look for an assertion failure, deepening the unrolling one iteration
+        at a time from min_depth to max_depth.
+
+        Args:
+            statements: Program statements from parse_program
+            max_depth (int): Deepest unrolling to try
+            min_depth (int): First unrolling depth to check
+
+        Returns:
+            tuple: (status, depth, counterexample) - status is "violated"
+                (depth is the minimal failing depth and counterexample maps
+                the program inputs to failing values), "safe" (no failure up
+                to depth; deeper unrolling changes nothing if depth <
+                max_depth) or "unknown" (the solver gave up at depth)
+        """
+        self.reset()
+        generator = self.generator
+        previous = None
+        for depth in range(min_depth, max_depth + 1):
+            program = SSAConverter(width=generator.width).convert_to_ssa(statements, depth)
+            fingerprints = [program.format_tree(instr) for instr in program.blocks[0]]
+            if fingerprints == previous:
+                # The program has no loops: deeper unrolling is the same program
+                return "safe", depth - 1, None
+            builder = generator.new_builder(program)
+
+            # Instructions shared with the previous depth become permanent
+            if previous is not None:
+                shared = 0
+                limit = min(len(previous), len(fingerprints))
+                while shared < limit and previous[shared] == fingerprints[shared]:
+                    shared += 1
+                if shared < len(self.base):
+                    # The programs diverge inside the permanent part; start over
+                    history = self.history
+                    self.reset()
+                    self.history = history
+                    shared = 0
+                constraints = []
+                for instr in program.blocks[0][len(self.base):shared]:
+                    generator.encode_instr(program, instr, None, builder, constraints, self.base_violations)
+                self.solver.add(constraints)
+                self.base = fingerprints[:shared]
+
+            # The rest of this depth, active only under its literal
+            literal = Bool(f"bmc_depth_{depth}")
+            constraints = []
+            violations = list(self.base_violations)
+            for instr in program.blocks[0][len(self.base):]:
+                generator.encode_instr(program, instr, None, builder, constraints, violations)
+            if not violations:
+                # Nothing to violate yet; assertions in a loop body only
+                # appear once the loop is unrolled far enough
+                previous = fingerprints
+                continue
+            self.solver.add([Implies(literal, constraint) for constraint in constraints])
+            self.solver.add(Implies(literal, Or(violations)))
+
+            result = generator.run_check(self.solver, [literal])
+            self.history.append((depth, str(result), len(self.base)))
+            if result == sat:
+                model = generator.model()
+                counterexample = {program.base_name(value): model_value(model, generator.value_var(program, value))
+                                  for value in program.inputs}
+                return "violated", depth, counterexample
+            if result != unsat:
+                return "unknown", depth, None
+
+            # Retire this depth's constraints
+            self.solver.add(Not(literal))
+            previous = fingerprints
+        return "safe", max_depth, None
+
+# Example usage
+if __name__ == "__main__":
+    from parser import parse_program
+
+    statements = parse_program("""
+x := 0;
+while (x < n) {
+    x := x + 1;
+}
+assert(x < 5);
+""")
+    checker = BoundedModelChecker()
+    print(checker.check(statements, max_depth=10))
+    print(checker.history)
@@ -0,0 +1,215 @@
+# Persistent verification result cache
+# Results are stored in a local sqlite database under a content hash of the
+# normalized SSA, so re-verifying a program that only differs in variable
+# names, formatting or comments is answered without calling Z3.
+import hashlib
+import json
+import os
+import sqlite3
+
+from ast_nodes import Num, UnaryOp
+from ir import Ref, ASSIGN, BRANCH, PHI, HAVOC
+
+# Default location of the cache database
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "formal-program-analyzer", "results.sqlite3")
+
+
+class Normalizer:
+    """
+    Builds the canonical text of one or more SSA programs.
+
+    Values are alpha-renamed to v0, v1, ... in order of first occurrence, so
+    the text does not depend on variable names or on how the source was
+    formatted. Program inputs are keyed by variable name rather than value
+    id, because programs normalized together (the two sides of an
+    equivalence check) share their inputs by name.
+    """
+
+    def __init__(self):
+        self.canonical = {}   # value key -> canonical index
+        self.order = []       # canonical index -> (program, value id)
+
+    def key(self, program, value, tag):
+        if program.value_is_input[value]:
+            return ('input', program.base_name(value))
+        return (tag, value)
+
+    def known(self, program, value, tag):
+        """Return the canonical index of a value, or None if it has not been numbered."""
+        return self.canonical.get(self.key(program, value, tag))
+
+    def index(self, program, value, tag):
+        """Return the canonical index of a value, numbering it on first sight."""
+        key = self.key(program, value, tag)
+        index = self.canonical.get(key)
+        if index is None:
+            index = len(self.order)
+            self.canonical[key] = index
+            self.order.append((program, value))
+        return index
+
+    def value(self, program, value, tag):
+        return f"v{self.index(program, value, tag)}"
+
+    def expr(self, program, expr, tag):
+        if isinstance(expr, Ref):
+            return self.value(program, expr.value, tag)
+        if isinstance(expr, Num):
+            return str(expr.value)
+        if isinstance(expr, UnaryOp):
+            return f"({expr.op} {self.expr(program, expr.operand, tag)})"
+        return f"({expr.op} {self.expr(program, expr.left, tag)} {self.expr(program, expr.right, tag)})"
+
+    def block(self, program, block, tag, tokens):
+        for instr in program.blocks[block]:
+            op = instr.op
+            if op == ASSIGN:
+                dest = self.value(program, instr.dest, tag)
+                tokens.append(f"{dest}:={self.expr(program, instr.args[0], tag)};")
+            elif op == PHI:
+                condition, then_value, else_value = instr.args
+                dest = self.value(program, instr.dest, tag)
+                tokens.append(f"{dest}:=phi({self.expr(program, condition, tag)},"
+                              f"{self.value(program, then_value, tag)},{self.value(program, else_value, tag)});")
+            elif op == BRANCH:
+                condition, then_block, else_block = instr.args
+                tokens.append(f"if{self.expr(program, condition, tag)}{{")
+                self.block(program, then_block, tag, tokens)
+                tokens.append("}else{")
+                if else_block is not None:
+                    self.block(program, else_block, tag, tokens)
+                tokens.append("};")
+            elif op == HAVOC:
+                tokens.append(f"{self.value(program, instr.dest, tag)}:=havoc;")
+            else:
+                tokens.append(f"{op}{self.expr(program, instr.args[0], tag)};")
+
+    def program(self, program, tag=0):
+        """Return the canonical text of a program."""
+        tokens = []
+        self.block(program, 0, tag, tokens)
+        return "".join(tokens)
+
+
+def _digest(*parts):
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+def _options_text(program, options):
+    return json.dumps({"unroll_depth": getattr(program, "unroll_depth", None),
+                       "options": options or {}}, sort_keys=True)
+
+def verification_key(program, options=None):
+    """
+    Return the cache key of a verification query.
+
+    Args:
+        program (SSAProgram): Program to verify
+        options (dict): Solver options that can change the result
+
+    Returns:
+        tuple: (key, normalizer) - the normalizer's order maps canonical
+            indices back to the program's values
+    """
+    normalizer = Normalizer()
+    text = normalizer.program(program)
+    return _digest("verify", text, _options_text(program, options)), normalizer
+
+def equivalence_key(program1, program2, output_vars, options=None):
+    """
+    Return the cache key of an equivalence query.
+
+    Args:
+        program1 (SSAProgram): First program
+        program2 (SSAProgram): Second program
+        output_vars (list): Output variable names compared
+        options (dict): Solver options that can change the result
+
+    Returns:
+        tuple: (key, normalizer)
+    """
+    normalizer = Normalizer()
+    text1 = normalizer.program(program1, 1)
+    text2 = normalizer.program(program2, 2)
+    # Outputs are identified by the canonical names of their final values
+    outputs = []
+    for var in output_vars:
+        value1 = program1.final_value(var)
+        value2 = program2.final_value(var)
+        if value1 is None or value2 is None:
+            outputs.append("-")
+        else:
+            outputs.append(f"{normalizer.value(program1, value1, 1)}={normalizer.value(program2, value2, 2)}")
+    return _digest("equivalence", text1, text2, ",".join(outputs), _options_text(program1, options)), normalizer
+
+
+class VerificationCache:
+    """
+    Size-bounded, least-recently-used store of verification results.
+
+    Entries are JSON payloads keyed by the hashes from verification_key and
+    equivalence_key. When more than max_entries are stored, the entries
+    used least recently are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # The GUI uses the cache from its worker threads, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " last_used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.connection.commit()
+
+    def _tick(self):
+        """Return a use counter larger than any stored so far."""
+        row = self.connection.execute("SELECT MAX(last_used) FROM results").fetchone()
+        return (row[0] or 0) + 1
+
+    def get(self, key):
+        """Return the payload stored under key, or None."""
+        row = self.connection.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (self._tick(), key))
+        self.connection.commit()
+        return json.loads(row[0])
+
+    def put(self, key, payload):
+        """Store a payload under key, evicting the least recently used entries if needed."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results (key, payload, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(payload), self._tick()))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used LIMIT ?)", (excess,))
+        self.connection.commit()
+
+    def clear(self):
+        self.connection.execute("DELETE FROM results")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def open_default_cache():
+    """Open the cache at its default location, or return None if that is not possible."""
+    try:
+        return VerificationCache()
+    except (OSError, sqlite3.Error):
+        return None
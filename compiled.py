@@ -0,0 +1,237 @@
+# Compilation of SSA programs to Python functions
+# Running a program many times on different inputs (replaying solver models,
+# random testing) is much faster through generated Python code than by
+# walking the SSA instructions each time. A program is compiled once into a
+# straight-line function: every value is computed whichever way a branch
+# goes, as in the SMT encoding, and assertions only count on the path taken.
+# Functions are cached under the hash of the normalized program (see
+# cache.verification_key), so programs that only differ in variable names
+# share their compiled code.
+from ast_nodes import Num, UnaryOp, LOGIC_OPS
+from ir import Ref, ASSIGN, BRANCH, PHI, HAVOC
+from cache import verification_key
+
+# Compiled functions by program hash, and the number kept
+_functions = {}
+MAX_FUNCTIONS = 256
+
+COMPARE = {'<': '<', '>': '>', '<=': '<=', '>=': '>=', '==': '==', '!=': '!='}
+
+
+def _div(left, right):
+    """Euclidean division; raises ZeroDivisionError for a zero divisor."""
+    return (left - left % abs(right)) // right
+
+
+class CodeGenerator:
+    """
+    Generates the source of the function of one program, naming values by
+    their canonical indices (v0, v1, ...) so the code does not depend on
+    variable names.
+    """
+
+    def __init__(self, program, normalizer, width=None, check_overflow=False):
+        self.program = program
+        self.normalizer = normalizer
+        self.width = width
+        self.check_overflow = bool(check_overflow and width)
+        self.lines = []
+        self.temps = 0
+        self.paths = 0
+        self.parameters = []   # canonical indices of the inputs and havocked values
+
+    def name(self, value):
+        index = self.normalizer.index(self.program, value, 0)
+        if (self.program.value_is_input[value] or value in self.havocked) and index not in self.parameters:
+            self.parameters.append(index)
+        return f"v{index}"
+
+    def source(self):
+        """Return the source of a function taking the parameter values and returning (holds, values)."""
+        self.havocked = {instr.dest for instr, _ in self.program.instructions() if instr.op == HAVOC}
+        self.block(0, "True", "    ")
+        count = len(self.normalizer.order)
+        self.parameters.sort()
+        header = f"def run({', '.join(f'v{index}' for index in self.parameters)}):"
+        values = ", ".join(f"v{index}" for index in range(count))
+        return "\n".join([header, "    holds = True"] + self.lines +
+                         [f"    return holds, ({values}{',' if count == 1 else ''})"])
+
+    def block(self, block, path, indent):
+        for instr in self.program.blocks[block]:
+            op = instr.op
+            if op == HAVOC:
+                self.name(instr.dest)
+                continue
+            value = self.expr(instr.args[0], path, indent)
+            if op == ASSIGN:
+                self.lines.append(f"{indent}{self.name(instr.dest)} = {value}")
+            elif op == PHI:
+                _, then_value, else_value = instr.args
+                self.lines.append(f"{indent}{self.name(instr.dest)} = "
+                                  f"{self.name(then_value)} if {value} else {self.name(else_value)}")
+            elif op == BRANCH:
+                _, then_block, else_block = instr.args
+                self.block(then_block, self.path(path, value, indent), indent)
+                if else_block is not None:
+                    self.block(else_block, self.path(path, f"not {value}", indent), indent)
+            else:
+                # Assertions and assumptions
+                condition = f"not {value}" if path == "True" else f"{path} and not {value}"
+                self.lines.append(f"{indent}if {condition}: holds = False")
+
+    def path(self, path, condition, indent):
+        """Name the condition of a nested path."""
+        self.paths += 1
+        name = f"p{self.paths}"
+        term = f"bool({condition})" if path == "True" else f"{path} and bool({condition})"
+        self.lines.append(f"{indent}{name} = {term}")
+        return name
+
+    def temp(self, code, indent):
+        self.temps += 1
+        name = f"t{self.temps}"
+        self.lines.append(f"{indent}{name} = {code}")
+        return name
+
+    def expr(self, expr, path, indent):
+        """Emit code for an expression; returns the name or literal holding its value."""
+        if isinstance(expr, Ref):
+            return self.name(expr.value)
+        if isinstance(expr, Num):
+            return str(self.wrap_constant(expr.value))
+        if isinstance(expr, UnaryOp):
+            operand = self.expr(expr.operand, path, indent)
+            if expr.op == '!':
+                return self.temp(f"int(not {operand})", indent)
+            return self.arithmetic(f"-{operand}", path, indent)
+
+        left = self.expr(expr.left, path, indent)
+        right = self.expr(expr.right, path, indent)
+        if expr.op in LOGIC_OPS:
+            joiner = "and" if expr.op == '&&' else "or"
+            return self.temp(f"int(bool({left}) {joiner} bool({right}))", indent)
+        if expr.op in COMPARE:
+            return self.temp(f"int({left} {COMPARE[expr.op]} {right})", indent)
+        if expr.op == '/':
+            return self.arithmetic(f"_div({left}, {right})", path, indent)
+        return self.arithmetic(f"{left} {expr.op} {right}", path, indent)
+
+    def arithmetic(self, code, path, indent):
+        """Emit an arithmetic operation, wrapping (and checking) it with a width."""
+        if self.width is None:
+            return self.temp(code, indent)
+        bound = 1 << (self.width - 1)
+        if not self.check_overflow:
+            return self.temp(f"(({code}) + {bound} & {2 * bound - 1}) - {bound}", indent)
+        result = self.temp(code, indent)
+        condition = f"not {-bound} <= {result} < {bound}"
+        self.lines.append(f"{indent}if {condition if path == 'True' else f'{path} and {condition}'}: holds = False")
+        return self.temp(f"({result} + {bound} & {2 * bound - 1}) - {bound}", indent)
+
+    def wrap_constant(self, number):
+        if self.width is None:
+            return number
+        bound = 1 << (self.width - 1)
+        return (number + bound) % (2 * bound) - bound
+
+
+class CompiledProgram:
+    """
+    A program compiled to a Python function (see compile_program).
+
+    Inputs are passed by variable name and havocked values by value id; any
+    that are missing are 0, as in Z3's model completion.
+    """
+
+    def __init__(self, program, function, parameters, order):
+        self.program = program
+        self.function = function
+        self.parameters = parameters   # (kind, key) of each function argument
+        self.order = order             # canonical index -> value id
+
+    def run(self, inputs=None, havocs=None):
+        """
+        Run the program.
+
+        Args:
+            inputs (dict): Input variable name -> integer
+            havocs (dict): Havocked value id -> integer
+
+        Returns:
+            tuple: (holds, values) - whether every assertion and assumption on
+                the path taken holds, and value id -> integer for every value;
+                None for a division by zero, which the encoding leaves unspecified
+        """
+        inputs = inputs or {}
+        havocs = havocs or {}
+        arguments = [inputs.get(key, 0) if kind == 'input' else havocs.get(key, 0)
+                     for kind, key in self.parameters]
+        try:
+            holds, results = self.function(*arguments)
+        except ZeroDivisionError:
+            return None
+        values = {value: inputs.get(self.program.base_name(value), 0) for value in self.program.inputs}
+        values.update(zip(self.order, results))
+        return holds, values
+
+    def final_values(self, inputs=None, havocs=None):
+        """
+        Run the program and return the final value of every variable.
+
+        Returns:
+            tuple: (holds, values) - variable name -> integer for every
+                variable the program computes; None as for run
+        """
+        run = self.run(inputs, havocs)
+        if run is None:
+            return None
+        holds, values = run
+        # Sliced or optimized programs may no longer compute some variables
+        return holds, {self.program.var_names[var_id]: values[value]
+                       for var_id, value in self.program.final_values.items() if value in values}
+
+
+def compile_program(program, width=None, check_overflow=False):
+    """
+    Compile an SSA program to a Python function, reusing the function of an
+    earlier program that normalizes to the same text.
+
+    Args:
+        program (SSAProgram): Program to compile
+        width (int): Bits of machine integers, or None for unbounded integers
+        check_overflow (bool): Whether overflow fails like an assertion (only with a width)
+
+    Returns:
+        CompiledProgram: The compiled program
+    """
+    check_overflow = bool(check_overflow and width)
+    key, normalizer = verification_key(program, {"compiled": [width, check_overflow]})
+    entry = _functions.get(key)
+    if entry is None:
+        generator = CodeGenerator(program, normalizer, width, check_overflow)
+        namespace = {"_div": _div}
+        exec(compile(generator.source(), f"<compiled {key[:12]}>", "exec"), namespace)
+        if len(_functions) >= MAX_FUNCTIONS:
+            del _functions[next(iter(_functions))]  # Drop the oldest
+        entry = _functions[key] = (namespace["run"], generator.parameters)
+    function, indices = entry
+    parameters = []
+    for index in indices:
+        _, value = normalizer.order[index]
+        if program.value_is_input[value]:
+            parameters.append(('input', program.base_name(value)))
+        else:
+            parameters.append(('havoc', value))
+    order = [value for _, value in normalizer.order]
+    return CompiledProgram(program, function, parameters, order)
+
+# Example usage
+if __name__ == "__main__":
+    from parser import parse_program
+    from ssa import SSAConverter
+
+    program = SSAConverter().convert_to_ssa(parse_program("if (x > 0) { y := x * 2; } else { y := 0 - x; } assert(y < 10);"))
+    compiled = compile_program(program)
+    for x in (-3, 4, 7):
+        print(x, compiled.final_values({"x": x}))
@@ -0,0 +1,104 @@
+# Concrete evaluation of programs without inputs
+# A program that reads no inputs has exactly one execution, so running its
+# SSA instructions on plain Python integers decides it without building a Z3
+# query. The evaluation follows the SMT encoding exactly: every value is
+# defined whichever way a branch goes, assertions and assumptions only count
+# on the path taken, and machine integers wrap around. Programs the
+# evaluation cannot decide (inputs, havocked loop state, a division by zero,
+# which the encoding leaves unspecified) are left to the solver.
+from ast_nodes import Num, UnaryOp, BinOp, apply_op
+from ir import Ref, ASSIGN, ASSERT, ASSUME, BRANCH, PHI, HAVOC
+
+class NotConcrete(Exception):
+    """Raised when a program needs the solver to be decided."""
+
+
+class ConcreteEvaluator:
+    """
+    Evaluates the single execution of an input-free SSA program.
+
+    With a width, integers are width-bit two's complement machine integers,
+    and with check_overflow an operation that overflows on the path taken
+    fails like an assertion (see SMTGenerator.set_encoding).
+    """
+
+    def __init__(self, width=None, check_overflow=False):
+        self.width = width
+        self.check_overflow = bool(check_overflow and width)
+
+    def run(self, program):
+        """
+        Evaluate a program.
+
+        Returns:
+            tuple: (holds, values) - whether every assertion and assumption on
+                the path taken holds, and value id -> integer for every value
+                the program defines; None if the program needs the solver
+        """
+        if program.used_inputs():
+            return None
+        # Inputs nothing reads are unconstrained; Z3's model completion makes them 0
+        self.values = {value: 0 for value in program.inputs}
+        self.holds = True
+        try:
+            self.run_block(program, 0, True)
+        except NotConcrete:
+            return None
+        return self.holds, self.values
+
+    def run_block(self, program, block, on_path):
+        for instr in program.blocks[block]:
+            op = instr.op
+            if op == HAVOC:
+                raise NotConcrete(instr.dest)
+            # Every other instruction has an expression as its first argument
+            value = self.evaluate(instr.args[0], on_path)
+            if op == ASSIGN:
+                self.values[instr.dest] = value
+            elif op == PHI:
+                _, then_value, else_value = instr.args
+                self.values[instr.dest] = self.values[then_value if value else else_value]
+            elif op == BRANCH:
+                _, then_block, else_block = instr.args
+                self.run_block(program, then_block, on_path and bool(value))
+                if else_block is not None:
+                    self.run_block(program, else_block, on_path and not value)
+            elif op in (ASSERT, ASSUME) and on_path and not value:
+                self.holds = False
+
+    def evaluate(self, expr, on_path):
+        """Return the integer value of an IR expression (truth values are 1/0)."""
+        if isinstance(expr, Ref):
+            return self.values[expr.value]
+        if isinstance(expr, Num):
+            return self.wrap(expr.value)
+        if isinstance(expr, UnaryOp):
+            return self.overflow(apply_op(expr.op, self.evaluate(expr.operand, on_path)), on_path)
+        if isinstance(expr, BinOp):
+            result = apply_op(expr.op, self.evaluate(expr.left, on_path), self.evaluate(expr.right, on_path))
+            if result is None:
+                raise NotConcrete(expr)  # Division by zero
+            return self.overflow(result, on_path)
+        raise NotConcrete(expr)
+
+    def overflow(self, result, on_path):
+        """Wrap the result of an operation, failing the run if it overflowed and overflow is checked."""
+        wrapped = self.wrap(result)
+        if wrapped != result and self.check_overflow and on_path:
+            self.holds = False
+        return wrapped
+
+    def wrap(self, number):
+        if self.width is None:
+            return number
+        bound = 1 << (self.width - 1)
+        return (number + bound) % (2 * bound) - bound
+
+# Example usage
+if __name__ == "__main__":
+    from parser import parse_program
+    from ssa import SSAConverter
+
+    program = SSAConverter().convert_to_ssa(parse_program("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);"))
+    holds, values = ConcreteEvaluator().run(program)
+    print(holds, {program.value_name(value): number for value, number in values.items()})
@@ -3,12 +3,64 @@
 import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTextEdit, QPushButton, QVBoxLayout, QHBoxLayout, 
                            QWidget, QLabel, QTabWidget, QSpinBox, QComboBox, QGroupBox, QScrollArea, 
-                           QFormLayout, QTableWidget, QTableWidgetItem, QHeaderView)
-from PyQt5.QtCore import Qt
-from ssa import SSAConverter
+                           QFormLayout, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from smt import SMTGenerator
+from session import IncrementalSession
+from ssa import slice_program
+from cache import open_default_cache
+from pipeline import StageTimer, convert_source, bmc_source, prove_source
 from z3 import sat, unsat
-from parser import parse_program
+
+class Cancelled(Exception):
+    """Raised inside a worker when the user cancels the analysis."""
+
+class AnalysisWorker(QThread):
+    """
+    Runs an analysis task off the UI thread, so the window stays responsive
+    while Z3 is working.
+
+    The task is called with a progress callback taking the name of the stage
+    being started; its return value is delivered by the succeeded signal.
+    """
+    stage_started = pyqtSignal(str)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, task, generator):
+        super().__init__()
+        self.task = task
+        self.generator = generator   # SMTGenerator the task solves with
+        self.cancelled = False
+
+    def report(self, stage):
+        if self.cancelled:
+            raise Cancelled()
+        self.stage_started.emit(stage)
+
+    def cancel(self):
+        """Stop the task at the next stage boundary, interrupting a running solver check."""
+        self.cancelled = True
+        self.generator.interrupt()
+
+    def run(self):
+        self.generator.interrupted = False
+        try:
+            result = self.task(self.report)
+        except Cancelled:
+            self.failed.emit("Cancelled by the user.")
+        except Exception as e:
+            # The pipeline reports a cancellation inside it as an ordinary failure
+            self.failed.emit("Cancelled by the user." if self.cancelled else str(e))
+        else:
+            if self.cancelled:
+                self.failed.emit("Cancelled by the user.")
+            else:
+                self.succeeded.emit(result)
+
+def format_timings(timings):
+    return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+
 
 class ProgramAnalyzerGUI(QMainWindow):
     def __init__(self):
@@ -16,6 +68,24 @@ class ProgramAnalyzerGUI(QMainWindow):
         self.setWindowTitle('Program Analyzer')
         self.setGeometry(100, 100, 1000, 800)
 
+        # Results of earlier runs (also from previous sessions) are answered
+        # from an on-disk cache without calling Z3
+        self.cache = open_default_cache()
+
+        # Solver sessions kept between button presses, so edits only re-encode
+        # the changed part of a program
+        self.verify_session = IncrementalSession(SMTGenerator(cache=self.cache))
+        self.equiv_session = IncrementalSession(SMTGenerator(cache=self.cache))
+
+        # Bounded model checking and k-induction reset their solver at every
+        # check, so they get a generator of their own instead of disturbing
+        # the verification session
+        self.check_generator = SMTGenerator()
+
+        # Analysis running in the background, if any. Both tabs use the same
+        # Z3 context, so only one analysis runs at a time.
+        self.worker = None
+
         # Main widget
         self.main_widget = QWidget()
         self.setCentralWidget(self.main_widget)
@@ -57,6 +127,26 @@ class ProgramAnalyzerGUI(QMainWindow):
         self.unroll_depth_spinbox.setMaximum(10)
         self.unroll_depth_spinbox.setValue(3)
         unroll_layout.addWidget(self.unroll_depth_spinbox)
+
+        # Solver time limit; checks that run out of time report unknown
+        unroll_layout.addWidget(QLabel("Solver Timeout (s):"))
+        self.timeout_spinbox = QSpinBox()
+        self.timeout_spinbox.setRange(0, 3600)
+        self.timeout_spinbox.setSpecialValueText("None")
+        unroll_layout.addWidget(self.timeout_spinbox)
+
+        # Integer semantics: unbounded, or machine integers that wrap around
+        unroll_layout.addWidget(QLabel("Integers:"))
+        self.width_combo = QComboBox()
+        self.width_combo.addItem("Unbounded", None)
+        self.width_combo.addItem("32-bit", 32)
+        self.width_combo.addItem("64-bit", 64)
+        self.width_combo.setToolTip("Integer encoding, also used for equivalence checks; '/' stays "
+                                    "Euclidean division, as with unbounded integers")
+        unroll_layout.addWidget(self.width_combo)
+        self.overflow_checkbox = QCheckBox("Overflow Checks")
+        self.overflow_checkbox.setToolTip("Fail on arithmetic that overflows the machine integers")
+        unroll_layout.addWidget(self.overflow_checkbox)
         
         # Add some spacing
         unroll_layout.addStretch()
@@ -65,6 +155,21 @@ class ProgramAnalyzerGUI(QMainWindow):
         self.verify_button = QPushButton('Verify Program')
         self.verify_button.clicked.connect(self.verify_program)
         unroll_layout.addWidget(self.verify_button)
+
+        # Search for the shallowest assertion failure up to the unrolling depth
+        self.bmc_button = QPushButton('Bounded Model Check')
+        self.bmc_button.clicked.connect(self.bounded_model_check)
+        unroll_layout.addWidget(self.bmc_button)
+
+        # Prove the assertions for any number of iterations (k up to the unrolling depth)
+        self.prove_button = QPushButton('Prove (k-Induction)')
+        self.prove_button.clicked.connect(self.prove_program)
+        unroll_layout.addWidget(self.prove_button)
+
+        self.verify_cancel_button = QPushButton('Cancel')
+        self.verify_cancel_button.setEnabled(False)
+        self.verify_cancel_button.clicked.connect(self.cancel_analysis)
+        unroll_layout.addWidget(self.verify_cancel_button)
         
         input_layout.addLayout(unroll_layout)
         input_group.setLayout(input_layout)
@@ -165,6 +270,10 @@ class ProgramAnalyzerGUI(QMainWindow):
         self.eq_unroll_depth_spinbox.setMaximum(10)
         self.eq_unroll_depth_spinbox.setValue(3)
         unroll_group_layout.addRow("Unrolling Depth:", self.eq_unroll_depth_spinbox)
+        self.eq_timeout_spinbox = QSpinBox()
+        self.eq_timeout_spinbox.setRange(0, 3600)
+        self.eq_timeout_spinbox.setSpecialValueText("None")
+        unroll_group_layout.addRow("Solver Timeout (s):", self.eq_timeout_spinbox)
         unroll_group.setLayout(unroll_group_layout)
         options_layout.addWidget(unroll_group)
         
@@ -172,6 +281,11 @@ class ProgramAnalyzerGUI(QMainWindow):
         self.check_equiv_button = QPushButton('Check Equivalence')
         self.check_equiv_button.clicked.connect(self.check_equivalence)
         options_layout.addWidget(self.check_equiv_button)
+
+        self.equiv_cancel_button = QPushButton('Cancel')
+        self.equiv_cancel_button.setEnabled(False)
+        self.equiv_cancel_button.clicked.connect(self.cancel_analysis)
+        options_layout.addWidget(self.equiv_cancel_button)
         
         layout.addLayout(options_layout)
         
@@ -226,6 +340,46 @@ class ProgramAnalyzerGUI(QMainWindow):
         
         self.equivalence_tab.setLayout(layout)
 
+    def start_analysis(self, task, generator, on_success, on_failure, cancel_button):
+        """
+        Run a task in a background worker, keeping the run buttons disabled
+        and the cancel button enabled until it finishes.
+        """
+        worker = AnalysisWorker(task, generator)
+        worker.stage_started.connect(lambda stage: self.statusBar().showMessage(f"Running: {stage}..."))
+        worker.succeeded.connect(on_success)
+        worker.failed.connect(on_failure)
+        worker.finished.connect(lambda: self.finish_analysis(cancel_button))
+        self.worker = worker
+        self.verify_button.setEnabled(False)
+        self.bmc_button.setEnabled(False)
+        self.prove_button.setEnabled(False)
+        self.check_equiv_button.setEnabled(False)
+        cancel_button.setEnabled(True)
+        worker.start()
+
+    def finish_analysis(self, cancel_button):
+        self.worker = None
+        self.verify_button.setEnabled(True)
+        self.bmc_button.setEnabled(True)
+        self.prove_button.setEnabled(True)
+        self.check_equiv_button.setEnabled(True)
+        cancel_button.setEnabled(False)
+
+    def cancel_analysis(self):
+        if self.worker is not None:
+            self.statusBar().showMessage("Cancelling...")
+            self.worker.cancel()
+
+    def set_encoding(self, generator):
+        """
+        Apply the integer encoding chosen in the verification tab to a generator.
+
+        Returns:
+            bool: Whether the encoding changed (and the generator's solver was reset)
+        """
+        return generator.set_encoding(self.width_combo.currentData(), self.overflow_checkbox.isChecked())
+
     def verify_program(self):
         # Clear previous results
         self.ssa_output.clear()
@@ -240,44 +394,176 @@ class ProgramAnalyzerGUI(QMainWindow):
             self.result_output.setText("Error: Please enter a program to verify.")
             return
         
-        try:
-            # Get loop unrolling depth
-            unroll_depth = self.unroll_depth_spinbox.value()
-            
-            # Parse the input program
-            statements = parse_program(program_text)
-            
-            # Convert to SSA with loop unrolling
-            ssa_converter = SSAConverter()
-            ssa_form = ssa_converter.convert_to_ssa(statements, unroll_depth)
-            self.ssa_output.setText("\n".join(ssa_form))
-            
-            # Generate SMT constraints
-            smt_generator = SMTGenerator()
-            constraints = smt_generator.generate_constraints(ssa_form)
-            constraint_text = "\n".join([str(c) for c in constraints])
-            self.smt_output.setText(constraint_text)
-            
+        # Get loop unrolling depth and solver time limit
+        unroll_depth = self.unroll_depth_spinbox.value()
+        timeout = self.timeout_spinbox.value() * 1000 or None
+        session = self.verify_session
+        if self.set_encoding(session.generator):
+            session.reset()  # Nothing encoded so far can be reused
+        width = session.generator.width
+
+        def task(progress):
+            # Runs in the worker thread: no widgets may be touched here
+            timer = StageTimer(progress)
+
+            # Parse the input program and convert it to SSA with loop unrolling
+            ssa_form = convert_source(program_text, unroll_depth, timer, width=width)
+
+            # A program checked before is answered from the cache without encoding it
+            entry, verdict = None, None
+            if session.generator.cache is not None:
+                with timer.stage("cache"):
+                    entry, verdict = session.generator.cache_lookup(ssa_form)
+            if verdict is not None:
+                result, model = verdict
+                constraint_text = "(not encoded: the result was found in the cache)"
+                examples = [model] if result == sat else []
+                return (str(ssa_form), constraint_text, result, "cache", examples, timer.timings,
+                        ssa_form.optimization)
+
+            # A program without inputs has one execution: run it instead of calling Z3
+            with timer.stage("concrete"):
+                decided = session.generator.evaluate(ssa_form)
+            if decided is not None:
+                result, model = decided
+                if entry is not None:
+                    with timer.stage("cache"):
+                        session.generator.cache_store(ssa_form, entry, result, model)
+                constraint_text = "(not encoded: the program reads no inputs, so it was run directly)"
+                examples = [model] if result == sat else []
+                return (str(ssa_form), constraint_text, result, "concrete", examples, timer.timings,
+                        ssa_form.optimization)
+
+            # Generate SMT constraints, reusing the unchanged prefix of the previous run
+            with timer.stage("smt"):
+                session.generator.set_limits(timeout)
+                session.update(ssa_form)
+                constraint_text = "\n".join([str(c) for c in session.constraints()])
+
             # Check satisfiability
-            smt_generator.add_constraints(constraints)
-            result = smt_generator.check()
-            
-            # Display result
+            with timer.stage("solve"):
+                result, model = session.generator.solve(ssa_form, session.solver)
+                tier = session.generator.last_tier
+            if entry is not None:
+                with timer.stage("cache"):
+                    session.generator.cache_store(ssa_form, entry, result, model)
+
+            # Get examples
+            examples = []
             if result == sat:
-                self.result_output.setText("Verification Result: SATISFIABLE\nAll assertions hold for some inputs.")
-                
-                # Get examples
-                examples = smt_generator.get_examples(ssa_form, 2)
-                if examples:
-                    self.display_examples(examples)
-            elif result == unsat:
-                self.result_output.setText("Verification Result: UNSATISFIABLE\nAssertions don't hold.")
-            else:
-                self.result_output.setText(f"Verification Result: {result}")
-        
-        except Exception as e:
-            self.result_output.setText(f"Error during verification: {str(e)}")
+                with timer.stage("examples"):
+                    examples = session.generator.get_examples(ssa_form, 2, solver=session.solver)
+            return str(ssa_form), constraint_text, result, tier, examples, timer.timings, ssa_form.optimization
+
+        self.start_analysis(task, session.generator, self.show_verification, self.show_verification_error,
+                            self.verify_cancel_button)
+
+    def show_verification(self, outcome):
+        ssa_text, constraint_text, result, tier, examples, timings, optimization = outcome
+        self.ssa_output.setText(ssa_text)
+        self.smt_output.setText(constraint_text)
+
+        # Display result
+        if result == sat:
+            self.result_output.setText("Verification Result: SATISFIABLE\nAll assertions hold for some inputs.")
+            if examples:
+                self.display_examples(examples)
+        elif result == unsat:
+            self.result_output.setText("Verification Result: UNSATISFIABLE\nAssertions don't hold.")
+        else:
+            self.result_output.setText("Verification Result: UNKNOWN\n"
+                                       "The solver ran out of time or was interrupted.")
+        removed = f"optimization removed {optimization['removed']} instructions; " if optimization else ""
+        self.statusBar().showMessage(f"Done ({format_timings(timings)}; {removed}answered by: {tier or 'none'})")
+
+    def show_verification_error(self, message):
+        self.result_output.setText(f"Error during verification: {message}")
+        self.statusBar().clearMessage()
     
+    def bounded_model_check(self):
+        # Clear previous results
+        self.ssa_output.clear()
+        self.smt_output.clear()
+        self.result_output.clear()
+        self.examples_table.setRowCount(0)
+        self.examples_table.setColumnCount(0)
+
+        program_text = self.verification_input.toPlainText()
+        if not program_text.strip():
+            self.result_output.setText("Error: Please enter a program to check.")
+            return
+
+        # The unrolling depth is the deepest unrolling tried
+        max_depth = self.unroll_depth_spinbox.value()
+        generator = self.check_generator
+        generator.set_limits(self.timeout_spinbox.value() * 1000 or None)
+        self.set_encoding(generator)
+
+        def task(progress):
+            record = bmc_source(program_text, max_depth, generator, progress)
+            if record["result"] == "error":
+                raise RuntimeError(record["error"])
+            return record
+
+        self.start_analysis(task, generator, self.show_bmc, self.show_verification_error,
+                            self.verify_cancel_button)
+
+    def show_bmc(self, record):
+        depth = record["depth"]
+        if record["result"] == "violated":
+            self.result_output.setText(f"Bounded Model Check: VIOLATED\n"
+                                       f"An assertion fails when loops run at most {depth} iteration(s).")
+            if record["counterexample"]:
+                self.display_examples([record["counterexample"]])
+        elif record["result"] == "safe":
+            self.result_output.setText(f"Bounded Model Check: SAFE\n"
+                                       f"No assertion fails when loops run at most {depth} iteration(s).")
+        else:
+            self.result_output.setText(f"Bounded Model Check: UNKNOWN\n"
+                                       f"The solver gave up at depth {depth}.")
+        self.statusBar().showMessage(f"Done ({format_timings(record['timings'])})")
+
+    def prove_program(self):
+        # Clear previous results
+        self.ssa_output.clear()
+        self.smt_output.clear()
+        self.result_output.clear()
+        self.examples_table.setRowCount(0)
+        self.examples_table.setColumnCount(0)
+
+        program_text = self.verification_input.toPlainText()
+        if not program_text.strip():
+            self.result_output.setText("Error: Please enter a program to prove.")
+            return
+
+        # The unrolling depth is the largest induction depth tried
+        max_k = self.unroll_depth_spinbox.value()
+        generator = self.check_generator
+        generator.set_limits(self.timeout_spinbox.value() * 1000 or None)
+        self.set_encoding(generator)
+
+        def task(progress):
+            record = prove_source(program_text, max_k, generator, progress)
+            if record["result"] == "error":
+                raise RuntimeError(record["error"])
+            return record
+
+        self.start_analysis(task, generator, self.show_proof, self.show_verification_error,
+                            self.verify_cancel_button)
+
+    def show_proof(self, record):
+        if record["result"] == "proved":
+            self.result_output.setText(f"k-Induction: PROVED (k = {record['k']})\n"
+                                       f"No assertion fails for any number of loop iterations.")
+        elif record["result"] == "violated":
+            self.result_output.setText(f"k-Induction: VIOLATED\n"
+                                       f"An assertion fails after {record['k']} loop iteration(s).")
+            if record["counterexample"]:
+                self.display_examples([record["counterexample"]])
+        else:
+            self.result_output.setText(f"k-Induction: UNKNOWN\n{record['reason']}.")
+        self.statusBar().showMessage(f"Done ({format_timings(record['timings'])})")
+
     def check_equivalence(self):
         # Clear previous results
         self.ssa1_output.clear()
@@ -301,39 +587,68 @@ class ProgramAnalyzerGUI(QMainWindow):
         
         output_vars = [v.strip() for v in output_vars_text.split(',')]
         
-        try:
-            # Get loop unrolling depth
-            unroll_depth = self.eq_unroll_depth_spinbox.value()
-            
-            # Parse the input programs
-            statements1 = parse_program(program1_text)
-            statements2 = parse_program(program2_text)
-            
-            # Convert to SSA with loop unrolling
-            ssa_converter = SSAConverter()
-            ssa_form1 = ssa_converter.convert_to_ssa(statements1, unroll_depth)
-            ssa_converter.reset()
-            ssa_form2 = ssa_converter.convert_to_ssa(statements2, unroll_depth)
-            
-            # Display SSA forms
-            self.ssa1_output.setText("\n".join(ssa_form1))
-            self.ssa2_output.setText("\n".join(ssa_form2))
-            
+        # Get loop unrolling depth and solver time limit
+        unroll_depth = self.eq_unroll_depth_spinbox.value()
+        timeout = self.eq_timeout_spinbox.value() * 1000 or None
+        session = self.equiv_session
+        if self.set_encoding(session.generator):
+            session.reset()  # Nothing encoded so far can be reused
+        width = session.generator.width
+
+        def task(progress):
+            # Runs in the worker thread: no widgets may be touched here
+            timer = StageTimer(progress)
+
+            # Parse the input programs and convert them to SSA with loop unrolling
+            ssa_form1 = convert_source(program1_text, unroll_depth, timer, width=width)
+            ssa_form2 = convert_source(program2_text, unroll_depth, timer, width=width)
+
+            # Encode the cone of influence of the outputs in both programs,
+            # reusing the unchanged prefix of the previous run
+            with timer.stage("smt"):
+                session.generator.set_limits(timeout)
+                sliced1 = slice_program(ssa_form1, output_vars)
+                sliced2 = slice_program(ssa_form2, output_vars)
+                # Programs without inputs are compared by running them instead
+                decided = session.generator.evaluate_pair(sliced1, sliced2, output_vars)
+                if decided is None:
+                    session.update_all([(sliced1, ""), (sliced2, "_prog2")])
+
             # Check equivalence
-            smt_generator = SMTGenerator()
-            is_equivalent, counterexamples = smt_generator.check_equivalence(ssa_form1, ssa_form2, output_vars)
-            
-            if is_equivalent:
-                self.equiv_result.setText("Result: The programs are semantically equivalent for all inputs.")
+            if decided is not None:
+                is_equivalent, counterexamples = decided
             else:
-                if not counterexamples:
-                    self.equiv_result.setText("Result: The programs are NOT semantically equivalent, but no counterexample could be generated.")
-                else:
-                    self.equiv_result.setText("Result: The programs are NOT semantically equivalent. Counterexamples are shown below.")
-                    self.display_counterexamples(counterexamples)
-        
-        except Exception as e:
-            self.equiv_result.setText(f"Error during equivalence check: {str(e)}")
+                with timer.stage("solve"):
+                    is_equivalent, counterexamples = session.generator.check_equivalence(
+                        sliced1, sliced2, output_vars, session.solver)
+            tier = session.generator.last_tier
+            return str(ssa_form1), str(ssa_form2), is_equivalent, tier, counterexamples, timer.timings
+
+        self.start_analysis(task, session.generator, self.show_equivalence, self.show_equivalence_error,
+                            self.equiv_cancel_button)
+
+    def show_equivalence(self, outcome):
+        ssa1_text, ssa2_text, is_equivalent, tier, counterexamples, timings = outcome
+
+        # Display SSA forms
+        self.ssa1_output.setText(ssa1_text)
+        self.ssa2_output.setText(ssa2_text)
+
+        if is_equivalent is None:
+            self.equiv_result.setText("Result: UNKNOWN. The solver ran out of time or was interrupted.")
+        elif is_equivalent:
+            self.equiv_result.setText("Result: The programs are semantically equivalent for all inputs.")
+        else:
+            if not counterexamples:
+                self.equiv_result.setText("Result: The programs are NOT semantically equivalent, but no counterexample could be generated.")
+            else:
+                self.equiv_result.setText("Result: The programs are NOT semantically equivalent. Counterexamples are shown below.")
+                self.display_counterexamples(counterexamples)
+        self.statusBar().showMessage(f"Done ({format_timings(timings)}; answered by: {tier or 'none'})")
+
+    def show_equivalence_error(self, message):
+        self.equiv_result.setText(f"Error during equivalence check: {message}")
+        self.statusBar().clearMessage()
     
     def display_examples(self, examples):
         if not examples:
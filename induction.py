@@ -0,0 +1,241 @@
+# Unbounded verification of loops by k-induction
+# Instead of unrolling a loop as many times as it iterates, every loop is
+# checked with two formulas of size proportional to k: a base case (the
+# first k iterations from the real entry state cannot fail) and a step case
+# (from an arbitrary, "havocked" loop state, k iterations that do not fail
+# are never followed by one that does). User invariants, written as
+# invariant(...) statements in a loop body, strengthen the property
+# checked at every loop head.
+from z3 import Or, sat, unsat
+
+from ast_nodes import UnaryOp, If, While, For
+from ssa import SSAConverter, assigned_names
+from smt import SMTGenerator, model_value
+
+def split_loops(statements):
+    """
+    Split a program into the straight-line segments around its top-level loops.
+
+    Returns:
+        tuple: (segments, loops) - segments[j] runs before loops[j] and
+            segments[j + 1] after it, so there is one more segment than loops;
+            None if a loop is nested in a branch or another loop
+    """
+    segments, loops = [[]], []
+
+    def contains_loop(stmts):
+        for stmt in stmts:
+            if isinstance(stmt, list) and contains_loop(stmt):
+                return True
+            if isinstance(stmt, (While, For)):
+                return True
+            if isinstance(stmt, If) and (contains_loop(stmt.body) or contains_loop(stmt.orelse or [])):
+                return True
+        return False
+
+    def visit(stmts):
+        for stmt in stmts:
+            if isinstance(stmt, list):
+                if not visit(stmt):
+                    return False
+            elif isinstance(stmt, (While, For)):
+                if contains_loop(stmt.body):
+                    return False
+                if isinstance(stmt, For) and stmt.init is not None:
+                    segments[-1].append(stmt.init)
+                loops.append(stmt)
+                segments.append([])
+            elif isinstance(stmt, If) and contains_loop([stmt]):
+                return False
+            else:
+                segments[-1].append(stmt)
+        return True
+
+    if not visit(statements):
+        return None
+    return segments, loops
+
+
+class KInduction:
+    """
+    k-induction prover for programs whose loops are at the top level.
+
+    The property of a loop is checked at the head of every iteration: its
+    invariants hold, and the next step - one more iteration if the condition
+    holds, the code up to the next loop if it does not - cannot fail an
+    assertion. For each loop in turn and k = 1, 2, ...:
+
+    - base case: from the program start, the property holds at the first k
+      loop heads;
+    - step case: from any state of the loop variables (the variables the
+      body assigns are havocked), if the property holds at k consecutive
+      heads it holds at the next one.
+
+    Once both hold, the property holds at every head the loop reaches, so
+    later checks replace the loop by a summary: havoc its variables and
+    assume its invariants and exit condition. Assertions already proved are
+    assumed by later checks.
+    """
+
+    def __init__(self, generator=None):
+        self.generator = generator if generator is not None else SMTGenerator()
+        self.history = []   # (loop index, k, base result, step result) of every check
+        self.reason = None  # why the last check returned "unknown"
+
+    def check(self, statements, max_k=10):
+        """
+        Prove that no assertion (or invariant) of a program can fail, for any
+        number of loop iterations.
+
+        Args:
+            statements: Program statements from parse_program
+            max_k (int): Largest induction depth to try per loop
+
+        Returns:
+            tuple: (status, k, counterexample) - status is "proved" (k is the
+                largest induction depth needed), "violated" (k is the number
+                of loop iterations before the failure and counterexample maps
+                the program inputs to failing values) or "unknown" (see reason)
+        """
+        self.history = []
+        self.reason = None
+        parts = split_loops(statements)
+        if parts is None:
+            self.reason = "loops nested in branches or other loops are not supported"
+            return "unknown", 0, None
+        segments, loops = parts
+
+        # The code before the first loop is checked exactly
+        converter = SSAConverter(width=self.generator.width)
+        converter.convert_statements(segments[0], 0)
+        result, counterexample = self.find_violation(converter.finish(0))
+        if result == sat:
+            return "violated", 0, counterexample
+        if result != unsat:
+            self.reason = "the solver gave up on the code before the first loop"
+            return "unknown", 0, None
+
+        proved_k = 0
+        for index in range(len(loops)):
+            for k in range(1, max_k + 1):
+                base, counterexample = self.find_violation(self.base_case(segments, loops, index, k))
+                if base == sat:
+                    self.history.append((index, k, str(base), None))
+                    if index == 0:
+                        # Nothing before the first loop is summarized, so the run is real
+                        return "violated", k - 1, counterexample
+                    self.reason = (f"loop {index + 1} fails after the summary of an earlier loop; "
+                                   f"the earlier loop may need a stronger invariant")
+                    return "unknown", k, None
+                if base != unsat:
+                    self.history.append((index, k, str(base), None))
+                    self.reason = f"the solver gave up on the base case of loop {index + 1}"
+                    return "unknown", k, None
+                step, _ = self.find_violation(self.step_case(segments, loops, index, k))
+                self.history.append((index, k, str(base), str(step)))
+                if step == unsat:
+                    proved_k = max(proved_k, k)
+                    break
+                if step != sat:
+                    self.reason = f"the solver gave up on the step case of loop {index + 1}"
+                    return "unknown", k, None
+            else:
+                self.reason = (f"loop {index + 1} is not {max_k}-inductive; "
+                               f"add an invariant(...) to its body")
+                return "unknown", max_k, None
+        return "proved", proved_k, None
+
+    def prefix(self, converter, segments, loops, index):
+        """Convert the program up to loop index, summarizing the loops before it."""
+        converter.assume_asserts = True
+        converter.convert_statements(segments[0], 0)
+        for loop, segment in zip(loops[:index], segments[1:index + 1]):
+            self.summarize(converter, loop)
+            converter.convert_statements(segment, 0)
+
+    def summarize(self, converter, loop):
+        """Replace a proved loop by an arbitrary state satisfying its invariants and exit condition."""
+        invariants, body = converter.loop_parts(loop)
+        for name in assigned_names(body):
+            converter.havoc(name, loop.lineno)
+        for invariant in invariants:
+            converter.assume(invariant)
+        converter.assume_exit(loop)
+
+    def iteration(self, converter, loop, exit_segment):
+        """
+        Check (or assume) the property at one loop head, then run one
+        iteration if the loop condition holds.
+        """
+        invariants, body = converter.loop_parts(loop)
+        for invariant in invariants:
+            converter.emit_check(invariant)
+        # The code after the loop runs on this state if the loop exits here
+        exit_condition = UnaryOp('!', converter.rename(loop.condition), loop.lineno, loop.col)
+        converter.convert_guarded(exit_condition, exit_segment, 0, loop.lineno)
+        condition = converter.rename(loop.condition)
+        converter.convert_branch(condition, body, None, 0, loop.lineno)
+
+    def base_case(self, segments, loops, index, k):
+        """Program checking the property at the first k heads of loop index."""
+        converter = SSAConverter(width=self.generator.width)
+        self.prefix(converter, segments, loops, index)
+        converter.assume_asserts = False
+        for i in range(k):
+            self.iteration(converter, loops[index], segments[index + 1])
+        return converter.finish(k)
+
+    def step_case(self, segments, loops, index, k):
+        """Program checking that k heads satisfying the property are followed by one that does."""
+        converter = SSAConverter(width=self.generator.width)
+        self.prefix(converter, segments, loops, index)
+        loop = loops[index]
+        _, body = converter.loop_parts(loop)
+        for name in assigned_names(body):
+            converter.havoc(name, loop.lineno)
+        for i in range(k):
+            self.iteration(converter, loop, segments[index + 1])
+        converter.assume_asserts = False
+        self.iteration(converter, loop, segments[index + 1])
+        return converter.finish(k)
+
+    def find_violation(self, program):
+        """
+        Search for a run of an SSA program that fails one of its assertions.
+
+        Returns:
+            tuple: (result, counterexample) - counterexample maps the program
+                inputs to failing values if the result is sat
+        """
+        generator = self.generator
+        generator.reset()
+        builder = generator.new_builder(program)
+        constraints, violations = [], []
+        generator.encode_block(program, 0, None, builder, constraints, violations)
+        if not violations:
+            return unsat, None
+        generator.solver.add(constraints)
+        generator.solver.add(Or(violations))
+        result = generator.run_check()
+        if result != sat:
+            return result, None
+        model = generator.model()
+        counterexample = {program.base_name(value): model_value(model, generator.value_var(program, value))
+                          for value in program.inputs}
+        return result, counterexample
+
+# Example usage
+if __name__ == "__main__":
+    from parser import parse_program
+
+    statements = parse_program("""
+x := 0;
+while (x < n) {
+    invariant(x <= n || n < 0);
+    x := x + 1;
+}
+assert(x == n || n < 0);
+""")
+    prover = KInduction()
+    print(prover.check(statements))
+    print(prover.history)
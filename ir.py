@@ -0,0 +1,217 @@
+# SSA intermediate representation
+# Produced by SSAConverter and consumed directly by SMTGenerator, so the SSA
+# never has to be serialized to text and parsed back. The text form is only
+# built on demand (e.g. for the GUI's SSA pane).
+from ast_nodes import Expr, UnaryOp, BinOp, format_expr
+
+# Instruction opcodes
+ASSIGN = 'assign'    # dest := args[0]
+ASSERT = 'assert'    # args[0] must hold
+ASSUME = 'assume'    # args[0] restricts the executions considered (loop exit after unrolling)
+BRANCH = 'branch'    # if args[0] then block args[1] else block args[2] (None if absent)
+PHI = 'phi'          # dest := args[1] if args[0] holds, else args[2] (both value ids)
+HAVOC = 'havoc'      # dest := an arbitrary value (loop state at an unknown iteration)
+
+
+class Ref(Expr):
+    """Expression leaf referring to an SSA value by its id."""
+    __slots__ = ('value',)
+    _fields = ('value',)
+
+    def __init__(self, value, lineno=0, col=0):
+        super().__init__(lineno, col)
+        self.value = value
+
+
+def expr_values(expr):
+    """Return the set of SSA value ids an IR expression reads."""
+    if isinstance(expr, Ref):
+        return {expr.value}
+    if isinstance(expr, BinOp):
+        return expr_values(expr.left) | expr_values(expr.right)
+    if isinstance(expr, UnaryOp):
+        return expr_values(expr.operand)
+    return set()
+
+
+class Instr:
+    """A single SSA instruction."""
+    __slots__ = ('op', 'dest', 'args', 'lineno')
+
+    def __init__(self, op, dest=None, args=(), lineno=0):
+        self.op = op
+        self.dest = dest    # value id defined by the instruction, or None
+        self.args = args    # operand expressions and block ids, depending on op
+        self.lineno = lineno
+
+    def __repr__(self):
+        return f"Instr({self.op!r}, dest={self.dest!r}, args={self.args!r})"
+
+
+class SSAProgram:
+    """
+    A program in SSA form.
+
+    Source variables and SSA values are numbered with small integers:
+    every variable has an id, and every version of a variable is a separate
+    value id. Instructions are grouped into blocks; block 0 is the entry
+    block and BRANCH instructions refer to their branches by block id. The
+    PHI instructions following a BRANCH merge the versions defined in its
+    branches.
+    """
+
+    def __init__(self):
+        self.var_ids = {}          # variable name -> variable id
+        self.var_names = []        # variable id -> variable name
+        self.next_version = []     # variable id -> next unused version number
+        self.value_vars = []       # value id -> variable id
+        self.value_versions = []   # value id -> version number
+        self.value_is_input = []   # value id -> True if read before any assignment (a program input)
+        self.blocks = [[]]         # block id -> list of instructions
+        self.final_values = {}     # variable id -> value id live at the end of the program
+        self.unroll_depth = None   # loop unrolling depth the program was converted with
+        self.dead_values = set()   # value ids whose definitions were removed by optimization
+        self.optimization = None   # counts reported by SSAConverter.optimize_ssa, if it ran
+
+    # Variables and values
+
+    def var_id(self, var_name):
+        """Return the id of a variable, registering it on first sight."""
+        var_id = self.var_ids.get(var_name)
+        if var_id is None:
+            var_id = len(self.var_names)
+            self.var_ids[var_name] = var_id
+            self.var_names.append(var_name)
+            self.next_version.append(0)
+        return var_id
+
+    def new_value(self, var_id, is_input=False):
+        """Create the next version of a variable and return its value id."""
+        value = len(self.value_vars)
+        self.value_vars.append(var_id)
+        self.value_versions.append(self.next_version[var_id])
+        self.value_is_input.append(is_input)
+        self.next_version[var_id] += 1
+        return value
+
+    def value_name(self, value):
+        """Return the printable SSA name of a value, e.g. "x_2"."""
+        return f"{self.var_names[self.value_vars[value]]}_{self.value_versions[value]}"
+
+    def base_name(self, value):
+        """Return the source variable name of a value."""
+        return self.var_names[self.value_vars[value]]
+
+    def final_value(self, var_name):
+        """Return the value id holding var_name at the end of the program, or None."""
+        var_id = self.var_ids.get(var_name)
+        if var_id is None:
+            return None
+        return self.final_values.get(var_id)
+
+    def assigned_vars(self):
+        """Names of the variables the program assigns, in order of first appearance."""
+        return [self.var_names[var_id] for var_id, value in sorted(self.final_values.items())
+                if not self.value_is_input[value]]
+
+    @property
+    def num_values(self):
+        return len(self.value_vars)
+
+    @property
+    def inputs(self):
+        """Value ids of the program inputs, in order of first use."""
+        return [value for value, is_input in enumerate(self.value_is_input) if is_input]
+
+    def used_inputs(self):
+        """
+        Value ids of the inputs that some instruction still reads (after
+        optimization or slicing some may no longer be), in order of first use.
+        """
+        used = set()
+        for instr, _ in self.instructions():
+            if instr.op == PHI:
+                used.update(instr.args[1:])
+            if instr.args and isinstance(instr.args[0], Expr):
+                used.update(expr_values(instr.args[0]))
+        return [value for value in self.inputs if value in used]
+
+    # Blocks
+
+    def new_block(self):
+        """Create an empty block and return its id."""
+        self.blocks.append([])
+        return len(self.blocks) - 1
+
+    def instructions(self, block=0):
+        """
+        Yield (instr, depth) for every instruction reachable from a block, in
+        program order, descending into branches.
+        """
+        stack = [(iter(self.blocks[block]), 0)]
+        while stack:
+            instrs, depth = stack[-1]
+            instr = next(instrs, None)
+            if instr is None:
+                stack.pop()
+                continue
+            yield instr, depth
+            if instr.op == BRANCH:
+                _, then_block, else_block = instr.args
+                # Push the else branch first so the then branch is visited first
+                if else_block is not None:
+                    stack.append((iter(self.blocks[else_block]), depth + 1))
+                stack.append((iter(self.blocks[then_block]), depth + 1))
+
+    def __len__(self):
+        return sum(len(block) for block in self.blocks)
+
+    # Text form
+
+    def format_expr(self, expr):
+        """Render an IR expression with SSA value names."""
+        return format_expr(expr, lambda ref: self.value_name(ref.value))
+
+    def format_instr(self, instr):
+        """Render a single instruction (without the blocks of a branch)."""
+        if instr.op == ASSIGN:
+            return f"{self.value_name(instr.dest)} := {self.format_expr(instr.args[0])}"
+        if instr.op == PHI:
+            condition, then_value, else_value = instr.args
+            return (f"{self.value_name(instr.dest)} := phi({self.format_expr(condition)}, "
+                    f"{self.value_name(then_value)}, {self.value_name(else_value)})")
+        if instr.op == BRANCH:
+            return f"if ({self.format_expr(instr.args[0])})"
+        if instr.op == HAVOC:
+            return f"{self.value_name(instr.dest)} := havoc()"
+        return f"{instr.op}({self.format_expr(instr.args[0])})"
+
+    def to_lines(self, block=0, indent="    "):
+        """
+        Return the program as a list of text lines, with branch bodies
+        indented under their "if"/"else" headers.
+        """
+        lines = []
+        for instr in self.blocks[block]:
+            self._format_tree(instr, "", indent, lines)
+        return lines
+
+    def format_tree(self, instr, indent="    "):
+        """Render an instruction together with the blocks of a branch."""
+        lines = []
+        self._format_tree(instr, "", indent, lines)
+        return "\n".join(lines)
+
+    def _format_tree(self, instr, prefix, indent, lines):
+        lines.append(prefix + self.format_instr(instr))
+        if instr.op == BRANCH:
+            _, then_block, else_block = instr.args
+            for nested in self.blocks[then_block]:
+                self._format_tree(nested, prefix + indent, indent, lines)
+            if else_block is not None:
+                lines.append(prefix + "else")
+                for nested in self.blocks[else_block]:
+                    self._format_tree(nested, prefix + indent, indent, lines)
+
+    def __str__(self):
+        return "\n".join(self.to_lines())
@@ -1,35 +1,28 @@
-import ply.lex as lex
-import ply.yacc as yacc
-
-# List of token names
-tokens = (
-    'NUMBER',
-    'IDENTIFIER',
-    'ASSIGN',
-    'PLUS',
-    'MINUS',
-    'TIMES',
-    'DIVIDE',
-    'LPAREN',
-    'RPAREN',
-    'LBRACE',
-    'RBRACE',
-    'SEMICOLON',
-    'IF',
-    'ELSE',
-    'WHILE',
-    'FOR',
-    'ASSERT',
-    'LT',
-    'GT',
-    'EQ',
-    'LE',
-    'GE',
-    'NE',
-)
-
-# Regular expression rules for simple tokens
-...
+import os
+
+from ast_nodes import Num, Var, UnaryOp, BinOp, Assign, If, While, For, Assert, Invariant
+
+
+class ParseError(Exception):
+    """Raised when the program text cannot be tokenized or parsed."""
+
+    def __init__(self, message, lineno=0, col=0):
+        if lineno:
+            message = f"{message} (line {lineno}, column {col})"
+        super().__init__(message)
+        self.lineno = lineno
+        self.col = col
+
+
+# Keywords are lexed as identifiers first and then looked up here
+reserved = {
+    'if': 'IF',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'for': 'FOR',
+    'assert': 'ASSERT',
+    'invariant': 'INVARIANT',
+}
 
 # A regular expression rule with some action code
 # Note addition of self parameter since we're in a class
@@ -48,18 +41,16 @@ class MiniLangLexer:
         'LBRACE',
         'RBRACE',
         'SEMICOLON',
-        'IF',
-        'ELSE',
-        'WHILE',
-        'FOR',
-        'ASSERT',
         'LT',
         'GT',
         'EQ',
         'LE',
         'GE',
         'NE',
-    )
+        'NOT',
+        'AND',
+        'OR',
+    ) + tuple(reserved.values())
 
     # Regular expression rules for simple tokens
     t_ASSIGN = r':='
@@ -78,6 +69,12 @@ class MiniLangLexer:
     t_LE = r'<='
     t_GE = r'>='
     t_NE = r'!='
+    t_NOT = r'!'
+    t_AND = r'&&'
+    t_OR = r'\|\|'
+
+    # Line comments are dropped by the lexer
+    t_ignore_COMMENT = r'//[^\n]*'
 
     # Regular expression rules with some action code
     def t_NUMBER(self, t):
@@ -87,241 +84,233 @@ class MiniLangLexer:
 
     def t_IDENTIFIER(self, t):
         r'[a-zA-Z_][a-zA-Z_0-9]*'
+        t.type = reserved.get(t.value, 'IDENTIFIER')
         return t
 
     # Define a rule so we can track line numbers
     def t_newline(self, t):
         r'\n+'
         t.lexer.lineno += len(t.value)
+        t.lexer.line_start = t.lexpos + len(t.value)
 
     # A string containing ignored characters (spaces and tabs)
-    t_ignore = ' \t'
+    t_ignore = ' \t\r'
 
     # Error handling rule
     def t_error(self, t):
-        print(f"Illegal character '{t.value[0]}'")
-        t.lexer.skip(1)
+        col = t.lexpos - t.lexer.line_start + 1
+        raise ParseError(f"Illegal character '{t.value[0]}'", t.lexer.lineno, col)
 
     # Build the lexer
     def build(self, **kwargs):
+        import ply.lex as lex
         self.lexer = lex.lex(module=self, **kwargs)
 
+    def input(self, data):
+        """Reset position tracking and feed new program text to the lexer."""
+        self.lexer.lineno = 1
+        self.lexer.line_start = 0
+        self.lexer.input(data)
+
     # Test it output
     def test(self, data):
-        self.lexer.input(data)
+        self.input(data)
         while True:
             tok = self.lexer.token()
             if not tok:
                 break
             print(tok)
 
-# Build the lexer
-lexer = MiniLangLexer()
-lexer.build()
-
-# Test the lexer
-lexer.test("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);")
-
-# Parser rules
-precedence = (
-    ('left', 'PLUS', 'MINUS'),
-    ('left', 'TIMES', 'DIVIDE'),
-)
-
-# dictionary of names
-names = {}
-
-def p_statement_assign(p):
-    'statement : IDENTIFIER ASSIGN expression SEMICOLON'
-    names[p[1]] = p[3]
-
-def p_expression_binop(p):
-    '''expression : expression PLUS expression
-                  | expression MINUS expression
-                  | expression TIMES expression
-                  | expression DIVIDE expression'''
-    if p[2] == '+':
-        p[0] = p[1] + p[3]
-    elif p[2] == '-':
-        p[0] = p[1] - p[3]
-    elif p[2] == '*':
-        p[0] = p[1] * p[3]
-    elif p[2] == '/':
-        p[0] = p[1] / p[3]
-
-def p_expression_number(p):
-    'expression : NUMBER'
-    p[0] = p[1]
-
-def p_expression_identifier(p):
-    'expression : IDENTIFIER'
-    try:
-        p[0] = names[p[1]]
-    except LookupError:
-        print(f"Undefined name '{p[1]}'")
-        p[0] = 0
-
-def p_error(p):
-    print(f"Syntax error at '{p.value}'")
-
-# Build the parser
-parser = yacc.yacc()
-
-# Test the parser
-parser.parse("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);")
+
+class MiniLangParser:
+    """
+    LALR grammar for the mini-language. Parsing produces a list of statement
+    nodes from ast_nodes; every node records the line and column it started at.
+    """
+    tokens = MiniLangLexer.tokens
+
+    precedence = (
+        ('left', 'OR'),
+        ('left', 'AND'),
+        ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NE'),
+        ('left', 'PLUS', 'MINUS'),
+        ('left', 'TIMES', 'DIVIDE'),
+        ('right', 'NOT', 'UMINUS'),
+    )
+
+    def _pos(self, p, n):
+        """Return the (line, column) of symbol n in the production."""
+        lexpos = p.lexpos(n)
+        return p.lineno(n), lexpos - self.source.rfind('\n', 0, lexpos)
+
+    # Statements
+
+    def p_program(self, p):
+        'program : statement_list'
+        p[0] = p[1]
+
+    def p_statement_list(self, p):
+        'statement_list : statement_list statement'
+        if p[2] is not None:
+            p[1].append(p[2])
+        p[0] = p[1]
+
+    def p_statement_list_empty(self, p):
+        'statement_list : '
+        p[0] = []
+
+    def p_statement_assign(self, p):
+        'statement : assignment SEMICOLON'
+        p[0] = p[1]
+
+    def p_statement_empty(self, p):
+        'statement : SEMICOLON'
+        p[0] = None
+
+    def p_assignment(self, p):
+        'assignment : IDENTIFIER ASSIGN expression'
+        p[0] = Assign(p[1], p[3], *self._pos(p, 1))
+
+    def p_statement_if(self, p):
+        '''statement : IF LPAREN expression RPAREN block
+                     | IF LPAREN expression RPAREN block ELSE block'''
+        orelse = p[7] if len(p) == 8 else None
+        p[0] = If(p[3], p[5], orelse, *self._pos(p, 1))
+
+    def p_statement_else_if(self, p):
+        'statement : IF LPAREN expression RPAREN block ELSE statement'
+        # "else if" chains nest the second if inside the else branch
+        p[0] = If(p[3], p[5], [p[7]], *self._pos(p, 1))
+
+    def p_statement_while(self, p):
+        'statement : WHILE LPAREN expression RPAREN block'
+        p[0] = While(p[3], p[5], *self._pos(p, 1))
+
+    def p_statement_for(self, p):
+        'statement : FOR LPAREN optional_assignment SEMICOLON expression SEMICOLON optional_assignment RPAREN block'
+        p[0] = For(p[3], p[5], p[7], p[9], *self._pos(p, 1))
+
+    def p_optional_assignment(self, p):
+        '''optional_assignment : assignment
+                               | '''
+        p[0] = p[1] if len(p) == 2 else None
+
+    def p_statement_assert(self, p):
+        'statement : ASSERT LPAREN expression RPAREN SEMICOLON'
+        p[0] = Assert(p[3], *self._pos(p, 1))
+
+    def p_statement_invariant(self, p):
+        'statement : INVARIANT LPAREN expression RPAREN SEMICOLON'
+        p[0] = Invariant(p[3], *self._pos(p, 1))
+
+    def p_block(self, p):
+        'block : LBRACE statement_list RBRACE'
+        p[0] = p[2]
+
+    # Expressions
+
+    def p_expression_binop(self, p):
+        '''expression : expression PLUS expression
+                      | expression MINUS expression
+                      | expression TIMES expression
+                      | expression DIVIDE expression
+                      | expression LT expression
+                      | expression GT expression
+                      | expression LE expression
+                      | expression GE expression
+                      | expression EQ expression
+                      | expression NE expression
+                      | expression AND expression
+                      | expression OR expression'''
+        p[0] = BinOp(p[2], p[1], p[3], p[1].lineno, p[1].col)
+
+    def p_expression_not(self, p):
+        'expression : NOT expression'
+        p[0] = UnaryOp('!', p[2], *self._pos(p, 1))
+
+    def p_expression_uminus(self, p):
+        'expression : MINUS expression %prec UMINUS'
+        operand = p[2]
+        if isinstance(operand, Num):
+            # Fold negative literals so "-10" stays a single constant
+            p[0] = Num(-operand.value, *self._pos(p, 1))
+        else:
+            p[0] = UnaryOp('-', operand, *self._pos(p, 1))
+
+    def p_expression_group(self, p):
+        'expression : LPAREN expression RPAREN'
+        p[0] = p[2]
+
+    def p_expression_number(self, p):
+        'expression : NUMBER'
+        p[0] = Num(p[1], *self._pos(p, 1))
+
+    def p_expression_identifier(self, p):
+        'expression : IDENTIFIER'
+        p[0] = Var(p[1], *self._pos(p, 1))
+
+    def p_error(self, p):
+        if p is None:
+            raise ParseError("Syntax error: unexpected end of program")
+        lineno, col = p.lineno, p.lexpos - self.source.rfind('\n', 0, p.lexpos)
+        raise ParseError(f"Syntax error at '{p.value}'", lineno, col)
+
+    # Build the parser
+    def build(self, lexer, **kwargs):
+        import ply.yacc as yacc
+        self.lexer = lexer
+        self.source = ""
+        self.parser = yacc.yacc(module=self, start='program', **kwargs)
+
+    def parse(self, data):
+        self.source = data
+        self.lexer.input(data)
+        return self.parser.parse(lexer=self.lexer.lexer)
+
+# Directory holding the generated parsetab.py table module
+_TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Parser instance shared by all parse_program calls, built on first use
+_parser = None
+
+def get_parser():
+    """
+    Return the shared parser, building the lexer and LALR tables on first use.
+
+    The tables are written to parsetab.py next to this module, so later
+    processes load them instead of regenerating the grammar automaton.
+
+    Returns:
+        MiniLangParser: The ready-to-use parser
+    """
+    global _parser
+    if _parser is None:
+        lexer = MiniLangLexer()
+        lexer.build()
+        parser = MiniLangParser()
+        parser.build(lexer, debug=False, write_tables=True,
+                     tabmodule='parsetab', outputdir=_TABLE_DIR)
+        _parser = parser
+    return _parser
 
 def parse_program(program_text):
     """
     Parse a program written in the mini-language.
-    
+
     Args:
         program_text (str): The program text to parse
-        
+
     Returns:
-        list: List of parsed statements
+        list: List of parsed statements (ast_nodes.Stmt instances)
+
+    Raises:
+        ParseError: If the program contains a lexical or syntax error
     """
-    # Main outer statements list
-    statements = []
-    
-    # Stack for tracking nested blocks
-    block_stack = []
-    current_block = statements
-    
-    # Preprocess the program text to normalize spacing
-    lines = []
-    for line in program_text.splitlines():
-        line = line.strip()
-        if line:  # Skip empty lines
-            # Temporarily normalize braces
-            if line.endswith('{'):
-                line = line[:-1].strip()
-                lines.append(line)
-                lines.append('{')
-            elif line == '}' or line == '};':
-                lines.append('}')
-            elif line.endswith(';}'):
-                line = line[:-2].strip() + ';'
-                lines.append(line)
-                lines.append('}')
-            else:
-                lines.append(line)
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Handle semicolons
-        if line.endswith(';'):
-            line = line[:-1].strip()
-        
-        # Assignment statements
-        if ':=' in line:
-            parts = line.split(':=', 1)
-            if len(parts) == 2:
-                var, expr = parts
-                current_block.append({'type': 'assign', 'var': var.strip(), 'expr': expr.strip()})
-        
-        # If statements
-        elif line.startswith('if'):
-            # Extract condition between parentheses
-            open_paren = line.find('(')
-            close_paren = line.rfind(')')
-            
-            if open_paren >= 0 and close_paren >= 0:
-                condition = line[open_paren+1:close_paren].strip()
-                if_block = {'type': 'if', 'condition': condition, 'body': []}
-                current_block.append(if_block)
-                block_stack.append((current_block, if_block))
-                current_block = if_block['body']
-        
-        # Else statements
-        elif line.startswith('else'):
-            if block_stack:
-                parent_block, parent_stmt = block_stack.pop()
-                if parent_stmt.get('type') == 'if':
-                    parent_stmt['else'] = []
-                    current_block = parent_stmt['else']
-                    block_stack.append((parent_block, parent_stmt))
-        
-        # While loops
-        elif line.startswith('while'):
-            # Extract condition between parentheses
-            open_paren = line.find('(')
-            close_paren = line.rfind(')')
-            
-            if open_paren >= 0 and close_paren >= 0:
-                condition = line[open_paren+1:close_paren].strip()
-                while_block = {'type': 'while', 'condition': condition, 'body': []}
-                current_block.append(while_block)
-                block_stack.append((current_block, while_block))
-                current_block = while_block['body']
-        
-        # For loops
-        elif line.startswith('for'):
-            # Extract the three parts from the for loop: init; condition; update
-            open_paren = line.find('(')
-            close_paren = line.rfind(')')
-            
-            if open_paren >= 0 and close_paren >= 0:
-                for_parts = line[open_paren+1:close_paren].strip()
-                parts = for_parts.split(';')
-                
-                if len(parts) == 3:
-                    init_part = parts[0].strip()
-                    condition_part = parts[1].strip()
-                    update_part = parts[2].strip()
-                    
-                    for_block = {
-                        'type': 'for',
-                        'condition': condition_part,
-                        'body': []
-                    }
-                    
-                    # Parse initialization part
-                    if ':=' in init_part:
-                        init_var, init_expr = init_part.split(':=', 1)
-                        for_block['init'] = {'var': init_var.strip(), 'expr': init_expr.strip()}
-                    
-                    # Parse update part
-                    if ':=' in update_part:
-                        update_var, update_expr = update_part.split(':=', 1)
-                        for_block['update'] = {'var': update_var.strip(), 'expr': update_expr.strip()}
-                    
-                    current_block.append(for_block)
-                    block_stack.append((current_block, for_block))
-                    current_block = for_block['body']
-        
-        # Block opening
-        elif line == '{':
-            # Opening brace already handled by if/else/while/for
-            pass
-        
-        # Block closing
-        elif line == '}':
-            if block_stack:
-                current_block, _ = block_stack.pop()
-        
-        # Assert statements
-        elif line.startswith('assert'):
-            # Extract condition between parentheses
-            open_paren = line.find('(')
-            close_paren = line.rfind(')')
-            
-            if open_paren >= 0 and close_paren >= 0:
-                condition = line[open_paren+1:close_paren].strip()
-                current_block.append({'type': 'assert', 'condition': condition})
-        
-        i += 1
-    
-    return statements
+    return get_parser().parse(program_text)
 
 # Example usage
-program_text = """
+if __name__ == "__main__":
+    program_text = """
 x := 3;
 if (x < 5) {
     y := x + 1;
@@ -330,5 +319,6 @@ if (x < 5) {
 }
 assert(y > 0);
 """
-parsed_statements = parse_program(program_text)
-print("Parsed Statements:", parsed_statements) 
\ No newline at end of file
+    get_parser().lexer.test(program_text)
+    parsed_statements = parse_program(program_text)
+    print("Parsed Statements:", parsed_statements)
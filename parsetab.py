@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'leftPLUSMINUSleftTIMESDIVIDEASSERT ASSIGN DIVIDE ELSE EQ FOR GE GT IDENTIFIER IF LBRACE LE LPAREN LT MINUS NE NUMBER PLUS RBRACE RPAREN SEMICOLON TIMES WHILEstatement : IDENTIFIER ASSIGN expression SEMICOLONexpression : expression PLUS expression\n| expression MINUS expression\n| expression TIMES expression\n| expression DIVIDE expressionexpression : NUMBERexpression : IDENTIFIER'
+_lr_signature = 'programleftORleftANDnonassocLTGTLEGEEQNEleftPLUSMINUSleftTIMESDIVIDErightNOTUMINUSAND ASSERT ASSIGN DIVIDE ELSE EQ FOR GE GT IDENTIFIER IF INVARIANT LBRACE LE LPAREN LT MINUS NE NOT NUMBER OR PLUS RBRACE RPAREN SEMICOLON TIMES WHILEprogram : statement_liststatement_list : statement_list statementstatement_list : statement : assignment SEMICOLONstatement : SEMICOLONassignment : IDENTIFIER ASSIGN expressionstatement : IF LPAREN expression RPAREN block\n                     | IF LPAREN expression RPAREN block ELSE blockstatement : IF LPAREN expression RPAREN block ELSE statementstatement : WHILE LPAREN expression RPAREN blockstatement : FOR LPAREN optional_assignment SEMICOLON expression SEMICOLON optional_assignment RPAREN blockoptional_assignment : assignment\n                               | statement : ASSERT LPAREN expression RPAREN SEMICOLONstatement : INVARIANT LPAREN expression RPAREN SEMICOLONblock : LBRACE statement_list RBRACEexpression : expression PLUS expression\n                      | expression MINUS expression\n                      | expression TIMES expression\n                      | expression DIVIDE expression\n                      | expression LT expression\n                      | expression GT expression\n                      | expression LE expression\n                      | expression GE expression\n                      | expression EQ expression\n                      | expression NE expression\n                      | expression AND expression\n                      | expression OR expressionexpression : NOT expressionexpression : MINUS expression %prec UMINUSexpression : LPAREN expression RPARENexpression : NUMBERexpression : IDENTIFIER'
     
-_lr_action_items = {'IDENTIFIER':([0,3,8,9,10,11,],[2,4,4,4,4,4,]),'$end':([1,7,],[0,-1,]),'ASSIGN':([2,],[3,]),'NUMBER':([3,8,9,10,11,],[6,6,6,6,6,]),'SEMICOLON':([4,5,6,12,13,14,15,],[-7,7,-6,-2,-3,-4,-5,]),'PLUS':([4,5,6,12,13,14,15,],[-7,8,-6,-2,-3,-4,-5,]),'MINUS':([4,5,6,12,13,14,15,],[-7,9,-6,-2,-3,-4,-5,]),'TIMES':([4,5,6,12,13,14,15,],[-7,10,-6,10,10,-4,-5,]),'DIVIDE':([4,5,6,12,13,14,15,],[-7,11,-6,11,11,-4,-5,]),}
+_lr_action_items = {'SEMICOLON':([0,2,3,4,5,12,15,23,24,26,27,30,45,46,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,73,74,75,78,],[-3,5,-2,12,-5,-4,-13,-32,-33,48,-12,-6,-30,-29,68,69,-31,-7,-3,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-10,72,-14,-15,5,5,-8,-9,-16,-11,]),'IF':([0,2,3,5,12,52,53,66,68,69,70,71,73,74,75,78,],[-3,6,-2,-5,-4,-7,-3,-10,-14,-15,6,6,-8,-9,-16,-11,]),'WHILE':([0,2,3,5,12,52,53,66,68,69,70,71,73,74,75,78,],[-3,7,-2,-5,-4,-7,-3,-10,-14,-15,7,7,-8,-9,-16,-11,]),'FOR':([0,2,3,5,12,52,53,66,68,69,70,71,73,74,75,78,],[-3,8,-2,-5,-4,-7,-3,-10,-14,-15,8,8,-8,-9,-16,-11,]),'ASSERT':([0,2,3,5,12,52,53,66,68,69,70,71,73,74,75,78,],[-3,9,-2,-5,-4,-7,-3,-10,-14,-15,9,9,-8,-9,-16,-11,]),'INVARIANT':([0,2,3,5,12,52,53,66,68,69,70,71,73,74,75,78,],[-3,10,-2,-5,-4,-7,-3,-10,-14,-15,10,10,-8,-9,-16,-11,]),'IDENTIFIER':([0,2,3,5,12,13,14,15,16,17,18,19,21,22,33,34,35,36,37,38,39,40,41,42,43,44,48,52,53,66,68,69,70,71,72,73,74,75,78,],[-3,11,-2,-5,-4,24,24,11,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,-7,-3,-10,-14,-15,11,11,11,-8,-9,-16,-11,]),'$end':([0,1,2,3,5,12,52,66,68,69,73,74,75,78,],[-3,0,-1,-2,-5,-4,-7,-10,-14,-15,-8,-9,-16,-11,]),'RBRACE':([3,5,12,52,53,66,68,69,71,73,74,75,78,],[-2,-5,-4,-7,-3,-10,-14,-15,75,-8,-9,-16,-11,]),'LPAREN':([6,7,8,9,10,13,14,16,17,18,19,21,22,33,34,35,36,37,38,39,40,41,42,43,44,48,],[13,14,15,16,17,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,]),'ASSIGN':([11,],[18,]),'NOT':([13,14,16,17,18,19,21,22,33,34,35,36,37,38,39,40,41,42,43,44,48,],[22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,]),'MINUS':([13,14,16,17,18,19,20,21,22,23,24,25,28,29,30,31,33,34,35,36,37,38,39,40,41,42,43,44,45,46,48,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[21,21,21,21,21,21,34,21,21,-32,-33,34,34,34,34,34,21,21,21,21,21,21,21,21,21,21,21,21,-30,-29,21,-31,-17,-18,-19,-20,34,34,34,34,34,34,34,34,34,]),'NUMBER':([13,14,16,17,18,19,21,22,33,34,35,36,37,38,39,40,41,42,43,44,48,],[23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,]),'RPAREN':([20,23,24,25,27,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,72,76,],[32,-32,-33,47,-12,49,50,-6,51,-30,-29,-31,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-13,77,]),'PLUS':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[33,-32,-33,33,33,33,33,33,-30,-29,-31,-17,-18,-19,-20,33,33,33,33,33,33,33,33,33,]),'TIMES':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[35,-32,-33,35,35,35,35,35,-30,-29,-31,35,35,-19,-20,35,35,35,35,35,35,35,35,35,]),'DIVIDE':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[36,-32,-33,36,36,36,36,36,-30,-29,-31,36,36,-19,-20,36,36,36,36,36,36,36,36,36,]),'LT':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[37,-32,-33,37,37,37,37,37,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,37,37,37,]),'GT':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[38,-32,-33,38,38,38,38,38,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,38,38,38,]),'LE':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[39,-32,-33,39,39,39,39,39,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,39,39,39,]),'GE':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[40,-32,-33,40,40,40,40,40,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,40,40,40,]),'EQ':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[41,-32,-33,41,41,41,41,41,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,41,41,41,]),'NE':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[42,-32,-33,42,42,42,42,42,-30,-29,-31,-17,-18,-19,-20,None,None,None,None,None,None,42,42,42,]),'AND':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[43,-32,-33,43,43,43,43,43,-30,-29,-31,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,43,43,]),'OR':([20,23,24,25,28,29,30,31,45,46,51,54,55,56,57,58,59,60,61,62,63,64,65,67,],[44,-32,-33,44,44,44,44,44,-30,-29,-31,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,44,]),'LBRACE':([32,47,70,77,],[53,53,53,53,]),'ELSE':([52,75,],[70,-16,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'statement':([0,],[1,]),'expression':([3,8,9,10,11,],[5,12,13,14,15,]),}
+_lr_goto_items = {'program':([0,],[1,]),'statement_list':([0,53,],[2,71,]),'statement':([2,70,71,],[3,74,3,]),'assignment':([2,15,70,71,72,],[4,27,4,4,27,]),'expression':([13,14,16,17,18,19,21,22,33,34,35,36,37,38,39,40,41,42,43,44,48,],[20,25,28,29,30,31,45,46,54,55,56,57,58,59,60,61,62,63,64,65,67,]),'optional_assignment':([15,72,],[26,76,]),'block':([32,47,70,77,],[52,66,73,78,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -26,12 +26,38 @@ for _k, _v in _lr_goto_items.items():
        _lr_goto[_x][_k] = _y
 del _lr_goto_items
 _lr_productions = [
-  ("S' -> statement","S'",1,None,None,None),
-  ('statement -> IDENTIFIER ASSIGN expression SEMICOLON','statement',4,'p_statement_assign','parser.py',125),
-  ('expression -> expression PLUS expression','expression',3,'p_expression_binop','parser.py',129),
-  ('expression -> expression MINUS expression','expression',3,'p_expression_binop','parser.py',130),
-  ('expression -> expression TIMES expression','expression',3,'p_expression_binop','parser.py',131),
-  ('expression -> expression DIVIDE expression','expression',3,'p_expression_binop','parser.py',132),
-  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',143),
-  ('expression -> IDENTIFIER','expression',1,'p_expression_identifier','parser.py',147),
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> statement_list','program',1,'p_program','parser.py',149),
+  ('statement_list -> statement_list statement','statement_list',2,'p_statement_list','parser.py',153),
+  ('statement_list -> <empty>','statement_list',0,'p_statement_list_empty','parser.py',159),
+  ('statement -> assignment SEMICOLON','statement',2,'p_statement_assign','parser.py',163),
+  ('statement -> SEMICOLON','statement',1,'p_statement_empty','parser.py',167),
+  ('assignment -> IDENTIFIER ASSIGN expression','assignment',3,'p_assignment','parser.py',171),
+  ('statement -> IF LPAREN expression RPAREN block','statement',5,'p_statement_if','parser.py',175),
+  ('statement -> IF LPAREN expression RPAREN block ELSE block','statement',7,'p_statement_if','parser.py',176),
+  ('statement -> IF LPAREN expression RPAREN block ELSE statement','statement',7,'p_statement_else_if','parser.py',181),
+  ('statement -> WHILE LPAREN expression RPAREN block','statement',5,'p_statement_while','parser.py',186),
+  ('statement -> FOR LPAREN optional_assignment SEMICOLON expression SEMICOLON optional_assignment RPAREN block','statement',9,'p_statement_for','parser.py',190),
+  ('optional_assignment -> assignment','optional_assignment',1,'p_optional_assignment','parser.py',194),
+  ('optional_assignment -> <empty>','optional_assignment',0,'p_optional_assignment','parser.py',195),
+  ('statement -> ASSERT LPAREN expression RPAREN SEMICOLON','statement',5,'p_statement_assert','parser.py',199),
+  ('statement -> INVARIANT LPAREN expression RPAREN SEMICOLON','statement',5,'p_statement_invariant','parser.py',203),
+  ('block -> LBRACE statement_list RBRACE','block',3,'p_block','parser.py',207),
+  ('expression -> expression PLUS expression','expression',3,'p_expression_binop','parser.py',213),
+  ('expression -> expression MINUS expression','expression',3,'p_expression_binop','parser.py',214),
+  ('expression -> expression TIMES expression','expression',3,'p_expression_binop','parser.py',215),
+  ('expression -> expression DIVIDE expression','expression',3,'p_expression_binop','parser.py',216),
+  ('expression -> expression LT expression','expression',3,'p_expression_binop','parser.py',217),
+  ('expression -> expression GT expression','expression',3,'p_expression_binop','parser.py',218),
+  ('expression -> expression LE expression','expression',3,'p_expression_binop','parser.py',219),
+  ('expression -> expression GE expression','expression',3,'p_expression_binop','parser.py',220),
+  ('expression -> expression EQ expression','expression',3,'p_expression_binop','parser.py',221),
+  ('expression -> expression NE expression','expression',3,'p_expression_binop','parser.py',222),
+  ('expression -> expression AND expression','expression',3,'p_expression_binop','parser.py',223),
+  ('expression -> expression OR expression','expression',3,'p_expression_binop','parser.py',224),
+  ('expression -> NOT expression','expression',2,'p_expression_not','parser.py',228),
+  ('expression -> MINUS expression','expression',2,'p_expression_uminus','parser.py',232),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_group','parser.py',241),
+  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',245),
+  ('expression -> IDENTIFIER','expression',1,'p_expression_identifier','parser.py',249),
 ]
@@ -0,0 +1,241 @@
+# Parse -> SSA -> SMT pipeline with per-stage timings
+# Shared by the headless entry points (batch.py) so every front end runs the
+# stages the same way and reports the same timings.
+import time
+from contextlib import contextmanager
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from session import EquivalenceBatch
+from bmc import BoundedModelChecker
+from induction import KInduction
+
+# Stage names, in pipeline order
+STAGES = ("parse", "ssa", "optimize", "cache", "concrete", "smt", "solve")
+
+# Names of the verdicts of an equivalence check
+EQUIVALENCE_RESULTS = {True: "equivalent", False: "not equivalent", None: "unknown"}
+
+
+class StageTimer:
+    """
+    Records the wall-clock time spent in each pipeline stage.
+
+    An optional progress callback is called with the stage name whenever a
+    stage starts.
+    """
+
+    def __init__(self, progress=None):
+        self.timings = {}
+        self.progress = progress
+        self.current = None   # name of the stage running (or that failed)
+
+    @contextmanager
+    def stage(self, name):
+        self.current = name
+        if self.progress is not None:
+            self.progress(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def convert_source(program_text, unroll_depth=3, timer=None, optimize=True, width=None):
+    """
+    Parse a program and convert it to SSA, timing each stage. Unless
+    optimize is False, the SSA is also simplified by
+    SSAConverter.optimize_ssa, whose counts are left in program.optimization.
+    width is the bit width of the encoding the program is meant for, if it
+    is a bit-vector one (see SMTGenerator.set_encoding).
+    """
+    if timer is None:
+        timer = StageTimer()
+    with timer.stage("parse"):
+        statements = parse_program(program_text)
+    converter = SSAConverter(width=width)
+    with timer.stage("ssa"):
+        program = converter.convert_to_ssa(statements, unroll_depth)
+    if optimize:
+        with timer.stage("optimize"):
+            converter.optimize_ssa()
+    return program
+
+
+def verify_source(program_text, unroll_depth=3, generator=None, progress=None):
+    """
+    Run a program through the whole verification pipeline.
+
+    Args:
+        program_text (str): Source of the program
+        unroll_depth (int): Number of times to unroll loops
+        generator (SMTGenerator): Generator to encode and solve with; a new
+            one is created by default
+        progress: Optional callback called with each stage name as it starts
+
+    Returns:
+        dict: "result" ("sat", "unsat" or "unknown"), "tier" (the strategy
+            tier that answered, "cache" for cached verdicts or "concrete" for
+            programs decided without the solver), "model" (SSA value name -> value),
+            "optimization" (counts of SSAConverter.optimize_ssa) and
+            "timings" (stage name -> seconds). If a stage
+            fails, "result" is "error" and "error"/"stage" describe the failure.
+    """
+    if generator is None:
+        generator = SMTGenerator()
+    timer = StageTimer(progress)
+    record = {"result": "error", "tier": None, "model": {}, "optimization": None, "timings": timer.timings}
+    try:
+        program = convert_source(program_text, unroll_depth, timer, width=generator.width)
+        record["optimization"] = program.optimization
+        # Programs checked before are answered from the cache without encoding
+        entry, verdict = None, None
+        if generator.cache is not None:
+            with timer.stage("cache"):
+                entry, verdict = generator.cache_lookup(program)
+        if verdict is not None:
+            result, model = verdict
+        else:
+            # Programs without inputs are decided by running them, without encoding
+            with timer.stage("concrete"):
+                decided = generator.evaluate(program)
+            if decided is not None:
+                result, model = decided
+            else:
+                with timer.stage("smt"):
+                    generator.reset()
+                    generator.add_constraints(generator.generate_constraints(program))
+                with timer.stage("solve"):
+                    result, model = generator.solve(program, generator.solver)
+            if entry is not None:
+                with timer.stage("cache"):
+                    generator.cache_store(program, entry, result, model)
+    except Exception as e:
+        record["error"] = str(e)
+        record["stage"] = timer.current
+        return record
+
+    record["result"] = str(result)
+    record["tier"] = generator.last_tier
+    record["model"] = model
+    return record
+
+
+def bmc_source(program_text, max_depth=10, generator=None, progress=None):
+    """
+    Search a program for an assertion failure with incremental bounded
+    model checking (see BoundedModelChecker).
+
+    Args:
+        program_text (str): Source of the program
+        max_depth (int): Deepest loop unrolling to try
+        generator (SMTGenerator): Generator to solve with
+        progress: Optional callback called with each stage name as it starts
+
+    Returns:
+        dict: "result" ("violated", "safe", "unknown" or "error"), "depth"
+            (minimal failing depth, or the depth reached), "counterexample"
+            (failing input values) and "timings"
+    """
+    timer = StageTimer(progress)
+    record = {"result": "error", "depth": None, "counterexample": None, "timings": timer.timings}
+    try:
+        with timer.stage("parse"):
+            statements = parse_program(program_text)
+        with timer.stage("bmc"):
+            status, depth, counterexample = BoundedModelChecker(generator).check(statements, max_depth)
+    except Exception as e:
+        record["error"] = str(e)
+        record["stage"] = timer.current
+        return record
+
+    record.update(result=status, depth=depth, counterexample=counterexample)
+    return record
+
+
+def prove_source(program_text, max_k=10, generator=None, progress=None):
+    """
+    Prove that no assertion of a program can fail, for any number of loop
+    iterations, by k-induction (see KInduction).
+
+    Args:
+        program_text (str): Source of the program
+        max_k (int): Largest induction depth to try per loop
+        generator (SMTGenerator): Generator to solve with
+        progress: Optional callback called with each stage name as it starts
+
+    Returns:
+        dict: "result" ("proved", "violated", "unknown" or "error"), "k",
+            "counterexample" (failing input values), "reason" (why the
+            result is unknown) and "timings"
+    """
+    timer = StageTimer(progress)
+    record = {"result": "error", "k": None, "counterexample": None, "reason": None, "timings": timer.timings}
+    try:
+        with timer.stage("parse"):
+            statements = parse_program(program_text)
+        with timer.stage("induction"):
+            prover = KInduction(generator)
+            status, k, counterexample = prover.check(statements, max_k)
+    except Exception as e:
+        record["error"] = str(e)
+        record["stage"] = timer.current
+        return record
+
+    record.update(result=status, k=k, counterexample=counterexample, reason=prover.reason)
+    return record
+
+
+def check_candidates(reference_text, candidate_texts, output_vars=None, unroll_depth=3, generator=None):
+    """
+    Check several candidate programs for equivalence with one reference
+    program, encoding the reference only once (see EquivalenceBatch). With
+    output_vars given, only their cone of influence is encoded.
+
+    Args:
+        reference_text (str): Source of the reference program
+        candidate_texts (list): Sources of the candidate programs
+        output_vars (list): Output variables to compare; by default the
+            variables assigned by both programs of each pair
+        unroll_depth (int): Number of times to unroll loops
+        generator (SMTGenerator): Generator to encode and solve with
+
+    Returns:
+        list: One record per candidate, with "result" ("equivalent",
+            "not equivalent", "unknown" or "error"), "tier",
+            "counterexamples" and "timings";
+            the reference's own stages are reported under
+            "reference_timings".
+    """
+    if generator is None:
+        generator = SMTGenerator()
+    timer = StageTimer()
+    try:
+        reference = convert_source(reference_text, unroll_depth, timer, width=generator.width)
+        with timer.stage("smt"):
+            batch = EquivalenceBatch(reference, generator, output_vars)
+    except Exception as e:
+        return [{"result": "error", "stage": f"reference {timer.current}", "error": str(e),
+                 "timings": {}} for _ in candidate_texts]
+    reference_timings = timer.timings
+
+    records = []
+    for candidate_text in candidate_texts:
+        timer = StageTimer()
+        record = {"result": "error", "tier": None, "counterexamples": [], "timings": timer.timings,
+                  "reference_timings": reference_timings}
+        try:
+            candidate = convert_source(candidate_text, unroll_depth, timer, width=generator.width)
+            with timer.stage("solve"):
+                is_equivalent, counterexamples = batch.check(candidate, output_vars)
+        except Exception as e:
+            record["error"] = str(e)
+            record["stage"] = timer.current
+        else:
+            record["result"] = EQUIVALENCE_RESULTS[is_equivalent]
+            record["tier"] = batch.generator.last_tier
+            record["counterexamples"] = counterexamples
+        records.append(record)
+    return records
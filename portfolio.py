@@ -0,0 +1,176 @@
+# Portfolio solving
+# Races several Z3 configurations on the same query in separate processes and
+# keeps the first definitive answer, so hard queries use every core instead of
+# waiting on whichever single configuration happens to be slow for them.
+import multiprocessing
+import os
+import queue
+import time
+
+from z3 import Solver, Int, BitVec, sat, unsat, unknown, is_int_value, is_bv_value
+
+from strategy import Tier, linear_tactic, nonlinear_tactic, QUICK_TIMEOUT
+from smtlib import export_query, import_query
+
+# Solver results by name
+RESULTS = {str(result): result for result in (sat, unsat, unknown)}
+
+
+class Config:
+    """A solver configuration raced in the portfolio."""
+
+    def __init__(self, name, tactic=None, params=None):
+        self.name = name
+        self.tactic = tactic          # function returning a Z3 tactic, or None for the default solver
+        self.params = params or {}    # solver parameters, e.g. {"random_seed": 1}
+
+    def new_solver(self):
+        solver = self.tactic().solver() if self.tactic is not None else Solver()
+        for name, value in self.params.items():
+            solver.set(name, value)
+        return solver
+
+    def __repr__(self):
+        return f"Config({self.name!r})"
+
+
+# Configurations in order of preference; a portfolio of size N uses the first N
+PORTFOLIO = [
+    Config("default"),
+    Config("nonlinear", nonlinear_tactic),
+    Config("seed-1", params={"random_seed": 1}),
+    Config("arith-solver-2", params={"smt.arith.solver": 2}),
+    Config("linear", linear_tactic),
+    Config("seed-2", params={"random_seed": 2}),
+    Config("seed-3", params={"random_seed": 3}),
+    Config("seed-4", params={"random_seed": 4}),
+]
+
+
+def solve_query(config, query, timeout, rlimit, results):
+    """
+    Check an SMT-LIB2 query with one configuration; runs in a child process.
+    Puts (config name, result name, {constant name: value}) on results;
+    the value of a bit-vector constant is a (value, width) pair.
+    """
+    solver = config.new_solver()
+    solver.set("timeout", timeout or 0)
+    solver.set("rlimit", rlimit or 0)
+    import_query(query, solver)
+    result = solver.check()
+    values = {}
+    if result == sat:
+        model = solver.model()
+        for decl in model.decls():
+            value = model[decl]
+            if decl.arity() == 0 and is_int_value(value):
+                values[decl.name()] = value.as_long()
+            elif decl.arity() == 0 and is_bv_value(value):
+                values[decl.name()] = (value.as_long(), value.size())
+    results.put((config.name, str(result), values))
+
+def solve_portfolio(query, configs=None, timeout=None, rlimit=None):
+    """
+    Race configurations on an SMT-LIB2 query, one process each, and return
+    the first sat/unsat answer. The remaining processes are killed as soon
+    as an answer arrives.
+
+    Args:
+        query (str): SMT-LIB2 text of the query
+        configs (list): Configurations to race; by default one per CPU core
+            from PORTFOLIO
+        timeout (int): Time limit in milliseconds, or None
+        rlimit (int): Resource limit of each configuration, or None
+
+    Returns:
+        tuple: (result, values, config name) - values maps the query's
+            integer constants to their values if the result is sat; the
+            config name is None if no configuration answered
+    """
+    if configs is None:
+        configs = PORTFOLIO[:max(1, os.cpu_count() or 1)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=solve_query, args=(config, query, timeout, rlimit, results),
+                                         daemon=True)
+                 for config in configs]
+    for process in processes:
+        process.start()
+
+    answer = (unknown, {}, None)
+    deadline = time.monotonic() + timeout / 1000 if timeout else None
+    pending = len(processes)
+    try:
+        while pending:
+            try:
+                name, result, values = results.get(timeout=0.05)
+            except queue.Empty:
+                # Stop waiting when time is up or every process has died
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+            pending -= 1
+            if result != "unknown":
+                answer = (RESULTS[result], values, name)
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+        for process in processes:
+            process.join()
+        results.close()
+    return answer
+
+def model_from_values(solver, values, assumptions=()):
+    """
+    Rebuild a Z3 model for a solver's assertions (and assumptions) from the
+    constant values reported by a portfolio process. With every constant
+    fixed the check is immediate.
+    """
+    check_solver = Solver()
+    check_solver.add(solver.assertions())
+    check_solver.add(list(assumptions))
+    check_solver.add([Int(name) == value if isinstance(value, int) else BitVec(name, value[1]) == value[0]
+                      for name, value in values.items()])
+    if check_solver.check() != sat:
+        return None
+    return check_solver.model()
+
+
+class PortfolioTier(Tier):
+    """Strategy tier that races a portfolio of configurations on the query."""
+
+    def __init__(self, name="portfolio", configs=None, timeout=None, rlimit=None):
+        super().__init__(name, None, timeout, rlimit)
+        self.configs = configs
+
+    def check(self, solver, assumptions=()):
+        query = export_query(list(solver.assertions()) + list(assumptions))
+        result, values, config = solve_portfolio(query, self.configs, self.timeout, self.rlimit)
+        if config is None:
+            return unknown, None, None
+        model = None
+        if result == sat:
+            model = model_from_values(solver, values, assumptions)
+            if model is None:
+                return unknown, None, None
+        return result, model, f"{self.name}:{config}"
+
+
+def portfolio_tiers(timeout=None, rlimit=None, size=None):
+    """
+    Return a strategy that tries the cheap linear tier first and then races
+    a portfolio of size configurations (one per CPU core by default).
+    """
+    configs = PORTFOLIO[:size or max(1, os.cpu_count() or 1)]
+    quick = min(QUICK_TIMEOUT, timeout) if timeout else QUICK_TIMEOUT
+    return [
+        Tier("linear", linear_tactic, quick, rlimit),
+        PortfolioTier("portfolio", configs, timeout, rlimit),
+    ]
+
+def portfolio_strategy(size=None):
+    """Return a strategy function (for SMTGenerator) racing size configurations."""
+    return lambda timeout=None, rlimit=None: portfolio_tiers(timeout, rlimit, size)
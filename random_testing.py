@@ -0,0 +1,307 @@
+# Random testing of equivalence with vectorized NumPy evaluation
+# Most programs that are not equivalent differ on plenty of inputs, so
+# running both on a few thousand random input vectors at once usually finds
+# a counterexample in microseconds, before Z3 is called. Each SSA
+# instruction is evaluated once over the whole batch as a NumPy array
+# operation; phi merges become np.where. Only differences that are real under
+# the SMT encoding are reported, so a pair that survives still goes to the
+# solver. NumPy is optional: without it, the programs are compiled to Python
+# functions and run on fewer inputs, one at a time.
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ast_nodes import Expr, Num, UnaryOp, BinOp
+from ir import Ref, ASSIGN, ASSERT, ASSUME, BRANCH, PHI, HAVOC
+from compiled import compile_program
+
+# Magnitude beyond which unbounded-integer lanes are dropped, so that no
+# operation on the remaining lanes can overflow int64 (|a * b| <= 2**62)
+LIMIT = 1 << 31
+
+# Random inputs tried without NumPy
+SCALAR_COUNT = 256
+
+# Widest machine integers the int64 batches can hold
+MAX_WIDTH = 64
+
+def expr_constants(expr):
+    """Return the set of integer constants in an IR expression."""
+    if isinstance(expr, Num):
+        return {expr.value}
+    if isinstance(expr, UnaryOp):
+        return expr_constants(expr.operand)
+    if isinstance(expr, BinOp):
+        return expr_constants(expr.left) | expr_constants(expr.right)
+    return set()
+
+def program_constants(program):
+    """Return the set of integer constants in the instructions of an SSA program."""
+    constants = set()
+    for instr, _ in program.instructions():
+        if instr.args and isinstance(instr.args[0], Expr):
+            constants |= expr_constants(instr.args[0])
+    return constants
+
+
+class RandomTester:
+    """
+    Evaluates SSA programs over batches of random inputs.
+
+    Every lane of a batch is one execution. With unbounded integers a lane is
+    dropped as soon as one of its values leaves [-LIMIT, LIMIT]; with a width,
+    values wrap around as machine integers do (int64 arithmetic wraps modulo
+    2**64, which reduces exactly to any smaller width). Lanes dividing by zero,
+    which the encoding leaves unspecified, are dropped too. Overflow checks
+    are not modelled, nor are widths above MAX_WIDTH: callers skip random
+    testing for them.
+    """
+
+    def __init__(self, count=2048, width=None, seed=0):
+        self.count = count    # input vectors per batch
+        self.width = width    # bits of machine integers, None for unbounded integers
+        self.seed = seed
+
+    def sample(self, rng, constants=()):
+        """
+        Return random input values: mostly small, some next to the constants
+        the programs compare against, and the edge cases of the integer range.
+        """
+        count = self.count
+        bound = LIMIT if self.width is None else 1 << (self.width - 1)
+        # Constants outside the range are brought into it as the evaluation does
+        near = np.array(sorted({self.wrap_constant(c + d) for c in constants for d in (-1, 0, 1)} | {0}),
+                        dtype=np.int64)
+        choices = [rng.integers(-8, 9, count), rng.choice(near, count),
+                   rng.integers(-1000, 1001, count), rng.integers(-bound, bound, count, dtype=np.int64)]
+        values = np.choose(rng.choice(4, count, p=[0.4, 0.2, 0.25, 0.15]), choices)
+        edges = np.array([0, 1, -1, 2, -2, bound - 1, -bound], dtype=np.int64)
+        values[:min(count, len(edges))] = edges[:count]
+        return self.clip(values.astype(np.int64))
+
+    def clip(self, values):
+        if self.width is None:
+            return np.clip(values, -LIMIT, LIMIT)
+        bound = 1 << (self.width - 1)
+        return np.clip(values, -bound, bound - 1)
+
+    def find_differences(self, ssa_form1, ssa_form2, output_vars, limit=1, diversity=0):
+        """
+        Run two programs on the same random inputs and look for runs in which
+        both satisfy their assertions and assumptions but some output differs.
+
+        Args:
+            ssa_form1 (SSAProgram): First program
+            ssa_form2 (SSAProgram): Second program
+            output_vars (list): Output variables to compare
+            limit (int): Maximum number of counterexamples
+            diversity (int): Every counterexample differs from each earlier one
+                by more than this in at least one input (0: any difference)
+
+        Returns:
+            list: Counterexamples in the format of check_equivalence (the
+                inputs the programs read, then both values of every output);
+                empty if none was found
+        """
+        pairs = [(var, ssa_form1.final_value(var), ssa_form2.final_value(var)) for var in output_vars]
+        pairs = [(var, value1, value2) for var, value1, value2 in pairs if value1 is not None and value2 is not None]
+        if not pairs:
+            return []
+        constants = program_constants(ssa_form1) | program_constants(ssa_form2)
+        # Inputs are shared by name, including outputs that are never assigned
+        inputs = []
+        for program in (ssa_form1, ssa_form2):
+            inputs.extend(program.base_name(value) for value in program.inputs
+                          if program.base_name(value) not in inputs)
+        names = []
+        for program in (ssa_form1, ssa_form2):
+            names.extend(program.base_name(value) for value in program.used_inputs()
+                         if program.base_name(value) not in names)
+        runs = self.batch_runs if np is not None else self.compiled_runs
+        differences = runs(ssa_form1, ssa_form2, pairs, inputs, names, constants)
+
+        counterexamples, chosen = [], []
+        for values, outputs in differences:
+            key = [values[name] for name in names]
+            if any(all(abs(a - b) <= diversity for a, b in zip(key, earlier)) for earlier in chosen):
+                continue  # Too close to an earlier counterexample
+            chosen.append(key)
+            example = dict(zip(names, key))
+            for (var, _, _), (output1, output2) in zip(pairs, outputs):
+                example[f"{var} (prog1)"] = output1
+                example[f"{var} (prog2)"] = output2
+            counterexamples.append(example)
+            if len(counterexamples) == limit or not names:
+                break
+        return counterexamples
+
+    def batch_runs(self, ssa_form1, ssa_form2, pairs, inputs, names, constants):
+        """
+        Yield (inputs, outputs) for the runs of a NumPy batch in which both
+        programs hold and some output differs, smallest inputs first.
+        """
+        rng = np.random.default_rng(self.seed)
+        arrays = {name: self.sample(rng, constants) for name in inputs}
+        with np.errstate(all="ignore"):
+            values1, ok1 = self.run(ssa_form1, arrays, rng)
+            values2, ok2 = self.run(ssa_form2, arrays, rng)
+            differs = np.zeros(self.count, dtype=bool)
+            for _, value1, value2 in pairs:
+                differs |= values1[value1] != values2[value2]
+
+        lanes = np.flatnonzero(ok1 & ok2 & differs)
+        if names:
+            # Small counterexamples first: they are the easiest to read
+            size = np.max([np.abs(arrays[name][lanes].astype(float)) for name in names], axis=0)
+            lanes = lanes[np.argsort(size, kind="stable")]
+        for lane in lanes:
+            yield ({name: int(array[lane]) for name, array in arrays.items()},
+                   [(int(values1[value1][lane]), int(values2[value2][lane])) for _, value1, value2 in pairs])
+
+    def compiled_runs(self, ssa_form1, ssa_form2, pairs, inputs, names, constants):
+        """
+        Without NumPy: run the programs compiled to Python functions (see
+        compiled) on up to SCALAR_COUNT random inputs, one at a time, and return
+        (inputs, outputs) for the runs in which both hold and some output
+        differs, smallest inputs first.
+        """
+        rng = random.Random(self.seed)
+        differences = []
+        bound = LIMIT if self.width is None else 1 << (self.width - 1)
+        near = sorted({c + d for c in constants for d in (-1, 0, 1)} | {0})
+        edges = [0, 1, -1, 2, -2, bound - 1, -bound]
+        programs = [(compile_program(program, self.width), program.unroll_depth or 0,
+                     [instr.dest for instr, _ in program.instructions() if instr.op == HAVOC])
+                    for program in (ssa_form1, ssa_form2)]
+        for run in range(min(self.count, SCALAR_COUNT)):
+            values = {}
+            for name in inputs:
+                choice = rng.choices(range(4), (0.4, 0.2, 0.25, 0.15))[0]
+                value = (edges[run] if run < len(edges) else
+                         rng.randint(-8, 8) if choice == 0 else rng.choice(near) if choice == 1 else
+                         rng.randint(-1000, 1000) if choice == 2 else rng.randrange(-bound, bound))
+                values[name] = max(-bound, min(bound - 1, value))
+            results = []
+            for compiled, depth, havocked in programs:
+                # Any value: loop trip counts are small
+                result = compiled.run(values, {value: rng.randint(-1, depth + 1) for value in havocked})
+                if result is None or not result[0]:
+                    break
+                results.append(result[1])
+            if len(results) < 2:
+                continue
+            outputs = [(results[0][value1], results[1][value2]) for _, value1, value2 in pairs]
+            if any(output1 != output2 for output1, output2 in outputs):
+                differences.append((values, outputs))
+        # Small counterexamples first, as with NumPy
+        return sorted(differences, key=lambda difference: max((abs(difference[0][name]) for name in names), default=0))
+
+    def run(self, program, inputs, rng):
+        """
+        Evaluate a program on a batch of inputs.
+
+        Args:
+            program (SSAProgram): Program to run
+            inputs (dict): Input name -> array of values, for every input
+            rng: NumPy random generator for havocked values
+
+        Returns:
+            tuple: (values, ok) - value id -> array, and the mask of lanes
+                that are valid and satisfy every assertion and assumption
+        """
+        self.values = {}
+        self.ok = np.ones(self.count, dtype=bool)
+        for value in program.inputs:
+            self.values[value] = inputs[program.base_name(value)]
+        self.rng = rng
+        self.run_block(program, 0, np.ones(self.count, dtype=bool))
+        return self.values, self.ok
+
+    def run_block(self, program, block, path):
+        for instr in program.blocks[block]:
+            op = instr.op
+            if op == HAVOC:
+                # Any value: loop trip counts are small
+                self.values[instr.dest] = self.rng.integers(-1, (program.unroll_depth or 0) + 2, self.count)
+                continue
+            value = self.evaluate(instr.args[0])
+            if op == ASSIGN:
+                self.values[instr.dest] = value
+            elif op == PHI:
+                _, then_value, else_value = instr.args
+                self.values[instr.dest] = np.where(value != 0, self.values[then_value], self.values[else_value])
+            elif op == BRANCH:
+                _, then_block, else_block = instr.args
+                self.run_block(program, then_block, path & (value != 0))
+                if else_block is not None:
+                    self.run_block(program, else_block, path & (value == 0))
+            elif op in (ASSERT, ASSUME):
+                self.ok &= ~path | (value != 0)
+
+    def evaluate(self, expr):
+        """Return the int64 array of an IR expression over the batch (truth values are 1/0)."""
+        if isinstance(expr, Ref):
+            return self.values[expr.value]
+        if isinstance(expr, Num):
+            return self.arithmetic(np.full(self.count, self.wrap_constant(expr.value), dtype=np.int64))
+        if isinstance(expr, UnaryOp):
+            operand = self.evaluate(expr.operand)
+            if expr.op == '!':
+                return (operand == 0).astype(np.int64)
+            return self.arithmetic(-operand)
+
+        left, right = self.evaluate(expr.left), self.evaluate(expr.right)
+        op = expr.op
+        if op == '&&':
+            return ((left != 0) & (right != 0)).astype(np.int64)
+        if op == '||':
+            return ((left != 0) | (right != 0)).astype(np.int64)
+        if op == '+':
+            return self.arithmetic(left + right)
+        if op == '-':
+            return self.arithmetic(left - right)
+        if op == '*':
+            return self.arithmetic(left * right)
+        if op == '/':
+            zero = right == 0
+            self.ok &= ~zero  # Unspecified in the encoding
+            if self.width is not None and self.width >= 64:
+                # The one quotient that overflows int64
+                self.ok &= (left != np.iinfo(np.int64).min) | (right != -1)
+            divisor = np.where(zero, 1, right)
+            # Floor division, corrected to a remainder that is never negative
+            # (without intermediate results that could overflow)
+            quotient = left // divisor
+            return self.arithmetic(np.where(left % divisor < 0, quotient + 1, quotient))
+        comparisons = {'<': np.less, '>': np.greater, '<=': np.less_equal, '>=': np.greater_equal,
+                       '==': np.equal, '!=': np.not_equal}
+        return comparisons[op](left, right).astype(np.int64)
+
+    def arithmetic(self, result):
+        """Bring the result of an operation back into range (see the class description)."""
+        if self.width is None:
+            outside = np.abs(result) > LIMIT
+            self.ok &= ~outside
+            return np.where(outside, 0, result)
+        if self.width >= 64:
+            return result
+        bound = 1 << (self.width - 1)
+        return ((result + bound) & (2 * bound - 1)) - bound
+
+    def wrap_constant(self, number):
+        if self.width is None:
+            return max(-LIMIT - 1, min(LIMIT + 1, number))  # Out of range: the lanes are dropped
+        bound = 1 << (self.width - 1)
+        return (number + bound) % (2 * bound) - bound
+
+# Example usage
+if __name__ == "__main__":
+    from parser import parse_program
+    from ssa import SSAConverter
+
+    program1 = SSAConverter().convert_to_ssa(parse_program("if (x > 10) { y := x * 2; } else { y := x + 1; }"))
+    program2 = SSAConverter().convert_to_ssa(parse_program("if (x >= 10) { y := x + x; } else { y := x + 1; }"))
+    print(RandomTester().find_differences(program1, program2, ["y"]))
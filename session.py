@@ -0,0 +1,201 @@
+# Incremental solver sessions
+# Keeps the Z3 encoding of a program alive between verification requests, so
+# that after an edit only the instructions from the first change onwards are
+# re-encoded; the unchanged prefix stays asserted in the solver.
+from smt import SMTGenerator
+from ssa import slice_program
+
+class IncrementalSession:
+    """
+    Verification session that reuses solver state across edits.
+
+    The top-level SSA instructions of the encoded programs are grouped into
+    chunks, and every chunk is asserted in its own solver scope. On update,
+    the new SSA is compared instruction by instruction with the previous one;
+    scopes lying entirely inside the common prefix are kept and the rest are
+    popped and re-encoded. SSA names are assigned in program order, so an
+    unchanged source prefix produces an identical SSA prefix.
+    """
+
+    def __init__(self, generator=None, chunk_size=16):
+        self.generator = generator if generator is not None else SMTGenerator()
+        self.solver = self.generator.solver
+        self.chunk_size = chunk_size
+        self.fingerprints = []   # text of every encoded top-level instruction, with its namespace
+        self.scopes = []         # constraints asserted in each solver scope
+        self.programs = []       # (program, namespace) pairs of the last update
+        self.reused = 0          # instructions kept from the previous update
+        self.encoded = 0         # instructions encoded by the last update
+
+    def reset(self):
+        """Drop all solver state."""
+        self.generator.reset()
+        self.solver = self.generator.solver
+        self.fingerprints = []
+        self.scopes = []
+        self.programs = []
+
+    def update(self, program, namespace=""):
+        """
+        Make the solver hold the constraints of a single program.
+
+        Args:
+            program (SSAProgram): New SSA form of the program
+            namespace (str): Namespace to encode the program's values with
+
+        Returns:
+            int: Number of top-level instructions reused from the previous update
+        """
+        return self.update_all([(program, namespace)])
+
+    def update_all(self, programs):
+        """
+        Make the solver hold the constraints of several programs, encoded one
+        after the other (e.g. both sides of an equivalence check).
+
+        Args:
+            programs (list): (SSAProgram, namespace) pairs
+
+        Returns:
+            int: Number of top-level instructions reused from the previous update
+        """
+        items = []
+        for program, namespace in programs:
+            for instr in program.blocks[0]:
+                items.append((namespace, program.format_tree(instr), program, instr))
+
+        # Longest run of unchanged instructions, rounded down to whole scopes
+        common = 0
+        limit = min(len(items), len(self.fingerprints))
+        while common < limit and self.fingerprints[common] == items[common][:2]:
+            common += 1
+        kept_scopes = common // self.chunk_size
+
+        while len(self.scopes) > kept_scopes:
+            self.solver.pop()
+            self.scopes.pop()
+
+        # Builders are tied to the value numbering of one program version
+        generator = self.generator
+        builders = {id(program): generator.new_builder(program, namespace) for program, namespace in programs}
+
+        start = kept_scopes * self.chunk_size
+        for chunk_start in range(start, len(items), self.chunk_size):
+            constraints = []
+            for _, _, program, instr in items[chunk_start:chunk_start + self.chunk_size]:
+                generator.encode_instr(program, instr, None, builders[id(program)], constraints)
+            self.solver.push()
+            self.solver.add(constraints)
+            self.scopes.append(constraints)
+
+        self.fingerprints = [item[:2] for item in items]
+        self.programs = list(programs)
+        self.reused = start
+        self.encoded = len(items) - start
+        return self.reused
+
+    def constraints(self):
+        """Return all constraints currently asserted by the session."""
+        return [constraint for scope in self.scopes for constraint in scope]
+
+    def check(self):
+        return self.generator.run_check(self.solver)
+
+    def verify(self, program):
+        """
+        Update the session to a program and check it, answering from the
+        generator's cache if it has seen the program before.
+
+        Args:
+            program (SSAProgram): SSA form of the program
+
+        Returns:
+            tuple: (result, model) as returned by SMTGenerator.verify
+        """
+        self.update(program)
+        return self.generator.verify(program, self.solver)
+
+    def model(self):
+        return self.generator.model()
+
+    def check_equivalence(self, ssa_form1, ssa_form2, output_vars):
+        """
+        Check equivalence of two programs, reusing the encoding of whatever
+        prefix of the two programs is unchanged since the previous call. Only
+        the cone of influence of the output variables is encoded.
+
+        Args:
+            ssa_form1 (SSAProgram): SSA form of the first program
+            ssa_form2 (SSAProgram): SSA form of the second program
+            output_vars (list): List of output variable names to check for equivalence
+
+        Returns:
+            tuple: (is_equivalent, counterexamples)
+        """
+        ssa_form1 = slice_program(ssa_form1, output_vars)
+        ssa_form2 = slice_program(ssa_form2, output_vars)
+        self.update_all([(ssa_form1, ""), (ssa_form2, "_prog2")])
+        return self.generator.check_equivalence(ssa_form1, ssa_form2, output_vars, self.solver)
+
+
+def common_outputs(program1, program2):
+    """Return the variables assigned by both programs, in the first program's order."""
+    assigned = set(program2.assigned_vars())
+    return [var for var in program1.assigned_vars() if var in assigned]
+
+
+class EquivalenceBatch:
+    """
+    Checks many candidate programs for equivalence with one reference program.
+
+    The reference is encoded once, at the solver's base level. Each candidate
+    is asserted in its own push/pop scope on top of it, so checking a
+    candidate costs only the candidate's own encoding. When the output
+    variables are known up front, the reference is sliced to their cone of
+    influence once and every candidate is sliced the same way.
+    """
+
+    def __init__(self, reference, generator=None, output_vars=None):
+        self.generator = generator if generator is not None else SMTGenerator()
+        self.generator.reset()
+        self.solver = self.generator.solver
+        self.output_vars = output_vars
+        if output_vars is not None:
+            reference = slice_program(reference, output_vars)
+        self.reference = reference
+        self.solver.add(self.generator.generate_constraints(reference))
+
+    def check(self, candidate, output_vars=None):
+        """
+        Check one candidate against the reference.
+
+        Args:
+            candidate (SSAProgram): SSA form of the candidate program
+            output_vars (list): Output variables to compare; by default the
+                batch's output variables, or the variables assigned by both
+                programs. Must be among the batch's output variables if it
+                was given some.
+
+        Returns:
+            tuple: (is_equivalent, counterexamples)
+        """
+        if output_vars is None:
+            output_vars = self.output_vars
+        if output_vars is None:
+            output_vars = common_outputs(self.reference, candidate)
+        elif self.output_vars is not None and not set(output_vars) <= set(self.output_vars):
+            raise ValueError("The reference was sliced for other output variables")
+        candidate = slice_program(candidate, output_vars)
+        decided = self.generator.evaluate_pair(self.reference, candidate, output_vars)
+        if decided is not None:
+            return decided
+        self.solver.push()
+        try:
+            self.solver.add(self.generator.generate_constraints(candidate, namespace="_prog2"))
+            return self.generator.check_equivalence(self.reference, candidate, output_vars, self.solver)
+        finally:
+            self.solver.pop()
+
+    def check_all(self, candidates, output_vars=None):
+        """Check every candidate in turn; returns a list of (is_equivalent, counterexamples)."""
+        return [self.check(candidate, output_vars) for candidate in candidates]
@@ -1,422 +1,812 @@
+import warnings
+
 from z3 import *
-import re
+
+from ast_nodes import Num, UnaryOp, BinOp, LOGIC_OPS
+from ir import Ref, ASSIGN, ASSERT, BRANCH, PHI, HAVOC
+from ssa import slice_program
+from cache import verification_key, equivalence_key
+from strategy import default_tiers, bitvector_tiers, run_tiers
+from smtlib import export_query
+from concrete import ConcreteEvaluator
+from random_testing import RandomTester, MAX_WIDTH
+from compiled import compile_program
+
+# Solver results by name, for results loaded from the cache
+RESULTS = {str(result): result for result in (sat, unsat, unknown)}
+
+def model_value(model, term):
+    """Return the value of an integer term in a model (bit-vectors are read as signed)."""
+    value = model.eval(term, model_completion=True)
+    return value.as_signed_long() if is_bv_value(value) else value.as_long()
+
+class Z3Builder:
+    """
+    Translates IR expressions into Z3 terms in a single walk over the tree.
+
+    Subterms are hash-consed: each structurally distinct subterm is built
+    once and every further occurrence (for example the same condition in a
+    branch and its phi nodes, or the same subexpression in several unrolled
+    iterations) reuses the same Z3 node.
+
+    With a width, integers are two's complement bit-vectors of that many
+    bits: arithmetic wraps around, comparisons are signed and division stays
+    Euclidean as with unbounded integers.
+    """
+
+    def __init__(self, terms, width=None):
+        self.terms = terms    # value id -> Z3 variable
+        self.width = width    # bits of a bit-vector integer, None for unbounded integers
+        self.index = {}       # structural key -> node id
+        self.nodes = []       # node id -> Z3 term
+        self.reused = 0       # number of subterms served from the table
+
+    def node(self, expr):
+        """Return the id of the interned Z3 term for an expression."""
+        if isinstance(expr, Ref):
+            key = ('ref', expr.value)
+        elif isinstance(expr, Num):
+            key = ('num', expr.value)
+        elif isinstance(expr, UnaryOp):
+            key = (expr.op, self.node(expr.operand))
+        else:
+            key = (expr.op, self.node(expr.left), self.node(expr.right))
+        return self.intern(key)
+
+    def intern(self, key):
+        node_id = self.index.get(key)
+        if node_id is None:
+            # Building the term may intern coerced children first
+            term = self.make(key)
+            node_id = len(self.nodes)
+            self.nodes.append(term)
+            self.index[key] = node_id
+        else:
+            self.reused += 1
+        return node_id
+
+    def make(self, key):
+        """Build the Z3 term for a structural key whose children are already interned."""
+        op = key[0]
+        if op == 'ref':
+            return self.terms[key[1]]
+        if op == 'num':
+            return self.constant(key[1])
+        if op == 'int':
+            term = self.nodes[key[1]]
+            return If(term, self.constant(1), self.constant(0)) if is_bool(term) else term
+        if op == 'bool':
+            term = self.nodes[key[1]]
+            return term if is_bool(term) else term != 0
+        if len(key) == 2:
+            if op == '!':
+                return Not(self.nodes[self.intern(('bool', key[1]))])
+            return -self.nodes[self.intern(('int', key[1]))]
+
+        if op in LOGIC_OPS:
+            left = self.nodes[self.intern(('bool', key[1]))]
+            right = self.nodes[self.intern(('bool', key[2]))]
+            return And(left, right) if op == '&&' else Or(left, right)
+
+        left = self.nodes[self.intern(('int', key[1]))]
+        right = self.nodes[self.intern(('int', key[2]))]
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            return left / right if self.width is None else euclidean_division(left, right)
+        if op == '<':
+            return left < right
+        if op == '>':
+            return left > right
+        if op == '<=':
+            return left <= right
+        if op == '>=':
+            return left >= right
+        if op == '==':
+            return left == right
+        if op == '!=':
+            return left != right
+        raise ValueError(f"Unknown operator: {op}")
+
+    def constant(self, value):
+        return IntVal(value) if self.width is None else BitVecVal(value, self.width)
+
+    def overflow_checks(self, expr):
+        """
+        Return the conditions under which no operation of an expression
+        overflows the bit-vector width (none for unbounded integers).
+        """
+        checks = []
+        if self.width is None:
+            return checks
+        pending = [expr]
+        while pending:
+            expr = pending.pop()
+            if isinstance(expr, UnaryOp):
+                pending.append(expr.operand)
+                if expr.op == '-':
+                    checks.append(BVSNegNoOverflow(self.int_term(expr.operand)))
+            elif isinstance(expr, BinOp):
+                pending.extend((expr.left, expr.right))
+                if expr.op not in ('+', '-', '*', '/'):
+                    continue
+                left, right = self.int_term(expr.left), self.int_term(expr.right)
+                if expr.op == '+':
+                    checks.extend((BVAddNoOverflow(left, right, True), BVAddNoUnderflow(left, right)))
+                elif expr.op == '-':
+                    checks.extend((BVSubNoOverflow(left, right), BVSubNoUnderflow(left, right, True)))
+                elif expr.op == '*':
+                    checks.extend((BVMulNoOverflow(left, right, True), BVMulNoUnderflow(left, right)))
+                else:
+                    checks.append(BVSDivNoOverflow(left, right))
+        return checks
+
+    def term(self, expr):
+        """Translate an expression into a Z3 integer or boolean term, depending on the expression."""
+        return self.nodes[self.node(expr)]
+
+    def int_term(self, expr):
+        """Translate an expression used as an integer (truth values become 1/0)."""
+        return self.nodes[self.intern(('int', self.node(expr)))]
+
+    def bool_term(self, expr):
+        """Translate an expression used as a condition (integers are true when non-zero)."""
+        return self.nodes[self.intern(('bool', self.node(expr)))]
+
+
+def euclidean_division(left, right):
+    """
+    Euclidean division of signed bit-vectors (the remainder is never
+    negative), matching Z3's integer division; SDiv rounds towards zero.
+    """
+    quotient = left / right
+    return If(SRem(left, right) < 0, If(right > 0, quotient - 1, quotient + 1), quotient)
+
 
 class SMTGenerator:
-    def __init__(self):
-        self.solver = Solver()
+    def __init__(self, cache=None, timeout=None, rlimit=None, strategy=default_tiers, width=None,
+                 check_overflow=False):
+        self.cache = cache          # VerificationCache consulted before calling Z3, or None
+        self.options = {}           # Solver settings that can change results; part of every cache key
+        # Integer encoding: unbounded Int (width None) or width-bit bit-vectors,
+        # optionally failing every operation that overflows (see set_encoding)
+        self.width = None
+        self.check_overflow = False
+        # Limits of every solver check: time in milliseconds and Z3 resource
+        # units (None: no limit). A check that runs out of either answers
+        # unknown, which is never cached, so the limits are not part of the
+        # cache key; neither is the strategy, which only affects speed.
+        self.timeout = timeout
+        self.rlimit = rlimit
+        self.strategy = strategy    # function (timeout, rlimit) -> list of strategy Tiers
+        self.tiers = None
+        self.last_tier = None       # name of the tier that answered the last check ("cache" for cache hits)
+        self.last_model = None      # model of the last satisfiable check
+        self.interrupted = False    # set by interrupt() to stop escalating to further tiers
+        self.num_counterexamples = 3  # counterexamples reported by an equivalence check
+        self.diversity = 0          # minimum input difference between counterexamples
+        self.short_circuited = 0    # checks decided by concrete evaluation, without Z3
+        self.random_tests = 2048    # random inputs tried before the solver in equivalence checks (0: none)
+        self.refuted = 0            # equivalence checks refuted by random testing, without Z3
+        self.unreplayed = []        # solver counterexamples the programs did not reproduce when run
+        self.solver = self.new_solver()
         self.variables = {}
         self.variable_mapping = {}  # Maps original var names to their SSA versions
+        self.builder = None         # Z3Builder used for the last generated program
+        self.set_encoding(width, check_overflow)
+
+    def set_encoding(self, width=None, check_overflow=False):
+        """
+        Choose how program integers are encoded: as unbounded integers, or
+        (with a width) as two's complement machine integers of that many bits,
+        whose arithmetic wraps around and which Z3 bit-blasts to SAT. With
+        check_overflow, every +, -, * and / (and unary minus) that overflows
+        the width fails like an assertion. Changing the encoding drops the
+        solver state, since the variables change sort.
+
+        Args:
+            width (int): Bits of an integer (e.g. 32 or 64), or None for
+                unbounded integers
+            check_overflow (bool): Whether overflow fails (only with a width)
+
+        Returns:
+            bool: Whether the encoding changed
+        """
+        check_overflow = bool(check_overflow and width)
+        if self.tiers is not None and (width, check_overflow) == (self.width, self.check_overflow):
+            return False
+        self.width = width
+        self.check_overflow = check_overflow
+        self.options.pop("width", None)
+        self.options.pop("check_overflow", None)
+        if width:
+            self.options.update(width=width, check_overflow=check_overflow)
+        self.set_limits(self.timeout, self.rlimit)
+        self.reset()
+        return True
+
+    def new_solver(self):
+        """Return a new Z3 solver; limits are applied by the strategy tiers at every check."""
+        return Solver()
+
+    def set_limits(self, timeout=None, rlimit=None):
+        """Change the time limit (milliseconds) and resource limit of later checks (None for none)."""
+        self.timeout = timeout
+        self.rlimit = rlimit
+        # Bit-vector queries skip the arithmetic tactics of the default strategy
+        strategy = bitvector_tiers if self.width and self.strategy is default_tiers else self.strategy
+        self.tiers = strategy(timeout, rlimit)
+
+    def interrupt(self):
+        """Interrupt a running check (from another thread) and stop its escalation."""
+        self.interrupted = True
+        main_ctx().interrupt()
+
+    def run_check(self, solver=None, assumptions=()):
+        """
+        Check a solver with the generator's strategy, escalating to the next
+        tier whenever a tier answers unknown. The answering tier is recorded
+        in last_tier and the model of a satisfiable check in last_model.
+        Once the generator is interrupted, checks answer unknown right away.
+
+        Args:
+            solver: Solver to check; the generator's own solver by default
+            assumptions: Boolean literals assumed for this check only
+
+        Returns:
+            Z3 check result
+        """
+        if solver is None:
+            solver = self.solver
+        result, self.last_model, self.last_tier = run_tiers(self.tiers, solver, lambda: self.interrupted,
+                                                            assumptions)
+        return result
 
     def reset(self):
-        self.solver = Solver()
+        self.solver = self.new_solver()
         self.variables = {}
         self.variable_mapping = {}
+        self.builder = None
 
     def define_variable(self, var_name):
         if var_name not in self.variables:
-            self.variables[var_name] = Int(var_name)
-            
-            # Update variable mapping for SSA variables
-            base_name = var_name.split('_')[0] if '_' in var_name else var_name
-            self.variable_mapping[base_name] = var_name
-            
+            self.variables[var_name] = Int(var_name) if self.width is None else BitVec(var_name, self.width)
         return self.variables[var_name]
 
-    def generate_constraints(self, ssa_form):
-        # Define all variables at the start
-        for stmt in ssa_form:
-            if ":=" in stmt:
-                var, _ = stmt.split(' := ')
-                self.define_variable(var)
+    def value_var(self, program, value, namespace=""):
+        """
+        Return the Z3 variable for an SSA value.
+
+        Args:
+            program (SSAProgram): Program the value belongs to
+            value (int): SSA value id
+            namespace (str): Suffix keeping the values of different programs apart;
+                program inputs are named "<variable>@in" whatever the namespace,
+                so programs compared for equivalence read the same inputs and
+                no input can meet an assigned value of the other program
+
+        Returns:
+            Z3 integer (or bit-vector) variable
+        """
+        if program.value_is_input[value]:
+            return self.define_variable(f"{program.base_name(value)}@in")
+        return self.define_variable(program.value_name(value) + namespace)
+
+    def new_builder(self, program, namespace=""):
+        """Return a Z3Builder over the variables of every value of a program."""
+        terms = [self.value_var(program, value, namespace) for value in range(program.num_values)]
+        return Z3Builder(terms, self.width)
+
+    def generate_constraints(self, program, namespace=""):
+        """
+        Encode an SSA program as a list of Z3 constraints.
+
+        Args:
+            program (SSAProgram): Program produced by SSAConverter.convert_to_ssa
+            namespace (str): Suffix added to the names of non-input values
 
+        Returns:
+            list: Z3 constraints
+        """
         constraints = []
-        for stmt in ssa_form:
-            if ":=" in stmt:
-                var, expr = stmt.split(' := ')
-                var_z3 = self.variables[var]
-                
-                # Replace original variable names with their SSA versions in the expression
-                for orig_var, ssa_var in self.variable_mapping.items():
-                    expr = re.sub(r'\b' + orig_var + r'\b', ssa_var, expr)
-                
-                # Define all variables in the expression
-                expr_vars = [v.strip() for v in expr.replace('+', ' ').replace('-', ' ').replace('*', ' ').replace('/', ' ').split()]
-                for v in expr_vars:
-                    if v.isidentifier():
-                        self.define_variable(v)
-                
-                # Custom expression evaluation instead of using eval()
-                expr_z3 = self.evaluate_expression(expr)
-                constraints.append(var_z3 == expr_z3)
-            
-            elif stmt.startswith('if') or stmt.startswith('assert'):
-                # Handle if and assert conditions
-                condition = stmt.split('(', 1)[1].rsplit(')', 1)[0].strip()
-                
-                # Replace original variable names with their SSA versions in the condition
-                for orig_var, ssa_var in self.variable_mapping.items():
-                    condition = re.sub(r'\b' + orig_var + r'\b', ssa_var, condition)
-                
-                # Define all variables in the condition
-                condition_vars = [v.strip() for v in condition.replace('<', ' ').replace('>', ' ').replace('==', ' ').replace('!=', ' ').replace('<=', ' ').replace('>=', ' ').replace('&&', ' ').replace('||', ' ').split()]
-                for v in condition_vars:
-                    if v.isidentifier():
-                        self.define_variable(v)
-                
-                # Custom condition evaluation
-                condition_z3 = self.evaluate_condition(condition)
-                constraints.append(condition_z3)
-            
-            elif stmt == 'else':
-                # Handle else block
-                continue
-        
+        self.builder = self.new_builder(program, namespace)
+        self.encode_block(program, 0, None, self.builder, constraints)
+
+        # Remember which SSA version holds each variable at the end of the program
+        for var_id, value in program.final_values.items():
+            self.variable_mapping[program.var_names[var_id]] = str(self.builder.terms[value])
+
         return constraints
-        
-    def evaluate_expression(self, expr):
+
+    def encode_block(self, program, block, guard, builder, constraints, violations=None):
         """
-        Safely evaluate an expression into a Z3 formula.
-        
+        Append the constraints of one block of an SSA program.
+
+        Every SSA value is defined exactly once, so assignments and phi merges
+        are encoded unconditionally. Assertions and assumptions only have to
+        hold on the paths that reach them, so they are guarded by the
+        conjunction of the enclosing branch conditions.
+
         Args:
-            expr (str): The expression to evaluate
-            
+            program (SSAProgram): Program being encoded
+            block (int): Id of the block to encode
+            guard: Z3 path condition of the block, or None at the top level
+            builder (Z3Builder): Translator for the program's expressions
+            constraints (list): List receiving the constraints
+            violations (list): If given, assertions are not added as
+                constraints; instead the condition under which each one
+                fails is appended here (used to search for failing runs)
+        """
+        for instr in program.blocks[block]:
+            self.encode_instr(program, instr, guard, builder, constraints, violations)
+
+    def encode_instr(self, program, instr, guard, builder, constraints, violations=None):
+        """Append the constraints of one instruction (and of the blocks of a branch)."""
+        terms = builder.terms
+        op = instr.op
+        if self.check_overflow and op != HAVOC:
+            # Every instruction but havoc has an expression as its first argument
+            for check in builder.overflow_checks(instr.args[0]):
+                self.encode_assertion(check, guard, constraints, violations)
+        if op == ASSIGN:
+            constraints.append(terms[instr.dest] == builder.int_term(instr.args[0]))
+        elif op == PHI:
+            condition, then_value, else_value = instr.args
+            constraints.append(terms[instr.dest] == If(builder.bool_term(condition),
+                                                       terms[then_value], terms[else_value]))
+        elif op == BRANCH:
+            condition, then_block, else_block = instr.args
+            condition = builder.bool_term(condition)
+            then_guard = condition if guard is None else And(guard, condition)
+            self.encode_block(program, then_block, then_guard, builder, constraints, violations)
+            if else_block is not None:
+                else_guard = Not(condition) if guard is None else And(guard, Not(condition))
+                self.encode_block(program, else_block, else_guard, builder, constraints, violations)
+        elif op == HAVOC:
+            pass  # The value is left unconstrained
+        elif op == ASSERT:
+            self.encode_assertion(builder.bool_term(instr.args[0]), guard, constraints, violations)
+        else:
+            # Loop-exit and other assumptions
+            condition = builder.bool_term(instr.args[0])
+            constraints.append(condition if guard is None else Implies(guard, condition))
+
+    def encode_assertion(self, condition, guard, constraints, violations=None):
+        """Append a condition that must hold on the paths satisfying guard (see encode_block)."""
+        if violations is not None:
+            failure = Not(condition)
+            violations.append(failure if guard is None else And(guard, failure))
+        else:
+            constraints.append(condition if guard is None else Implies(guard, condition))
+
+    def evaluate(self, program):
+        """
+        Decide a program that reads no inputs by running it (see
+        ConcreteEvaluator) instead of calling Z3.
+
         Returns:
-            Z3 expression
+            tuple: (result, model) as returned by verify, or None if the
+                program needs the solver
         """
-        # Recursively parse an expression into a Z3 formula
-        expr = expr.strip()
-        
-        # Handle numeric literals
-        if expr.isdigit():
-            return IntVal(int(expr))
-            
-        # Handle variables
-        if expr.isidentifier():
-            if expr in self.variables:
-                return self.variables[expr]
-            else:
-                raise ValueError(f"Variable {expr} not defined")
-                
-        # Handle addition
-        if '+' in expr:
-            parts = self.split_at_operator(expr, '+')
-            left = self.evaluate_expression(parts[0])
-            right = self.evaluate_expression(parts[1])
-            return left + right
-            
-        # Handle subtraction
-        if '-' in expr:
-            parts = self.split_at_operator(expr, '-')
-            left = self.evaluate_expression(parts[0])
-            right = self.evaluate_expression(parts[1])
-            return left - right
-            
-        # Handle multiplication
-        if '*' in expr:
-            parts = self.split_at_operator(expr, '*')
-            left = self.evaluate_expression(parts[0])
-            right = self.evaluate_expression(parts[1])
-            return left * right
-            
-        # Handle division
-        if '/' in expr:
-            parts = self.split_at_operator(expr, '/')
-            left = self.evaluate_expression(parts[0])
-            right = self.evaluate_expression(parts[1])
-            return left / right
-            
-        # Handle parentheses
-        if expr.startswith('(') and expr.endswith(')'):
-            return self.evaluate_expression(expr[1:-1])
-            
-        raise ValueError(f"Cannot evaluate expression: {expr}")
-    
-    def evaluate_condition(self, condition):
+        run = ConcreteEvaluator(self.width, self.check_overflow).run(program)
+        if run is None:
+            return None
+        holds, values = run
+        self.short_circuited += 1
+        self.last_tier = "concrete"
+        self.last_model = None
+        if not holds:
+            return unsat, {}
+        return sat, {program.value_name(value): number for value, number in values.items()}
+
+    def evaluate_pair(self, ssa_form1, ssa_form2, output_vars):
         """
-        Evaluate a condition into a Z3 formula.
-        
-        Args:
-            condition (str): The condition to evaluate
-            
+        Decide the equivalence of two programs that read no inputs by running
+        them, instead of calling Z3.
+
         Returns:
-            Z3 formula
+            tuple: (is_equivalent, counterexamples) as returned by
+                check_equivalence, or None if the programs need the solver
         """
-        condition = condition.strip()
-        
-        # Handle negation (!) - must check this first
-        if condition.startswith('!'):
-            # Remove the exclamation mark and any surrounding parentheses if present
-            inner_condition = condition[1:].strip()
-            if inner_condition.startswith('(') and inner_condition.endswith(')'):
-                inner_condition = inner_condition[1:-1].strip()
-            
-            return Not(self.evaluate_condition(inner_condition))
-        
-        # Handle equality (==)
-        if '==' in condition:
-            parts = condition.split('==')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left == right
-            
-        # Handle inequality (!=)
-        if '!=' in condition:
-            parts = condition.split('!=')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left != right
-            
-        # Handle less than (<)
-        if '<' in condition and not '<=' in condition:
-            parts = condition.split('<')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left < right
-            
-        # Handle greater than (>)
-        if '>' in condition and not '>=' in condition:
-            parts = condition.split('>')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left > right
-            
-        # Handle less than or equal to (<=)
-        if '<=' in condition:
-            parts = condition.split('<=')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left <= right
-            
-        # Handle greater than or equal to (>=)
-        if '>=' in condition:
-            parts = condition.split('>=')
-            left = self.evaluate_expression(parts[0].strip())
-            right = self.evaluate_expression(parts[1].strip())
-            return left >= right
-            
-        # Handle logical AND (&&)
-        if '&&' in condition:
-            parts = condition.split('&&')
-            left = self.evaluate_condition(parts[0].strip())
-            right = self.evaluate_condition(parts[1].strip())
-            return And(left, right)
-            
-        # Handle logical OR (||)
-        if '||' in condition:
-            parts = condition.split('||')
-            left = self.evaluate_condition(parts[0].strip())
-            right = self.evaluate_condition(parts[1].strip())
-            return Or(left, right)
-        
-        # If none of the above, it might be a simple expression that should evaluate to boolean
-        # For example, a variable name that represents a boolean value
-        return self.evaluate_expression(condition) != 0
-    
-    def split_at_operator(self, expr, operator):
+        finals = [(var, ssa_form1.final_value(var), ssa_form2.final_value(var)) for var in output_vars]
+        finals = [(var, value1, value2) for var, value1, value2 in finals if value1 is not None and value2 is not None]
+        if any(ssa_form1.value_is_input[value1] or ssa_form2.value_is_input[value2] for _, value1, value2 in finals):
+            return None  # An output that is never assigned is a free input
+        evaluator = ConcreteEvaluator(self.width, self.check_overflow)
+        run1 = evaluator.run(ssa_form1)
+        run2 = run1 and evaluator.run(ssa_form2)
+        if run2 is None:
+            return None
+        (holds1, values1), (holds2, values2) = run1, run2
+        self.short_circuited += 1
+        self.last_tier = "concrete"
+        self.last_model = None
+        if not finals or not (holds1 and holds2):
+            return False, []  # Nothing to compare, or no execution of both programs
+        if all(values1[value1] == values2[value2] for _, value1, value2 in finals):
+            return True, []
+        example = {}
+        for var, value1, value2 in finals:
+            example[f"{var} (prog1)"] = values1[value1]
+            example[f"{var} (prog2)"] = values2[value2]
+        return False, [example]
+
+    def test_pair(self, ssa_form1, ssa_form2, output_vars):
         """
-        Split an expression at the given operator, but only at the top level.
-        
+        Look for a counterexample to the equivalence of two programs by
+        running both on random inputs (see random_testing), instead of calling
+        Z3. Only a pair that is refuted is decided: passing every test proves
+        nothing. Skipped with random_tests 0, with overflow checks and with
+        integers wider than 64 bits, which the tests do not model.
+
+        Returns:
+            tuple: (False, counterexamples) as returned by check_equivalence,
+                or None if no counterexample was found (or the tests failed)
+        """
+        if not self.random_tests or self.check_overflow or (self.width or 0) > MAX_WIDTH:
+            return None
+        tester = RandomTester(self.random_tests, self.width)
+        try:
+            counterexamples = tester.find_differences(ssa_form1, ssa_form2, output_vars,
+                                                      self.num_counterexamples, self.diversity)
+        except Exception as e:
+            # Only a pre-filter: whatever goes wrong, the solver still decides
+            warnings.warn(f"random testing failed, leaving the pair to the solver: {e}")
+            return None
+        if not counterexamples:
+            return None
+        self.refuted += 1
+        self.last_tier = "random"
+        self.last_model = None
+        return False, counterexamples
+
+    def replay(self, ssa_form1, ssa_form2, example):
+        """
+        Run both programs, compiled to Python functions (see compiled), on the
+        inputs of a counterexample.
+
+        Returns:
+            bool: Whether both programs satisfy their assertions on these inputs
+                and produce the outputs of the counterexample; None if the
+                programs cannot be replayed (havocked loop state, or a division
+                by zero, which the encoding leaves unspecified)
+        """
+        inputs = {name: value for name, value in example.items() if not name.endswith(")")}
+        outputs = [(name[:-len(" (prog1)")], value) for name, value in example.items() if name.endswith(" (prog1)")]
+        programs = (ssa_form1, ssa_form2)
+        for var, value in outputs:
+            # An output that is never assigned is an input the programs may not read
+            for program in programs:
+                final = program.final_value(var)
+                if final is not None and program.value_is_input[final]:
+                    inputs.setdefault(var, value if program is ssa_form1 else example[f"{var} (prog2)"])
+        runs = []
+        for program, tag in zip(programs, ("prog1", "prog2")):
+            if any(instr.op == HAVOC for instr, _ in program.instructions()):
+                return None
+            run = compile_program(program, self.width, self.check_overflow).final_values(inputs)
+            if run is None:
+                return None
+            holds, values = run
+            if not holds or any(values.get(var, inputs.get(var, 0)) != example[f"{var} ({tag})"] for var, _ in outputs):
+                return False
+        return True
+
+    def verify(self, program, solver=None):
+        """
+        Check the constraints of a program, answering from the cache when the
+        same program (up to variable names and formatting) was checked before.
+
         Args:
-            expr (str): The expression to split
-            operator (str): The operator to split at
-            
+            program (SSAProgram): Program to verify
+            solver: Solver already holding the program's constraints (e.g. an
+                IncrementalSession's); by default the program is encoded into
+                a fresh solver, and only if the cache has no answer and the
+                program reads inputs (otherwise it is simply run, see evaluate)
+
         Returns:
-            tuple: (left part, right part)
-        """
-        paren_count = 0
-        for i in range(len(expr)):
-            if expr[i] == '(':
-                paren_count += 1
-            elif expr[i] == ')':
-                paren_count -= 1
-            elif expr[i] == operator and paren_count == 0:
-                return (expr[:i].strip(), expr[i+1:].strip())
-        
-        # If we reach here, the operator was not found at the top level
-        return (expr, "")
+            tuple: (result, model) - the Z3 check result and a dictionary
+                mapping SSA value names to their values (empty unless sat)
+        """
+        entry, verdict = self.cache_lookup(program)
+        if verdict is not None:
+            return verdict
+
+        decided = self.evaluate(program) if solver is None else None
+        if decided is not None:
+            result, model = decided
+        else:
+            if solver is None:
+                self.reset()
+                self.add_constraints(self.generate_constraints(program))
+                solver = self.solver
+            result, model = self.solve(program, solver)
+        self.cache_store(program, entry, result, model)
+        return result, model
+
+    def cache_lookup(self, program):
+        """
+        Look up the verdict of a program in the cache.
 
-    def check_equivalence(self, ssa_form1, ssa_form2, output_vars):
+        Returns:
+            tuple: (entry, verdict) - entry is the program's cache key and
+                normalizer to pass to cache_store (None without a cache), and
+                verdict is (result, model) as returned by verify on a hit, None
+                otherwise
+        """
+        if self.cache is None:
+            return None, None
+        key, normalizer = verification_key(program, self.options)
+        payload = self.cache.get(key)
+        if payload is None:
+            return (key, normalizer), None
+        # Entries stored by earlier versions may name values past the canonical text
+        model = {program.value_name(normalizer.order[index][1]): value for index, value in payload["model"]
+                 if index < len(normalizer.order)}
+        self.last_tier = "cache"
+        return (key, normalizer), (RESULTS[payload["result"]], model)
+
+    def cache_store(self, program, entry, result, model):
+        """Store the verdict of a program under the entry returned by cache_lookup."""
+        # Unknown depends on time limits rather than on the program, so it is not stored
+        if entry is None or result == unknown:
+            return
+        key, normalizer = entry
+        # Only values in the canonical text have an index that every program
+        # with this key shares; inputs only read by branches the optimizer
+        # folded away have none
+        indexed = [(normalizer.known(program, value, 0), program.value_name(value))
+                   for value in range(program.num_values)]
+        self.cache.put(key, {
+            "result": str(result),
+            "model": [[index, model[name]] for index, name in indexed if index is not None and name in model],
+        })
+
+    def solve(self, program, solver):
+        """Check a solver holding a program's constraints; returns (result, model) as verify does."""
+        result = self.run_check(solver)
+        model = {}
+        if result == sat:
+            z3_model = self.last_model
+            for value in range(program.num_values):
+                if value in program.dead_values:
+                    continue  # Optimized away; its value is meaningless
+                model[program.value_name(value)] = model_value(z3_model, self.value_var(program, value))
+        return result, model
+
+    def check_equivalence(self, ssa_form1, ssa_form2, output_vars, solver=None):
         """
         Check if two programs are equivalent based on their output variables.
-        
+        Answers from the cache when the same pair (up to variable names and
+        formatting) was checked before.
+
         Args:
-            ssa_form1 (list): SSA form of the first program
-            ssa_form2 (list): SSA form of the second program
+            ssa_form1 (SSAProgram): SSA form of the first program
+            ssa_form2 (SSAProgram): SSA form of the second program
             output_vars (list): List of output variable names to check for equivalence
-            
+            solver: Solver already holding the constraints of both programs,
+                the second one encoded with the "_prog2" namespace; by default
+                the programs are sliced to the cone of influence of the output
+                variables and, unless they read no inputs and can simply be run,
+                encoded into a fresh solver. Either way, the solver is only
+                called if random testing finds no counterexample (see test_pair)
+
         Returns:
-            tuple: (is_equivalent, counterexamples)
+            tuple: (is_equivalent, counterexamples) - is_equivalent is None if
+                the solver could not decide
         """
+        if solver is None:
+            ssa_form1 = slice_program(ssa_form1, output_vars)
+            ssa_form2 = slice_program(ssa_form2, output_vars)
+
+        key = None
+        if self.cache is not None:
+            options = dict(self.options, counterexamples=self.num_counterexamples, diversity=self.diversity)
+            key, normalizer = equivalence_key(ssa_form1, ssa_form2, output_vars, options)
+            payload = self.cache.get(key)
+            if payload is not None:
+                self.last_tier = "cache"
+                return payload["equivalent"], self.load_counterexamples(payload, normalizer, output_vars)
+
+        decided = self.evaluate_pair(ssa_form1, ssa_form2, output_vars) if solver is None else None
+        if decided is None:
+            decided = self.test_pair(ssa_form1, ssa_form2, output_vars)
+        if decided is not None:
+            is_equivalent, counterexamples = decided
+        else:
+            if solver is None:
+                solver = self.encode_pair(ssa_form1, ssa_form2)
+            is_equivalent, counterexamples = self.solve_equivalence(solver, ssa_form1, ssa_form2, output_vars)
+
+        if key is not None and is_equivalent is not None:
+            self.cache.put(key, {
+                "equivalent": is_equivalent,
+                "counterexamples": self.store_counterexamples(counterexamples, normalizer, output_vars),
+            })
+        return is_equivalent, counterexamples
+
+    def store_counterexamples(self, counterexamples, normalizer, output_vars):
+        """Convert counterexamples to the name-independent form kept in the cache."""
+        stored = []
+        for example in counterexamples:
+            inputs = [[normalizer.canonical[('input', name)], value] for name, value in example.items()
+                      if ('input', name) in normalizer.canonical]
+            outputs = [[position, example[f"{var} (prog1)"], example[f"{var} (prog2)"]]
+                       for position, var in enumerate(output_vars) if f"{var} (prog1)" in example]
+            stored.append({"inputs": inputs, "outputs": outputs})
+        return stored
+
+    def load_counterexamples(self, payload, normalizer, output_vars):
+        """Rebuild cached counterexamples with the variable names of the current programs."""
+        counterexamples = []
+        for stored in payload["counterexamples"]:
+            example = {}
+            for index, value in stored["inputs"]:
+                program, input_value = normalizer.order[index]
+                example[program.base_name(input_value)] = value
+            for position, value1, value2 in stored["outputs"]:
+                example[f"{output_vars[position]} (prog1)"] = value1
+                example[f"{output_vars[position]} (prog2)"] = value2
+            counterexamples.append(example)
+        return counterexamples
+
+    def encode_pair(self, ssa_form1, ssa_form2):
+        """Return a new solver holding the constraints of both programs of an equivalence check."""
         # Reset the solver and variables
         self.reset()
-        
-        # Generate constraints for the first program
+
+        # Generate constraints for both programs; the second program's values
+        # get a "_prog2" suffix, while inputs are shared between the programs
         constraints1 = self.generate_constraints(ssa_form1)
-        
-        # Save the variable mapping and variables from the first program
-        variables1 = self.variables.copy()
-        variable_mapping1 = self.variable_mapping.copy()
-        
-        # Reset for the second program
-        self.reset()
-        
-        # Append "_prog2" to all variables in the second program to avoid name conflicts
-        ssa_form2_renamed = []
-        for stmt in ssa_form2:
-            renamed_stmt = stmt
-            if ":=" in stmt:
-                var, expr = stmt.split(' := ')
-                renamed_var = var + "_prog2"
-                renamed_expr = expr
-                for word in re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', expr):
-                    if word.isidentifier():
-                        renamed_expr = re.sub(r'\b' + word + r'\b', word + "_prog2", renamed_expr)
-                renamed_stmt = renamed_var + " := " + renamed_expr
-            elif stmt.startswith('if') or stmt.startswith('assert'):
-                condition = stmt.split('(', 1)[1].rsplit(')', 1)[0].strip()
-                renamed_condition = condition
-                for word in re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', condition):
-                    if word.isidentifier():
-                        renamed_condition = re.sub(r'\b' + word + r'\b', word + "_prog2", renamed_condition)
-                renamed_stmt = stmt.split('(', 1)[0] + '(' + renamed_condition + ')'
-            ssa_form2_renamed.append(renamed_stmt)
-        
-        # Generate constraints for the second program
-        constraints2 = self.generate_constraints(ssa_form2_renamed)
-        
-        # Save the variable mapping and variables from the second program
-        variables2 = self.variables.copy()
-        variable_mapping2 = self.variable_mapping.copy()
-        
+        constraints2 = self.generate_constraints(ssa_form2, namespace="_prog2")
+
         # Create a combined solver for equivalence checking
-        solver = Solver()
-        
+        solver = self.new_solver()
+
         # Add all constraints from both programs
         for constraint in constraints1:
             solver.add(constraint)
         for constraint in constraints2:
             solver.add(constraint)
-        
-        # Find the SSA version of each output variable in both programs
-        output_var_mappings = []
+
+        return solver
+
+    def output_pairs(self, ssa_form1, ssa_form2, output_vars, namespace2="_prog2"):
+        """
+        Pair up the final SSA version of each output variable in both programs.
+
+        Returns:
+            list: (variable name, Z3 variable in program 1, Z3 variable in
+                program 2) for every output variable both programs define
+        """
+        pairs = []
         for var in output_vars:
-            # For program 1, find variables matching the base name
-            var1_candidates = []
-            for v in variables1:
-                if re.match(f"{var}_\\d+$", v):
-                    var1_candidates.append(v)
-            
-            # For program 2, find variables matching the base name with _prog2 suffix
-            var2_candidates = []
-            for v in variables2:
-                if re.match(f"{var}_\\d+_prog2$", v):
-                    var2_candidates.append(v)
-            
-            # If we found candidates, get the ones with highest version numbers
-            if var1_candidates and var2_candidates:
-                # Sort by version number (descending)
-                var1_candidates.sort(key=lambda x: int(x.split('_')[1]), reverse=True)
-                var2_candidates.sort(key=lambda x: int(x.split('_')[1]), reverse=True)
-                
-                # Get the highest version
-                var1 = var1_candidates[0]
-                var2 = var2_candidates[0]
-                
-                # Add to our mappings
-                if var1 in variables1 and var2 in variables2:
-                    output_var_mappings.append((var1, var2))
-        
-        # If we couldn't find mappings for any variables, try direct base name lookup
-        if not output_var_mappings:
-            for var in output_vars:
-                if var in variable_mapping1 and var in variable_mapping2:
-                    var1 = variable_mapping1[var]
-                    var2 = variable_mapping2[var] + "_prog2"
-                    if var1 in variables1 and var2 in variables2:
-                        output_var_mappings.append((var1, var2))
-        
+            value1 = ssa_form1.final_value(var)
+            value2 = ssa_form2.final_value(var)
+            if value1 is not None and value2 is not None:
+                pairs.append((var,
+                              self.value_var(ssa_form1, value1),
+                              self.value_var(ssa_form2, value2, namespace2)))
+        return pairs
+
+    def export_verification(self, program, info=None):
+        """
+        Return the verification query of a program as SMT-LIB2 text
+        (satisfiable iff all assertions can hold).
+
+        Args:
+            program (SSAProgram): Program to export
+            info (dict): Extra metadata for the header comments
+        """
+        self.reset()
+        header = {"query": "verification", "unroll_depth": program.unroll_depth}
+        header.update(info or {})
+        return export_query(self.generate_constraints(program), header)
+
+    def export_equivalence(self, ssa_form1, ssa_form2, output_vars, info=None):
+        """
+        Return the equivalence query of two programs as SMT-LIB2 text: the
+        constraints of both programs plus the disequality of their outputs,
+        so the query is unsatisfiable iff the programs are equivalent
+        (given that their constraints are satisfiable together).
+
+        Args:
+            ssa_form1 (SSAProgram): SSA form of the first program
+            ssa_form2 (SSAProgram): SSA form of the second program
+            output_vars (list): Output variable names compared
+            info (dict): Extra metadata for the header comments
+        """
+        ssa_form1 = slice_program(ssa_form1, output_vars)
+        ssa_form2 = slice_program(ssa_form2, output_vars)
+        solver = self.encode_pair(ssa_form1, ssa_form2)
+        pairs = self.output_pairs(ssa_form1, ssa_form2, output_vars)
+        if not pairs:
+            raise ValueError("None of the output variables is defined by both programs")
+        solver.add(Not(And(*[var1 == var2 for _, var1, var2 in pairs])))
+        header = {"query": "equivalence", "unroll_depth": ssa_form1.unroll_depth,
+                  "outputs": ",".join(var for var, _, _ in pairs)}
+        header.update(info or {})
+        return export_query(solver, header)
+
+    def solve_equivalence(self, solver, ssa_form1, ssa_form2, output_vars, namespace2="_prog2"):
+        """
+        Decide equivalence on a solver that already holds the constraints of
+        both programs. The solver is left in the state it was passed in.
+
+        Args:
+            solver: Z3 solver holding the constraints of both programs
+            ssa_form1 (SSAProgram): SSA form of the first program (no namespace)
+            ssa_form2 (SSAProgram): SSA form of the second program
+            output_vars (list): List of output variable names to check for equivalence
+            namespace2 (str): Namespace the second program was encoded with
+
+        Returns:
+            tuple: (is_equivalent, counterexamples) - is_equivalent is None if
+                the solver could not decide (e.g. it ran out of time)
+        """
+        output_var_mappings = self.output_pairs(ssa_form1, ssa_form2, output_vars, namespace2)
+
         # Check if we have variables to compare
         if not output_var_mappings:
             return False, []  # No output variables to compare
-        
+
         # Build equivalence constraints
-        equiv_constraints = []
-        for var1, var2 in output_var_mappings:
-            equiv_constraints.append(variables1[var1] == variables2[var2])
-        
+        equiv_constraints = [var1 == var2 for _, var1, var2 in output_var_mappings]
+
         # Check that solver is satisfiable (programs can be executed)
-        if solver.check() != sat:
+        result = self.run_check(solver)
+        if result == unknown:
+            return None, []
+        if result != sat:
             return False, []  # Programs have unsatisfiable constraints
-            
+
         solver.push()
-        
+
         # First check if the programs are equivalent for all inputs
         # We do this by checking for a counterexample where the outputs differ
         solver.add(Not(And(*equiv_constraints)))
-        
-        if solver.check() == sat:
-            # Found a counterexample where programs behave differently
+
+        result = self.run_check(solver)
+        # The tier that decided equivalence, rather than one that enumerated counterexamples
+        decisive_tier = self.last_tier
+        if result == unknown:
+            solver.pop()
+            return None, []
+        if result == sat:
+            # Found a counterexample where programs behave differently.
+            # Counterexamples only need to differ in the inputs the programs
+            # read: every other value is determined by them.
+            input_vars = {}
+            for program in (ssa_form1, ssa_form2):
+                for value in program.used_inputs():
+                    input_vars[program.base_name(value)] = self.value_var(program, value)
+            models = self.enumerate_models(solver, list(input_vars.values()), self.num_counterexamples,
+                                           self.diversity, self.last_model)
+
+            # Extract the inputs and the output values that demonstrate the difference
             counterexamples = []
-            
-            # Extract up to 3 counterexamples
-            for _ in range(3):
-                if solver.check() == sat:
-                    model = solver.model()
-                    
-                    # Extract values that demonstrate the difference
-                    example = {}
-                    
-                    # Process variables from first program
-                    for var in variables1:
-                        try:
-                            # Extract base variable name (without SSA index)
-                            base_var = var.split('_')[0]
-                            if variables1[var] in model:
-                                value = model[variables1[var]].as_long()
-                                example[f"{base_var} (prog1)"] = value
-                        except:
-                            pass
-                    
-                    # Process variables from second program
-                    for var in variables2:
-                        try:
-                            # Extract base variable name (without SSA index and prog2 suffix)
-                            if "_prog2" in var:
-                                base_var = var.split('_')[0]
-                                if variables2[var] in model:
-                                    value = model[variables2[var]].as_long()
-                                    example[f"{base_var} (prog2)"] = value
-                        except:
-                            pass
-                    
-                    if example:  # Only add if we have values
-                        counterexamples.append(example)
-                    
-                    # Add constraint to find a different counterexample
-                    block = []
-                    for var in variables1:
-                        try:
-                            if variables1[var] in model:
-                                block.append(variables1[var] != model[variables1[var]])
-                        except:
-                            pass
-                    for var in variables2:
-                        try:
-                            if variables2[var] in model:
-                                block.append(variables2[var] != model[variables2[var]])
-                        except:
-                            pass
-                    
-                    if block:
-                        solver.add(Or(*block))
-                    else:
-                        break
-                else:
-                    break
-            
+            for model in models:
+                example = {}
+                for name, input_var in input_vars.items():
+                    example[name] = model_value(model, input_var)
+                for var, var1, var2 in output_var_mappings:
+                    example[f"{var} (prog1)"] = model_value(model, var1)
+                    example[f"{var} (prog2)"] = model_value(model, var2)
+                # A counterexample the programs do not reproduce when run
+                # means the encoding is wrong: report it, but flag it
+                if self.replay(ssa_form1, ssa_form2, example) is False:
+                    self.unreplayed.append(example)
+                    warnings.warn(f"counterexample not reproduced by running the programs: {example}")
+                counterexamples.append(example)
+
             solver.pop()
+            self.last_tier = decisive_tier
             return False, counterexamples
-        
+
         # If we reach here, the programs produce the same outputs for all inputs
         solver.pop()
         return True, []  # Programs are equivalent
@@ -426,65 +816,101 @@ class SMTGenerator:
             self.solver.add(constraint)
 
     def check(self):
-        return self.solver.check()
+        return self.run_check(self.solver)
 
     def model(self):
-        return self.solver.model()
+        """Return the model of the last satisfiable check."""
+        return self.last_model
     
-    def get_examples(self, ssa_form, num_examples=2):
+    def enumerate_models(self, solver, input_vars, count, diversity=0, model=None):
         """
-        Get examples where the constraints are satisfied.
+        Enumerate models of a solver that differ in their input values.
+
+        Models are projected onto the inputs: every other SSA value is
+        determined by them, so blocking only the inputs avoids near-duplicate
+        models and keeps the blocking clauses small. The clauses are added in
+        a scope of their own, so the solver is left as it was passed in and
+        can be reused.
+
+        Args:
+            solver: Solver holding the query
+            input_vars (list): Z3 variables of the program inputs
+            count (int): Maximum number of models
+            diversity (int): Every model differs from each earlier one by more
+                than this in at least one input (0: any difference)
+            model: Model of the solver's last satisfiable check, used as the
+                first model instead of checking again
+
+        Returns:
+            list: Z3 models
+        """
+        models = []
+        solver.push()
+        try:
+            while len(models) < count:
+                if model is None:
+                    if self.run_check(solver) != sat:
+                        break
+                    model = self.last_model
+                models.append(model)
+                if not input_vars:
+                    break  # Without inputs there is only one execution
+
+                # Block this model's inputs (and, with diversity, their neighbourhood)
+                values = [model.eval(var, model_completion=True) for var in input_vars]
+                if diversity > 0:
+                    distances = [If(var >= value, var - value, value - var) for var, value in zip(input_vars, values)]
+                    # A bit-vector distance may exceed the largest signed value
+                    solver.add(Or([distance > diversity if self.width is None else UGT(distance, diversity)
+                                   for distance in distances]))
+                else:
+                    solver.add(Or([var != value for var, value in zip(input_vars, values)]))
+                model = None
+        finally:
+            solver.pop()
+        return models
+
+    def get_examples(self, ssa_form, num_examples=2, diversity=0, solver=None):
+        """
+        Get examples where the constraints are satisfied, with distinct inputs.
         
         Args:
-            ssa_form (list): SSA form of the program
+            ssa_form (SSAProgram): SSA form of the program
             num_examples (int): Number of examples to generate
+            diversity (int): Minimum difference between the inputs of examples
+                (see enumerate_models)
+            solver: Solver already holding the program's constraints (e.g. an
+                IncrementalSession's); by default they are encoded into a
+                fresh solver
             
         Returns:
-            list: List of examples (dictionaries mapping variables to values)
+            list: List of examples (dictionaries mapping SSA variables to values)
         """
-        constraints = self.generate_constraints(ssa_form)
-        self.add_constraints(constraints)
-        
+        if solver is None:
+            self.reset()
+            self.add_constraints(self.generate_constraints(ssa_form))
+            solver = self.solver
+
+        input_vars = [self.value_var(ssa_form, value) for value in ssa_form.inputs]
         examples = []
-        
-        # Get up to num_examples satisfying assignments
-        for _ in range(num_examples):
-            if self.check() == sat:
-                model = self.solver.model()
-                
-                # Extract variable values
-                example = {}
-                for var in self.variables:
-                    try:
-                        if self.variables[var] in model:
-                            example[var] = model[self.variables[var]].as_long()
-                    except:
-                        pass
-                
-                examples.append(example)
-                
-                # Add constraint to find different example
-                block = []
-                for var in self.variables:
-                    try:
-                        if self.variables[var] in model:
-                            block.append(self.variables[var] != model[self.variables[var]])
-                    except:
-                        pass
-                
-                self.solver.add(Or(block))
-            else:
-                break
-        
+        for model in self.enumerate_models(solver, input_vars, num_examples, diversity):
+            example = {}
+            for value in range(ssa_form.num_values):
+                example[ssa_form.value_name(value)] = model_value(model, self.value_var(ssa_form, value))
+            examples.append(example)
         return examples
 
 # Example usage
 if __name__ == "__main__":
+    from parser import parse_program
+    from ssa import SSAConverter
+
     smt_generator = SMTGenerator()
-    ssa_form = ["x_0 := 3", "if ((x < 5))", "y_0 := x + 1", "else", "y_1 := x - 1", "assert(y > 0)"]
+    statements = parse_program("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);")
+    ssa_form = SSAConverter().convert_to_ssa(statements)
     constraints = smt_generator.generate_constraints(ssa_form)
     smt_generator.add_constraints(constraints)
     result = smt_generator.check()
     print("SMT Check Result:", result)
     if result == sat:
-        print("Model:", smt_generator.model()) 
\ No newline at end of file
+        print("Model:", smt_generator.model())
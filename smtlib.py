@@ -0,0 +1,106 @@
+# SMT-LIB2 export and import of solver queries
+# A query is the conjunction of a solver's assertions, written as standard
+# SMT-LIB2 text so it can be stored, diffed, replayed with any SMT solver, or
+# shipped to another process without re-running parse and SSA.
+import argparse
+import sys
+
+from z3 import Solver
+
+def export_query(constraints, info=None):
+    """
+    Return the SMT-LIB2 text of a query.
+
+    Args:
+        constraints: Z3 solver, or list of Z3 constraints
+        info (dict): Metadata written as comment lines at the top
+            ("; key: value"), e.g. the source files and unrolling depth
+
+    Returns:
+        str: SMT-LIB2 text with declarations, assertions and (check-sat)
+    """
+    if isinstance(constraints, Solver):
+        solver = constraints
+    else:
+        solver = Solver()
+        solver.add(constraints)
+    lines = [f"; {key}: {value}" for key, value in (info or {}).items()]
+    lines.append(solver.to_smt2())
+    return "\n".join(lines)
+
+def import_query(text, solver=None):
+    """
+    Load the assertions of an SMT-LIB2 query into a solver.
+
+    Args:
+        text (str): SMT-LIB2 text
+        solver: Solver to add the assertions to; a new one by default
+
+    Returns:
+        Z3 solver holding the query's assertions
+    """
+    if solver is None:
+        solver = Solver()
+    solver.from_string(text)
+    return solver
+
+def read_info(text):
+    """Return the metadata written by export_query at the top of a query."""
+    info = {}
+    for line in text.splitlines():
+        if not line.startswith("; ") or ": " not in line:
+            break
+        key, value = line[2:].split(": ", 1)
+        info[key] = value
+    return info
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Export verification queries to SMT-LIB2 or replay them")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write the query of a program (or program pair)")
+    export_parser.add_argument("program", help="program file")
+    export_parser.add_argument("--equivalent", metavar="PROGRAM2",
+                               help="export the equivalence query against this program instead")
+    export_parser.add_argument("--outputs", help="comma-separated output variables of the equivalence query "
+                                                 "(default: the variables both programs assign)")
+    export_parser.add_argument("--unroll-depth", type=int, default=3, help="number of times to unroll loops")
+
+    check_parser = commands.add_parser("check", help="check an exported query with Z3")
+    check_parser.add_argument("query", help="SMT-LIB2 file")
+    check_parser.add_argument("--timeout", type=int, default=None, help="time limit in milliseconds")
+    args = arg_parser.parse_args()
+
+    if args.command == "export":
+        from pipeline import convert_source
+        from smt import SMTGenerator
+        from session import common_outputs
+
+        with open(args.program) as f:
+            program = convert_source(f.read(), args.unroll_depth)
+        generator = SMTGenerator()
+        if args.equivalent is None:
+            text = generator.export_verification(program, {"program": args.program})
+        else:
+            with open(args.equivalent) as f:
+                program2 = convert_source(f.read(), args.unroll_depth)
+            if args.outputs:
+                output_vars = [v.strip() for v in args.outputs.split(",")]
+            else:
+                output_vars = common_outputs(program, program2)
+            text = generator.export_equivalence(program, program2, output_vars,
+                                                {"program1": args.program, "program2": args.equivalent})
+        print(text)
+    else:
+        with open(args.query) as f:
+            solver = import_query(f.read())
+        if args.timeout:
+            solver.set("timeout", args.timeout)
+        result = solver.check()
+        print(result)
+        if str(result) == "sat":
+            print(solver.model())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,207 +1,681 @@
-import re
+import copy
+
+from ast_nodes import Num, Var, UnaryOp, BinOp, Assign, If, While, For, Assert, Invariant, apply_op
+from ir import SSAProgram, Ref, Instr, ASSIGN, ASSERT, ASSUME, BRANCH, PHI, HAVOC, expr_values
+
+# Comparisons whose truth, for an expression affine in the iteration number,
+# changes at most once over the iterations of a loop
+ORDER_OPS = ('<', '>', '<=', '>=')
 
 class SSAConverter:
-    def __init__(self):
-        self.ssa_form = []
-        self.var_count = {}
+    def __init__(self, accelerate=True, width=None):
+        # Bits of the machine integers the program will be encoded with (see
+        # SMTGenerator.set_encoding), or None for unbounded integers; constants
+        # are only folded within their range
+        self.width = width
+        # Replace counting loops by their closed form instead of unrolling them;
+        # the closed forms assume unbounded integers
+        self.accelerate = accelerate and width is None
+        self.reset()
 
     def reset(self):
         """Reset the state of the converter to process a new program."""
-        self.ssa_form = []
-        self.var_count = {}
+        self.program = SSAProgram()
+        self.block = 0   # block currently receiving instructions
+        # Renaming environment: variable id -> value id of its current version (-1 if none)
+        self.env = []
+        # Variable id -> value id of its input version, shared by all paths
+        self.input_values = {}
+        # Emit assertions as assumptions (for facts established by another check)
+        self.assume_asserts = False
+        # Number of loops converted to closed form
+        self.accelerated_loops = 0
 
-    def new_var(self, var_name):
-        if var_name not in self.var_count:
-            self.var_count[var_name] = 0
-        else:
-            self.var_count[var_name] += 1
-        return f"{var_name}_{self.var_count[var_name]}"
+    def input_value(self, var_id):
+        """Return the input value of a variable, creating it on first use."""
+        value = self.input_values.get(var_id)
+        if value is None:
+            value = self.program.new_value(var_id, is_input=True)
+            self.input_values[var_id] = value
+        return value
+
+    def var_slot(self, var_name):
+        """
+        Return the id of a variable, making room for it in the renaming
+        environment (variables first seen on another path are not in it yet).
+        """
+        var_id = self.program.var_id(var_name)
+        if var_id >= len(self.env):
+            self.env.extend([-1] * (var_id + 1 - len(self.env)))
+        return var_id
+
+    def lookup(self, var_name):
+        """
+        Return the value id of the current version of a variable. Reading a
+        variable that was never assigned yields its input value.
+        """
+        var_id = self.var_slot(var_name)
+        value = self.env[var_id]
+        if value < 0:
+            value = self.input_value(var_id)
+            self.env[var_id] = value
+        return value
+
+    def has_version(self, var_name):
+        """Whether a variable has a current version (it was assigned or read before)."""
+        var_id = self.program.var_ids.get(var_name)
+        return var_id is not None and var_id < len(self.env) and self.env[var_id] >= 0
+
+    def define(self, var_name):
+        """Create a new version of a variable and make it current."""
+        program = self.program
+        var_id = self.var_slot(var_name)
+        value = program.new_value(var_id)
+        self.env[var_id] = value
+        return value
+
+    def rename(self, expr, substitutions=None):
+        """
+        Return a copy of an expression with every variable replaced by a
+        reference to its current SSA value. Runs in time linear in the size of
+        the expression.
+
+        Args:
+            expr: Expression node from the parser
+            substitutions (dict): Optional variable name -> IR expression
+                used instead of the current value of that variable
+
+        Returns:
+            Expr: The renamed expression
+        """
+        if isinstance(expr, Var):
+            if substitutions and expr.name in substitutions:
+                return substitutions[expr.name]
+            return Ref(self.lookup(expr.name), expr.lineno, expr.col)
+        if isinstance(expr, BinOp):
+            return BinOp(expr.op, self.rename(expr.left, substitutions), self.rename(expr.right, substitutions),
+                         expr.lineno, expr.col)
+        if isinstance(expr, UnaryOp):
+            return UnaryOp(expr.op, self.rename(expr.operand, substitutions), expr.lineno, expr.col)
+        # Constants are immutable and can be shared with the AST
+        return expr
+
+    def emit(self, instr):
+        self.program.blocks[self.block].append(instr)
 
     def convert_to_ssa(self, statements, unroll_depth=3):
         """
         Convert statements to SSA form, with loop unrolling.
-        
+
         Args:
             statements: List of statements to convert
             unroll_depth: Number of times to unroll loops
+
+        Returns:
+            SSAProgram: The program in SSA form
         """
+        self.convert_statements(statements, unroll_depth)
+        return self.finish(unroll_depth)
+
+    def finish(self, unroll_depth):
+        """Record the final versions of the variables and return the program."""
+        self.program.final_values = {var_id: value for var_id, value in enumerate(self.env) if value >= 0}
+        self.program.unroll_depth = unroll_depth
+        return self.program
+
+    def convert_statements(self, statements, unroll_depth):
+        """Convert a list of statements into the current block."""
         for stmt in statements:
             if isinstance(stmt, list):
                 # Recursively process nested blocks
-                self.convert_to_ssa(stmt, unroll_depth)
-            elif stmt['type'] == 'assign':
-                new_var = self.new_var(stmt['var'])
-                
-                # Replace variables in expression with their latest SSA versions
-                expr = stmt['expr']
-                for var, count in self.var_count.items():
-                    if var in expr:
-                        expr = re.sub(r'\b' + var + r'\b', f"{var}_{count}", expr)
-                
-                self.ssa_form.append(f"{new_var} := {expr}")
-            elif stmt['type'] == 'if':
-                # Handle if condition
-                condition = stmt['condition']
-                
-                # Replace variables in condition with their latest SSA versions
-                for var, count in self.var_count.items():
-                    if var in condition:
-                        condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", condition)
-                
-                self.ssa_form.append(f"if ({condition})")
-                self.convert_to_ssa(stmt['body'], unroll_depth)
-                if 'else' in stmt:
-                    self.ssa_form.append("else")
-                    self.convert_to_ssa(stmt['else'], unroll_depth)
-            elif stmt['type'] == 'assert':
-                # Handle assert condition
-                condition = stmt['condition']
-                
-                # Replace variables in condition with their latest SSA versions
-                for var, count in self.var_count.items():
-                    if var in condition:
-                        condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", condition)
-                
-                self.ssa_form.append(f"assert({condition})")
-            elif stmt['type'] == 'while':
+                self.convert_statements(stmt, unroll_depth)
+            elif isinstance(stmt, Assign):
+                self.convert_assign(stmt)
+            elif isinstance(stmt, If):
+                self.convert_if(stmt, unroll_depth)
+            elif isinstance(stmt, (Assert, Invariant)):
+                # Invariants outside a loop are checked like assertions
+                self.emit_check(stmt)
+            elif isinstance(stmt, While):
                 # Unroll while loop
                 self.unroll_while_loop(stmt, unroll_depth)
-            elif stmt['type'] == 'for':
+            elif isinstance(stmt, For):
                 # Unroll for loop
                 self.unroll_for_loop(stmt, unroll_depth)
-                
-        return self.ssa_form
-    
+
+    def convert_assign(self, stmt):
+        """Emit the SSA definition for an assignment statement."""
+        # The right-hand side sees the versions from before this assignment
+        expr = self.rename(stmt.expr)
+        self.emit(Instr(ASSIGN, self.define(stmt.var), (expr,), stmt.lineno))
+
+    def convert_branch(self, condition, body, orelse, unroll_depth, lineno):
+        """
+        Emit a BRANCH instruction, convert its bodies into new blocks and merge
+        the versions defined on the two paths with PHI instructions.
+
+        Args:
+            condition: Renamed branch condition
+            body: Statements of the then branch
+            orelse: Statements of the else branch, or None
+            unroll_depth: Number of times to unroll nested loops
+            lineno: Source line of the branching statement
+        """
+        program = self.program
+        then_block = program.new_block()
+        else_block = program.new_block() if orelse is not None else None
+        self.emit(Instr(BRANCH, None, (condition, then_block, else_block), lineno))
+
+        parent_block = self.block
+        entry_env = list(self.env)
+
+        self.block = then_block
+        self.convert_statements(body, unroll_depth)
+        then_env = self.env
+
+        self.env = list(entry_env)
+        if orelse is not None:
+            self.block = else_block
+            self.convert_statements(orelse, unroll_depth)
+        else_env = self.env
+        self.block = parent_block
+
+        # Join point: every variable whose version differs between the paths
+        # gets a new version selected by the branch condition
+        num_vars = len(program.var_names)
+        for env in (then_env, else_env):
+            env.extend([-1] * (num_vars - len(env)))
+        self.env = list(then_env)
+        for var_id in range(num_vars):
+            then_value = then_env[var_id]
+            else_value = else_env[var_id]
+            if then_value == else_value:
+                continue
+            # A variable only assigned on one path is undefined (arbitrary) on
+            # the other, which is modelled by its input value
+            if then_value < 0:
+                then_value = self.input_value(var_id)
+            if else_value < 0:
+                else_value = self.input_value(var_id)
+            if then_value == else_value:
+                self.env[var_id] = then_value
+                continue
+            value = program.new_value(var_id)
+            self.emit(Instr(PHI, value, (condition, then_value, else_value), lineno))
+            self.env[var_id] = value
+
+    def convert_guarded(self, condition, statements, unroll_depth, lineno):
+        """
+        Convert statements into a branch taken when condition holds, and
+        discard the versions they define: their assertions are checked on the
+        current state without changing it.
+        """
+        block = self.program.new_block()
+        self.emit(Instr(BRANCH, None, (condition, block, None), lineno))
+        parent_block, entry_env = self.block, list(self.env)
+        self.block = block
+        self.convert_statements(statements, unroll_depth)
+        self.block, self.env = parent_block, entry_env
+
+    def convert_if(self, stmt, unroll_depth):
+        # Rename the condition before the branches define new versions
+        condition = self.rename(stmt.condition)
+        self.convert_branch(condition, stmt.body, stmt.orelse, unroll_depth, stmt.lineno)
+
+    def emit_check(self, stmt):
+        """Emit the condition of an assertion or invariant as an ASSERT (or ASSUME)."""
+        op = ASSUME if self.assume_asserts else ASSERT
+        self.emit(Instr(op, None, (self.rename(stmt.condition),), stmt.lineno))
+
+    def assume(self, stmt):
+        """Emit the condition of an assertion or invariant as an ASSUME."""
+        self.emit(Instr(ASSUME, None, (self.rename(stmt.condition),), stmt.lineno))
+
+    def havoc(self, var_name, lineno=0):
+        """Give a variable a new, arbitrary version."""
+        self.emit(Instr(HAVOC, self.define(var_name), (), lineno))
+
+    def loop_parts(self, loop_stmt):
+        """
+        Split a loop into its invariants and the statements of one iteration.
+        Invariant annotations are taken out of the body; the iteration of a
+        for loop ends with its update.
+
+        Returns:
+            tuple: (list of Invariant statements, list of body statements)
+        """
+        invariants = [stmt for stmt in loop_stmt.body if isinstance(stmt, Invariant)]
+        body = [stmt for stmt in loop_stmt.body if not isinstance(stmt, Invariant)]
+        if isinstance(loop_stmt, For) and loop_stmt.update is not None:
+            body.append(loop_stmt.update)
+        return invariants, body
+
+    def unroll_loop(self, loop_stmt, unroll_depth):
+        """
+        Unroll the iterations of a loop, checking its invariants at the head
+        of every iteration and after the last one, and assume it exits.
+        """
+        if self.accelerate and self.accelerate_loop(loop_stmt, unroll_depth):
+            return
+        invariants, body = self.loop_parts(loop_stmt)
+        # Add a conditional check before each unrolled iteration
+        for i in range(unroll_depth):
+            for invariant in invariants:
+                self.emit_check(invariant)
+            condition = self.rename(loop_stmt.condition)
+            self.convert_branch(condition, body, None, unroll_depth, loop_stmt.lineno)
+
+        for invariant in invariants:
+            self.emit_check(invariant)
+        self.assume_exit(loop_stmt)
+
+    def induction_steps(self, body):
+        """
+        Return {variable: (op, step)} if every statement of a loop body adds
+        (op '+') or subtracts (op '-') a loop-invariant amount step to a
+        variable, as in "x := x + 2" or "x := x - n", each variable being
+        assigned once; otherwise None.
+        """
+        assigned = set(assigned_names(body))
+        steps = {}
+        for stmt in body:
+            if not isinstance(stmt, Assign) or stmt.var in steps:
+                return None
+            expr = stmt.expr
+            if not isinstance(expr, BinOp) or expr.op not in ('+', '-'):
+                return None
+            if isinstance(expr.left, Var) and expr.left.name == stmt.var:
+                step = expr.right
+            elif expr.op == '+' and isinstance(expr.right, Var) and expr.right.name == stmt.var:
+                step = expr.left
+            else:
+                return None
+            if step.is_boolean or expr_names(step) & assigned:
+                return None
+            steps[stmt.var] = (expr.op, step)
+        return steps
+
+    def accelerate_loop(self, loop_stmt, unroll_depth):
+        """
+        Convert a counting loop to closed form in constant size: with a
+        symbolic trip count n (0 <= n <= unroll_depth, as for an unrolled
+        loop), each induction variable ends at its entry value plus n times
+        its step. The loop condition must hold at the first and last
+        iteration and fail after the last; it is an (in)equality affine in
+        the iteration number, or a conjunction of such, so it then holds at
+        every iteration in between.
+
+        Returns:
+            bool: False (and nothing emitted) if the loop has invariants, is
+                not a counting loop with such a condition, or starts from a
+                state without free values
+        """
+        if not self.program.inputs and all(self.has_version(name) for name in expr_names(loop_stmt.condition)):
+            # Nothing the loop starts from is free, so it runs the same way every
+            # time: unrolled, it is folded to constants and can be run directly
+            return False
+        invariants, body = self.loop_parts(loop_stmt)
+        if invariants:
+            return False
+        steps = self.induction_steps(body)
+        if not steps or not convex_condition(loop_stmt.condition, steps):
+            return False
+
+        program = self.program
+        lineno, col = loop_stmt.lineno, loop_stmt.col
+        # The trip count is not a program variable, so it has no current version
+        var_id = self.var_slot(f"trips@{lineno}")
+        trips = program.new_value(var_id)
+        self.emit(Instr(HAVOC, trips, (), lineno))
+        count = Ref(trips, lineno, col)
+
+        entry = {name: Ref(self.lookup(name), lineno, col) for name in steps}
+        increments = {name: self.rename(step) for name, (_, step) in steps.items()}
+
+        def state(iterations):
+            return {name: BinOp(op, entry[name], BinOp('*', increments[name], iterations, lineno, col), lineno, col)
+                    for name, (op, _) in steps.items()}
+
+        bounds = BinOp('&&', BinOp('<=', Num(0), count, lineno, col),
+                       BinOp('<=', count, Num(unroll_depth), lineno, col), lineno, col)
+        self.emit(Instr(ASSUME, None, (bounds,), lineno))
+        first = self.rename(loop_stmt.condition)
+        last = self.rename(loop_stmt.condition, state(BinOp('-', count, Num(1), lineno, col)))
+        runs = BinOp('||', BinOp('==', count, Num(0), lineno, col), BinOp('&&', first, last, lineno, col),
+                     lineno, col)
+        self.emit(Instr(ASSUME, None, (runs,), lineno))
+
+        for name, value in state(count).items():
+            self.emit(Instr(ASSIGN, self.define(name), (value,), lineno))
+        self.assume_exit(loop_stmt)
+        self.accelerated_loops += 1
+        return True
+
+    def assume_exit(self, loop_stmt):
+        """After unrolling, assume the loop condition is false."""
+        condition = UnaryOp('!', self.rename(loop_stmt.condition), loop_stmt.lineno, loop_stmt.col)
+        self.emit(Instr(ASSUME, None, (condition,), loop_stmt.lineno))
+
     def unroll_while_loop(self, while_stmt, unroll_depth):
         """
         Unroll a while loop for a specified number of iterations.
-        
+
         Args:
             while_stmt: The while statement to unroll
             unroll_depth: Number of times to unroll the loop
         """
-        # Add a conditional check before each unrolled iteration
-        for i in range(unroll_depth):
-            # Replace variables in condition with their latest SSA versions
-            condition = while_stmt['condition']
-            for var, count in self.var_count.items():
-                if var in condition:
-                    condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", condition)
-            
-            # Create condition check
-            self.ssa_form.append(f"if ({condition})")
-            
-            # Process the body statements for this iteration and update the body for next iteration
-            # We need to track the SSA variables created for the variables modified in the loop body
-            modified_vars = {}
-            for stmt in while_stmt['body']:
-                if stmt['type'] == 'assign':
-                    # Get the variable being assigned
-                    modified_vars[stmt['var']] = True
-
-                    # Replace variables in the expression with their latest SSA versions
-                    expr = stmt['expr']
-                    for var, count in self.var_count.items():
-                        if var in expr:
-                            expr = re.sub(r'\b' + var + r'\b', f"{var}_{count}", expr)
-                    
-                    # Create new SSA variable for the assigned variable
-                    new_var = self.new_var(stmt['var'])
-                    self.ssa_form.append(f"{new_var} := {expr}")
-            
-        # After unrolling, add an assertion that the loop condition is eventually false
-        final_condition = while_stmt['condition']
-        for var, count in self.var_count.items():
-            if var in final_condition:
-                final_condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", final_condition)
-        
-        # Add negated condition assertion
-        self.ssa_form.append(f"assert(!({final_condition}))")
-    
+        self.unroll_loop(while_stmt, unroll_depth)
+
     def unroll_for_loop(self, for_stmt, unroll_depth):
         """
         Unroll a for loop for a specified number of iterations.
-        
+
         Args:
             for_stmt: The for statement to unroll
             unroll_depth: Number of times to unroll the loop
         """
         # Process initialization (only once)
-        if 'init' in for_stmt:
-            init_var = for_stmt['init']['var']
-            init_expr = for_stmt['init']['expr']
-            
-            # Replace variables in init expression with their latest SSA versions
-            for var, count in self.var_count.items():
-                if var in init_expr:
-                    init_expr = re.sub(r'\b' + var + r'\b', f"{var}_{count}", init_expr)
-                    
-            new_var = self.new_var(init_var)
-            self.ssa_form.append(f"{new_var} := {init_expr}")
-        
-        # Unroll the loop body and increment
-        for i in range(unroll_depth):
-            # Update condition with latest SSA variables
-            condition = for_stmt['condition']
-            for var, count in self.var_count.items():
-                if var in condition:
-                    condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", condition)
-            
-            # Check condition before each iteration
-            self.ssa_form.append(f"if ({condition})")
-            
-            # Process the body statements
-            modified_vars = {}
-            for stmt in for_stmt['body']:
-                if stmt['type'] == 'assign':
-                    # Get the variable being assigned
-                    modified_vars[stmt['var']] = True
-
-                    # Replace variables in the expression with their latest SSA versions
-                    expr = stmt['expr']
-                    for var, count in self.var_count.items():
-                        if var in expr:
-                            expr = re.sub(r'\b' + var + r'\b', f"{var}_{count}", expr)
-                    
-                    # Create new SSA variable for the assigned variable
-                    new_var = self.new_var(stmt['var'])
-                    self.ssa_form.append(f"{new_var} := {expr}")
-            
-            # Process increment
-            if 'update' in for_stmt:
-                update_var = for_stmt['update']['var']
-                update_expr = for_stmt['update']['expr']
-                
-                # Replace variables in update expression with their latest SSA versions
-                for var, count in self.var_count.items():
-                    if var in update_expr:
-                        update_expr = re.sub(r'\b' + var + r'\b', f"{var}_{count}", update_expr)
-                
-                new_var = self.new_var(update_var)
-                self.ssa_form.append(f"{new_var} := {update_expr}")
-        
-        # Add final condition check after unrolling
-        final_condition = for_stmt['condition']
-        for var, count in self.var_count.items():
-            if var in final_condition:
-                final_condition = re.sub(r'\b' + var + r'\b', f"{var}_{count}", final_condition)
-        
-        self.ssa_form.append(f"assert(!({final_condition}))")
-
-    def optimize_ssa(self):
-        # Implement optimizations like constant propagation, dead code elimination
-        pass
+        if for_stmt.init is not None:
+            self.convert_assign(for_stmt.init)
+
+        # The update runs at the end of every iteration, after the body
+        self.unroll_loop(for_stmt, unroll_depth)
+
+    def optimize_ssa(self, live_vars=None):
+        """
+        Simplify the converted program in place:
+
+        1. Constant folding and propagation, and copy propagation: values
+           defined as a constant or as another value are replaced by it in
+           every use; branches and phis with a constant condition are
+           resolved, and assertions/assumptions that fold to true dropped.
+        2. Dead code elimination (slicing): only instructions that assertions,
+           assumptions or the final values of live_vars depend on are kept,
+           and branches left empty are removed.
+
+        Args:
+            live_vars (list): Variables whose final values must be kept (the
+                outputs); all variables by default
+
+        Returns:
+            dict: Counts - "constants" and "copies" (uses replaced),
+                "branches" (branches resolved), "removed" (instructions
+                eliminated) and "instructions" (instructions left)
+        """
+        program = self.program
+        stats = {"constants": 0, "copies": 0, "branches": 0, "removed": 0, "instructions": 0}
+        before = len(program)
+
+        program.blocks[0] = self.propagate_block(0, {}, stats)
+
+        if live_vars is None:
+            live = set(program.final_values.values())
+        else:
+            live = {program.final_value(name) for name in live_vars} - {None}
+        removed = []
+        slice_block(program, 0, live, removed)
+        program.dead_values.update(removed)
+
+        stats["instructions"] = len(program)
+        stats["removed"] = before - stats["instructions"]
+        program.optimization = stats
+        return stats
+
+    def propagate_block(self, block, values, stats):
+        """
+        Fold and propagate constants and copies through a block.
+
+        Args:
+            block (int): Block to simplify
+            values (dict): Value id -> Num or Ref known to be equal to it
+            stats (dict): Counts to update
+
+        Returns:
+            list: The simplified instructions of the block
+        """
+        program = self.program
+        instrs = []
+        for instr in program.blocks[block]:
+            op = instr.op
+            if op == ASSIGN:
+                expr = fold_expr(instr.args[0], values, stats, self.width)
+                if isinstance(expr, (Num, Ref)):
+                    values[instr.dest] = expr
+                instr.args = (expr,)
+            elif op == PHI:
+                condition, then_value, else_value = instr.args
+                condition = fold_expr(condition, values, stats, self.width)
+                # Merged values that are copies of another value are replaced by it
+                then_value, else_value = (self.source_value(value, values, stats)
+                                          for value in (then_value, else_value))
+                if isinstance(condition, Num) or then_value == else_value:
+                    chosen = then_value if not isinstance(condition, Num) or condition.value else else_value
+                    expr = values.get(chosen, Ref(chosen, instr.lineno))
+                    values[instr.dest] = expr
+                    instr = Instr(ASSIGN, instr.dest, (expr,), instr.lineno)
+                else:
+                    instr.args = (condition, then_value, else_value)
+            elif op == BRANCH:
+                condition, then_block, else_block = instr.args
+                condition = fold_expr(condition, values, stats, self.width)
+                if isinstance(condition, Num):
+                    # Only one side can run: its instructions move to this block
+                    stats["branches"] += 1
+                    taken = then_block if condition.value else else_block
+                    if taken is not None:
+                        instrs.extend(self.propagate_block(taken, values, stats))
+                        program.blocks[taken] = []
+                    for skipped in (then_block, else_block):
+                        if skipped is not None and skipped != taken:
+                            program.dead_values.update(instr.dest for instr, _ in program.instructions(skipped)
+                                                       if instr.dest is not None)
+                            program.blocks[skipped] = []
+                    continue
+                program.blocks[then_block] = self.propagate_block(then_block, values, stats)
+                if else_block is not None:
+                    program.blocks[else_block] = self.propagate_block(else_block, values, stats)
+                instr.args = (condition, then_block, else_block)
+            elif op in (ASSERT, ASSUME):
+                condition = fold_expr(instr.args[0], values, stats, self.width)
+                if isinstance(condition, Num) and condition.value:
+                    continue  # Always holds
+                instr.args = (condition,)
+            instrs.append(instr)
+        return instrs
+
+    def source_value(self, value, values, stats):
+        """Return the value a value is a copy of (or the value itself)."""
+        known = values.get(value)
+        if isinstance(known, Ref):
+            stats["copies"] += 1
+            return known.value
+        return value
+
+
+def expr_names(expr):
+    """Return the set of variable names an expression reads."""
+    if isinstance(expr, Var):
+        return {expr.name}
+    if isinstance(expr, BinOp):
+        return expr_names(expr.left) | expr_names(expr.right)
+    if isinstance(expr, UnaryOp):
+        return expr_names(expr.operand)
+    return set()
+
+def slice_block(program, block, live, removed):
+    """
+    Remove the instructions of a block that nothing live depends on,
+    walking it backwards so every use is seen before its definition.
+
+    Args:
+        program (SSAProgram): Program whose blocks are sliced in place
+        block (int): Block to slice
+        live (set): Value ids needed so far; extended with the operands
+            of the instructions kept
+        removed (list): Receives the values whose definitions are removed
+
+    Returns:
+        bool: Whether any instruction of the block is kept
+    """
+    kept = []
+    for instr in reversed(program.blocks[block]):
+        op = instr.op
+        if op in (ASSERT, ASSUME):
+            live.update(expr_values(instr.args[0]))
+        elif op == BRANCH:
+            condition, then_block, else_block = instr.args
+            then_kept = slice_block(program, then_block, live, removed)
+            else_kept = else_block is not None and slice_block(program, else_block, live, removed)
+            if not (then_kept or else_kept):
+                continue
+            live.update(expr_values(condition))
+        elif instr.dest not in live:
+            removed.append(instr.dest)
+            continue
+        elif op == PHI:
+            condition, then_value, else_value = instr.args
+            live.update(expr_values(condition))
+            live.update((then_value, else_value))
+        else:
+            for arg in instr.args:
+                live.update(expr_values(arg))
+        kept.append(instr)
+    kept.reverse()
+    program.blocks[block] = kept
+    return bool(kept)
+
+def slice_program(program, output_vars):
+    """
+    Return a copy of a program reduced to the cone of influence of the final
+    values of output_vars: only the instructions those values, or the
+    program's assertions and assumptions, depend on are kept. The original
+    program is not modified.
+    """
+    sliced = copy.copy(program)
+    sliced.blocks = [list(block) for block in program.blocks]
+    sliced.dead_values = set(program.dead_values)
+    live = {program.final_value(name) for name in output_vars} - {None}
+    removed = []
+    slice_block(sliced, 0, live, removed)
+    sliced.dead_values.update(removed)
+    return sliced
+
+def fold_expr(expr, values, stats, width=None):
+    """
+    Return an IR expression with known values substituted and constant
+    subexpressions folded.
+
+    Args:
+        expr: IR expression
+        values (dict): Value id -> Num or Ref known to be equal to it
+        stats (dict): "constants"/"copies" counts of substituted uses to update
+        width (int): Bits of machine integers: operations whose operands or
+            result fall outside their range are left for the encoding to
+            wrap around (and check for overflow)
+    """
+    if isinstance(expr, Ref):
+        known = values.get(expr.value)
+        if known is None:
+            return expr
+        stats["constants" if isinstance(known, Num) else "copies"] += 1
+        return known
+    if isinstance(expr, UnaryOp):
+        operand = fold_expr(expr.operand, values, stats, width)
+        if isinstance(operand, Num):
+            result = apply_op(expr.op, operand.value)
+            if fits(width, operand.value, result):
+                return Num(result, expr.lineno, expr.col)
+        return UnaryOp(expr.op, operand, expr.lineno, expr.col)
+    if isinstance(expr, BinOp):
+        left = fold_expr(expr.left, values, stats, width)
+        right = fold_expr(expr.right, values, stats, width)
+        if isinstance(left, Num) and isinstance(right, Num):
+            result = apply_op(expr.op, left.value, right.value)
+            if result is not None and fits(width, left.value, right.value, result):
+                return Num(result, expr.lineno, expr.col)
+        return BinOp(expr.op, left, right, expr.lineno, expr.col)
+    return expr
+
+def fits(width, *numbers):
+    """Whether integers are in the range of signed machine integers of width bits (always if width is None)."""
+    if width is None:
+        return True
+    bound = 1 << (width - 1)
+    return all(-bound <= number < bound for number in numbers)
+
+def induction_degree(expr, induction):
+    """
+    Return the degree of an integer expression as a polynomial of the
+    induction variables (other variables count as constants), or None if it
+    is not one (e.g. it divides by an induction variable).
+    """
+    if not expr_names(expr) & set(induction):
+        return 0
+    if isinstance(expr, Var):
+        return 1
+    if isinstance(expr, UnaryOp):
+        return induction_degree(expr.operand, induction) if expr.op == '-' else None
+    if expr.is_boolean or expr.op == '/':
+        return None
+    left = induction_degree(expr.left, induction)
+    right = induction_degree(expr.right, induction)
+    if left is None or right is None:
+        return None
+    return left + right if expr.op == '*' else max(left, right)
+
+def convex_condition(expr, induction):
+    """
+    Whether a loop condition holds on an interval of iterations when the
+    induction variables change by a fixed step per iteration: a conjunction
+    of order comparisons whose sides are affine in the induction variables.
+    """
+    if not expr_names(expr) & set(induction):
+        return True
+    if isinstance(expr, UnaryOp) and expr.op == '!':
+        return isinstance(expr.operand, BinOp) and expr.operand.op in ORDER_OPS \
+            and convex_condition(expr.operand, induction)
+    if not isinstance(expr, BinOp):
+        return False
+    if expr.op == '&&':
+        return convex_condition(expr.left, induction) and convex_condition(expr.right, induction)
+    if expr.op in ORDER_OPS:
+        degrees = (induction_degree(expr.left, induction), induction_degree(expr.right, induction))
+        return None not in degrees and max(degrees) <= 1
+    return False
+
+def assigned_names(statements):
+    """Return the names of the variables assigned anywhere in statements, in order."""
+    names = []
+    for stmt in statements:
+        if isinstance(stmt, list):
+            nested = assigned_names(stmt)
+        elif isinstance(stmt, Assign):
+            nested = [stmt.var]
+        elif isinstance(stmt, If):
+            nested = assigned_names(stmt.body) + assigned_names(stmt.orelse or [])
+        elif isinstance(stmt, While):
+            nested = assigned_names(stmt.body)
+        elif isinstance(stmt, For):
+            nested = assigned_names([part for part in (stmt.init, stmt.update) if part is not None] + stmt.body)
+        else:
+            nested = []
+        names.extend(name for name in nested if name not in names)
+    return names
 
 # Example usage
-ssa_converter = SSAConverter()
-statements = [
-    {'type': 'assign', 'var': 'x', 'expr': '3'},
-    {'type': 'if', 'condition': '(x < 5)', 'body': [
-        {'type': 'assign', 'var': 'y', 'expr': 'x + 1'}
-    ], 'else': [
-        {'type': 'assign', 'var': 'y', 'expr': 'x - 1'}
-    ]},
-    {'type': 'assert', 'condition': 'y > 0'}
-]
-ssa_form = ssa_converter.convert_to_ssa(statements)
-print("SSA Form:", ssa_form) 
\ No newline at end of file
+if __name__ == "__main__":
+    from parser import parse_program
+
+    ssa_converter = SSAConverter()
+    statements = parse_program("""
+x := 3;
+if (x < 5) {
+    y := x + 1;
+} else {
+    y := x - 1;
+}
+assert(y > 0);
+""")
+    ssa_program = ssa_converter.convert_to_ssa(statements)
+    print("SSA Form:")
+    print(ssa_program)
@@ -0,0 +1,130 @@
+# Solver strategies
+# A strategy is a list of tiers tried in order on the same query: cheap
+# configurations with a small budget come first, and a query only escalates
+# to a more expensive tier when the previous ones answered unknown.
+from z3 import Then, sat, unknown
+
+# Budget of the cheap first tier, in milliseconds
+QUICK_TIMEOUT = 1000
+
+
+class Tier:
+    """
+    One solver configuration of a strategy.
+
+    A tier without a tactic checks the query on the caller's own solver, so
+    incremental state (scopes, learned lemmas) is reused. A tier with a
+    tactic copies the solver's assertions into a fresh solver built from the
+    tactic.
+    """
+
+    def __init__(self, name, tactic=None, timeout=None, rlimit=None):
+        self.name = name
+        self.tactic = tactic      # function returning a Z3 tactic, or None
+        self.timeout = timeout    # milliseconds, None for no limit
+        self.rlimit = rlimit      # Z3 resource limit, None for no limit
+
+    def configure(self, solver):
+        solver.set("timeout", self.timeout or 0)
+        solver.set("rlimit", self.rlimit or 0)
+
+    def check(self, solver, assumptions=()):
+        """
+        Check the assertions of a solver with this tier.
+
+        Args:
+            solver: Z3 solver holding the query
+            assumptions: Boolean literals assumed for this check only
+
+        Returns:
+            tuple: (result, model, name) - model is None unless the result is
+                sat; name identifies the configuration that answered
+        """
+        if self.tactic is not None:
+            # Tactic solvers are not incremental, so assumptions become assertions of the copy
+            tactic_solver = self.tactic().solver()
+            tactic_solver.add(solver.assertions())
+            tactic_solver.add(list(assumptions))
+            solver, assumptions = tactic_solver, ()
+        self.configure(solver)
+        result = solver.check(*assumptions)
+        return result, solver.model() if result == sat else None, self.name
+
+    def __repr__(self):
+        return f"Tier({self.name!r}, timeout={self.timeout!r}, rlimit={self.rlimit!r})"
+
+
+def linear_tactic():
+    """Simplification followed by the linear integer arithmetic solver."""
+    return Then('simplify', 'propagate-values', 'solve-eqs', 'qflia')
+
+def nonlinear_tactic():
+    """Simplification followed by the nonlinear integer arithmetic solver."""
+    return Then('simplify', 'propagate-values', 'qfnia')
+
+def bitvector_tactic():
+    """Simplification followed by bit-blasting to a SAT solver (for bit-vector encodings)."""
+    return Then('simplify', 'propagate-values', 'solve-eqs', 'qfbv')
+
+def default_tiers(timeout=None, rlimit=None):
+    """
+    Return the default escalation strategy:
+
+    1. "linear": simplify + linear arithmetic, with a short time limit
+    2. "incremental": Z3's default solver on the caller's solver, with the
+       full limits
+    3. "nonlinear": simplify + nonlinear arithmetic, with twice the limits
+
+    Args:
+        timeout (int): Time limit of the main tier in milliseconds, or None
+        rlimit (int): Resource limit of the main tier, or None
+
+    Returns:
+        list: Tiers in the order they are tried
+    """
+    quick = min(QUICK_TIMEOUT, timeout) if timeout else QUICK_TIMEOUT
+    return [
+        Tier("linear", linear_tactic, quick, rlimit),
+        Tier("incremental", None, timeout, rlimit),
+        Tier("nonlinear", nonlinear_tactic, timeout and timeout * 2, rlimit and rlimit * 2),
+    ]
+
+def bitvector_tiers(timeout=None, rlimit=None):
+    """
+    Return the strategy used for bit-vector encodings instead of the default:
+
+    1. "bit-blast": simplify + bit-blasting, with a short time limit
+    2. "incremental": Z3's default solver on the caller's solver, with the
+       full limits
+    """
+    quick = min(QUICK_TIMEOUT, timeout) if timeout else QUICK_TIMEOUT
+    return [
+        Tier("bit-blast", bitvector_tactic, quick, rlimit),
+        Tier("incremental", None, timeout, rlimit),
+    ]
+
+def single_tier(timeout=None, rlimit=None):
+    """Return a strategy that only runs Z3's default solver, without escalation."""
+    return [Tier("incremental", None, timeout, rlimit)]
+
+def run_tiers(tiers, solver, stop=None, assumptions=()):
+    """
+    Check a solver with each tier in turn until one answers sat or unsat.
+
+    Args:
+        tiers (list): Tiers to try
+        solver: Z3 solver holding the query
+        stop: Optional function returning True if no further tier may run
+            (e.g. because the user cancelled the check); checked before each tier
+        assumptions: Boolean literals assumed for this check only
+
+    Returns:
+        tuple: (result, model, tier name) - the tier name is None if no tier answered
+    """
+    for tier in tiers:
+        if stop is not None and stop():
+            break
+        result, model, name = tier.check(solver, assumptions)
+        if result != unknown:
+            return result, model, name
+    return unknown, None, None
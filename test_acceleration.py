@@ -0,0 +1,34 @@
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+
+LOOPS = [
+    "x := 0; while (x < n) { x := x + 1; } assert(x == n);",
+    "x := 10; while (x > 0) { x := x - 3; } assert(x == -2);",
+    "x := 0; y := 5; while (x < 10 && y > x) { x := x + 2; y := y + s; } assert(y > 6);",
+    "for (j := 0; j < m; j := j + 1) { s := s + 3; } assert(s == 9);",
+]
+
+def main():
+    print("STEP 1: A counting loop becomes a closed form with a symbolic trip count...")
+    converter = SSAConverter()
+    print(converter.convert_to_ssa(parse_program(LOOPS[0]), unroll_depth=1000))
+    print(f"Accelerated loops: {converter.accelerated_loops}")
+
+    print("\nSTEP 2: Loops that are not counting loops are still unrolled...")
+    converter = SSAConverter()
+    program = converter.convert_to_ssa(parse_program("i := 0; while (i < 3) { s := s + i; i := i + 1; }"), 2)
+    print(program)
+    print(f"Accelerated loops: {converter.accelerated_loops}")
+
+    print("\nSTEP 3: Closed forms give the same results as unrolling...")
+    generator = SMTGenerator()
+    for program_text in LOOPS:
+        statements = parse_program(program_text)
+        for depth in (0, 2, 5):
+            accelerated = generator.verify(SSAConverter().convert_to_ssa(statements, depth))[0]
+            unrolled = generator.verify(SSAConverter(accelerate=False).convert_to_ssa(statements, depth))[0]
+            print(f"depth {depth}: {accelerated} / {unrolled}  {program_text}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import io
+import json
+import os
+
+from batch import collect_programs, discover_pairs, run_batch, run_equivalence_batch
+
+def main():
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    examples_dir = os.path.join(repo_dir, "examples", "verification")
+
+    print("STEP 1: Collecting programs...")
+    paths = collect_programs([examples_dir], [])
+    print(f"Found {len(paths)} programs")
+
+    print("\nSTEP 2: Verifying them in a process pool...")
+    output = io.StringIO()
+    counts = run_batch(paths, output, workers=2)
+    for line in sorted(output.getvalue().splitlines()):
+        record = json.loads(line)
+        stages = ", ".join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in record["timings"].items())
+        print(f"{os.path.basename(record['path'])}: {record['result']} ({stages})")
+    print(f"Counts: {counts}")
+
+    print("\nSTEP 3: Checking the equivalence example pairs...")
+    pairs = discover_pairs(os.path.join(repo_dir, "examples", "equivalence"))
+    output = io.StringIO()
+    run_equivalence_batch(pairs, output, workers=2)
+    for line in sorted(output.getvalue().splitlines()):
+        record = json.loads(line)
+        print(f"{record['pair']}: {record['result']} {record['counterexamples']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from parser import parse_program
+from ast_nodes import apply_op
+from smt import SMTGenerator
+from bmc import BoundedModelChecker
+from pipeline import convert_source, verify_source
+
+def check(program_text, width=None, check_overflow=False):
+    generator = SMTGenerator(width=width, check_overflow=check_overflow)
+    return BoundedModelChecker(generator).check(parse_program(program_text), max_depth=3)
+
+def main():
+    print("STEP 1: Increments wrap around machine integers...")
+    for width in (None, 8, 32):
+        print(width, check("y := x + 1; assert(y > x);", width))
+
+    print("\nSTEP 2: Overflow checks fail like assertions...")
+    print(check("y := x * 3;", 32))
+    print(check("y := x * 3;", 32, check_overflow=True))
+    print(check("if (x > 0 && x < 1000) { y := x * 3; }", 32, check_overflow=True))
+    print(check("y := -x;", 8, check_overflow=True))
+
+    print("\nSTEP 3: Division stays Euclidean...")
+    generator = SMTGenerator(width=32)
+    for left, right in ((7, 2), (-7, 2), (7, -2), (-7, -2), (-8, 2)):
+        program = convert_source(f"assert(a == {left}); assert(b == {right}); q := a / b;", width=32)
+        result, model = generator.verify(program)
+        print(left, right, model["q_0"], apply_op('/', left, right))
+
+    print("\nSTEP 4: Equivalence under machine integers...")
+    generator = SMTGenerator()
+    for width in (None, 8):
+        generator.set_encoding(width)
+        doubled = convert_source("y := x * 2 / 2;", width=width)
+        plain = convert_source("y := x;", width=width)
+        print(width, generator.check_equivalence(doubled, plain, ["y"])[0], generator.last_tier)
+
+    print("\nSTEP 5: Constants are only folded within range...")
+    for width in (None, 8):
+        program = convert_source("x := 100 + 100; assert(x < 0);", width=width)
+        print(width, program.optimization["instructions"], verify_source("x := 100 + 100; assert(x < 0);", 3,
+                                                                         SMTGenerator(width=width))["result"])
+
+    print("\nSTEP 6: Changing the encoding resets the solver and the cache options...")
+    generator = SMTGenerator()
+    print(generator.set_encoding(None), generator.options, [tier.name for tier in generator.tiers])
+    print(generator.set_encoding(64, True), generator.options, [tier.name for tier in generator.tiers])
+    print(generator.set_encoding(64, True), generator.set_encoding(None, True), generator.options)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from parser import parse_program
+from bmc import BoundedModelChecker
+from pipeline import bmc_source
+
+COUNTER = """
+x := 0;
+while (x < n) {
+    x := x + 1;
+}
+assert(x < 5);
+"""
+
+def main():
+    checker = BoundedModelChecker()
+
+    print("STEP 1: Finding the minimal failing depth of a counter loop...")
+    status, depth, counterexample = checker.check(parse_program(COUNTER), max_depth=10)
+    print(f"{status} at depth {depth}, inputs: {counterexample}")
+
+    print("\nSTEP 2: Instructions reused from the previous depth...")
+    for depth, result, reused in checker.history:
+        print(f"depth {depth}: {result}, {reused} instructions kept")
+
+    print("\nSTEP 3: No failure within the bound...")
+    print(checker.check(parse_program(COUNTER), max_depth=3))
+
+    print("\nSTEP 4: A program without loops is checked once...")
+    print(checker.check(parse_program("y := x + 1; assert(y > x);"), max_depth=10))
+    print(checker.history)
+
+    print("\nSTEP 5: A failure before any loop...")
+    print(checker.check(parse_program("assert(x > x); while (x < 3) { x := x + 1; }"), max_depth=5))
+
+    print("\nSTEP 6: Pipeline record...")
+    record = bmc_source(COUNTER, 6)
+    print({key: value for key, value in record.items() if key != "timings"}, sorted(record["timings"]))
+    print(bmc_source("x := ;")["result"])
+
+    print("\nSTEP 7: Assertions that only appear inside a loop...")
+    print(checker.check(parse_program("x := 0; while (x < 5) { x := x + 1; assert(x < 5); }"), max_depth=10))
+    print(checker.check(parse_program("x := 0; while (x < n) { x := x + 1; }"), max_depth=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from cache import VerificationCache
+from pipeline import verify_source
+
+def to_ssa(program_text, unroll_depth=3):
+    return SSAConverter().convert_to_ssa(parse_program(program_text), unroll_depth)
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "results.sqlite3")
+
+    print("STEP 1: Verifying a program with an empty cache...")
+    cache = VerificationCache(path)
+    generator = SMTGenerator(cache=cache)
+    result, model = generator.verify(to_ssa("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);"))
+    print(f"Result: {result}, model: {model}, hits: {cache.hits}, misses: {cache.misses}")
+    cache.close()
+
+    print("\nSTEP 2: Re-verifying a renamed, reformatted copy after reopening the cache...")
+    cache = VerificationCache(path)
+    generator = SMTGenerator(cache=cache)
+    result, model = generator.verify(to_ssa("""
+// same program, different names
+a := 3;
+if (a < 5) { b := a + 1; }
+else { b := a - 1; }
+assert(b > 0);
+"""))
+    print(f"Result: {result}, model: {model}, hits: {cache.hits}, misses: {cache.misses}")
+
+    print("\nSTEP 3: Equivalence results are cached with their counterexamples...")
+    program1 = "x := 4; if (x > 3) { y := 10; } else { y := 0; }"
+    program2 = "x := 4; if (x > 4) { y := 10; } else { y := 0; }"
+    for _ in range(2):
+        print(generator.check_equivalence(to_ssa(program1), to_ssa(program2), ["y"]),
+              f"hits: {cache.hits}")
+    print(generator.check_equivalence(to_ssa(program1.replace("y", "out")), to_ssa(program2.replace("y", "out")),
+                                      ["out"]), f"hits: {cache.hits}")
+
+    print("\nSTEP 4: The unrolling depth is part of the key...")
+    loop = "i := 0; while (i < 4) { i := i + 1; } assert(i == 4);"
+    for depth in (3, 5, 3):
+        result, _ = generator.verify(to_ssa(loop, depth))
+        print(f"depth {depth}: {result}, hits: {cache.hits}")
+
+    print("\nSTEP 5: Least recently used entries are evicted...")
+    cache.max_entries = 2
+    generator.verify(to_ssa("z := 1; assert(z == 1);"))
+    print(f"Entries: {len(cache)}")
+
+    print("\nSTEP 6: The pipeline looks up the cache before encoding, also for programs it runs...")
+    cache.max_entries = 10000
+    for program_text in ("y := x * 2; assert(y != 7);", "x := 3; y := x * 2; assert(y == 6);"):
+        for _ in range(2):
+            record = verify_source(program_text, generator=generator)
+            print(record["result"], record["tier"], sorted(record["timings"]), f"hits: {cache.hits}")
+
+    print("\nSTEP 7: Inputs only read by folded branches are not stored...")
+    for else_branch in ("y := a;", "y := 2;"):
+        record = verify_source(f"c := 1; if (c > 0) {{ y := b; }} else {{ {else_branch} }} assert(y > 1);",
+                               generator=generator)
+        print(record["result"], record["tier"], record["model"])
+    cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import time
+import warnings
+
+import random_testing
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from concrete import ConcreteEvaluator
+from compiled import compile_program
+from random_testing import RandomTester
+from pipeline import convert_source
+
+EXAMPLES = ["examples/verification/example1.txt", "examples/verification/example2.txt",
+            "examples/verification/example3.txt", "examples/while_example.txt"]
+
+def to_ssa(program_text, width=None):
+    return SSAConverter(width=width).convert_to_ssa(parse_program(program_text))
+
+def main():
+    print("STEP 1: Compiled programs run like the evaluator...")
+    for path in EXAMPLES:
+        program = convert_source(open(path).read(), 5, optimize=False)
+        print(path, compile_program(program).run() == ConcreteEvaluator().run(program))
+
+    print("\nSTEP 2: Inputs by name, final values by variable...")
+    compiled = compile_program(to_ssa("if (x > 0) { y := x * 2; } else { y := 0 - x; } assert(y < 10); z := 10 / w;"))
+    for inputs in ({"x": -3, "w": 3}, {"x": 7, "w": -3}, {"x": 1}):
+        print(inputs, compiled.final_values(inputs))
+    print(compiled.function.__code__.co_filename.startswith("<compiled"))
+
+    print("\nSTEP 3: Machine integers wrap around and can fail on overflow...")
+    program = to_ssa("y := x + x; if (x < 0) { z := 0 - x; }", 8)
+    for check_overflow in (False, True):
+        compiled = compile_program(program, 8, check_overflow)
+        print([compiled.final_values({"x": x}) for x in (100, -128, 5)])
+
+    print("\nSTEP 4: Programs that only differ in names share their function...")
+    first = compile_program(to_ssa("a := b * 2; assert(a > b);"))
+    second = compile_program(to_ssa("p := q * 2; assert(p > q);"))
+    print(first.function is second.function, second.final_values({"q": 4}), first.final_values({"b": -4}))
+    print(first.function is compile_program(to_ssa("a := b * 2; assert(a > b);", 32), 32).function)
+
+    print("\nSTEP 5: Repeated runs are faster than interpreting the program...")
+    program = convert_source(open("examples/while_example.txt").read(), 5, optimize=False)
+    start = time.perf_counter()
+    for _ in range(200):
+        ConcreteEvaluator().run(program)
+    interpreted = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled = compile_program(program)
+    for _ in range(200):
+        compiled.run()
+    print(f"faster: {time.perf_counter() - start < interpreted}")
+
+    print("\nSTEP 6: Solver counterexamples are replayed before they are reported...")
+    generator = SMTGenerator()
+    generator.random_tests = 0
+    program1, program2 = to_ssa("y := x * x;"), to_ssa("y := x * 2;")
+    is_equivalent, counterexamples = generator.check_equivalence(program1, program2, ["y"])
+    print(is_equivalent, [generator.replay(program1, program2, example) for example in counterexamples])
+    print(generator.replay(program1, program2, {"x": 3, "y (prog1)": 9, "y (prog2)": 9}))
+    print(generator.replay(to_ssa("y := 1;"), to_ssa("z := y;"), {"y (prog1)": 1, "y (prog2)": 1}))
+    print(generator.replay(to_ssa("y := 4 / x;"), to_ssa("y := 2;"), {"x": 0, "y (prog1)": 4, "y (prog2)": 2}))
+    print(generator.unreplayed)
+    generator.replay = lambda *args: False  # As if the encoding disagreed with the programs
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        is_equivalent, counterexamples = generator.check_equivalence(to_ssa("y := x + 1;"), to_ssa("y := x;"), ["y"])
+    print(is_equivalent, len(counterexamples), generator.unreplayed == counterexamples, len(caught))
+
+    print("\nSTEP 7: Without NumPy, random testing runs the compiled programs...")
+    numpy = random_testing.np
+    random_testing.np = None
+    try:
+        program1 = to_ssa("if (x > 10) { y := x * 2; } else { y := x + 1; }")
+        program2 = to_ssa("if (x >= 10) { y := x + x; } else { y := x + 1; }")
+        print(RandomTester().find_differences(program1, program2, ["y"]))
+        print(RandomTester().find_differences(to_ssa("y := x * 2;"), to_ssa("y := x + x;"), ["y"]))
+    finally:
+        random_testing.np = numpy
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from concrete import ConcreteEvaluator
+from pipeline import convert_source, verify_source
+
+EXAMPLES = ["examples/verification/example1.txt", "examples/verification/example2.txt",
+            "examples/verification/example3.txt", "examples/while_example.txt"]
+
+def main():
+    print("STEP 1: Programs without inputs are decided without Z3...")
+    generator = SMTGenerator()
+    for path in EXAMPLES:
+        for depth in (3, 5):
+            record = verify_source(open(path).read(), depth, generator)
+            print(f"{path} depth {depth}: {record['result']} ({record['tier']}), stages: {sorted(record['timings'])}")
+    print(f"Short-circuited: {generator.short_circuited}")
+
+    print("\nSTEP 2: Running a program gives the solver's result and model...")
+    for path in EXAMPLES:
+        program = convert_source(open(path).read(), 5, optimize=False)
+        generator.reset()
+        generator.add_constraints(generator.generate_constraints(program))
+        print(generator.evaluate(program) == generator.solve(program, generator.solver))
+
+    print("\nSTEP 3: Programs that need the solver...")
+    for program_text in ("y := x + 1; assert(y > x);", "x := 4; y := x / (x - 4);",
+                         "i := 0; while (i < n) { i := i + 1; }"):
+        program = convert_source(program_text)
+        print(ConcreteEvaluator().run(program), generator.verify(program)[0], generator.last_tier)
+    program = convert_source("y := x; y := 3; assert(y == 3);")
+    print(program, generator.verify(program), generator.last_tier)
+
+    print("\nSTEP 4: Equivalence of programs without inputs...")
+    for pair in (1, 2, 3):
+        ssa1 = convert_source(open(f"examples/equivalence/pair{pair}_prog1.txt").read())
+        ssa2 = convert_source(open(f"examples/equivalence/pair{pair}_prog2.txt").read())
+        print(pair, generator.check_equivalence(ssa1, ssa2, ["c", "absX", "y"]), generator.last_tier)
+    print(generator.check_equivalence(convert_source("y := 1; assert(y > 1);"), convert_source("y := 1;"), ["y"]))
+    print(generator.evaluate_pair(convert_source("z := 1;"), convert_source("z := y;"), ["y"]))
+    print(f"Short-circuited: {generator.short_circuited}")
+
+    print("\nSTEP 5: Machine integers wrap around and can fail on overflow...")
+    program = SSAConverter(width=8).convert_to_ssa(parse_program("x := 100; y := x + x; assert(y < 0);"))
+    for check_overflow in (False, True):
+        generator = SMTGenerator(width=8, check_overflow=check_overflow)
+        generator.add_constraints(generator.generate_constraints(program))
+        print(generator.evaluate(program), generator.solve(program, generator.solver)[0])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+
+def to_ssa(program_text):
+    return SSAConverter().convert_to_ssa(parse_program(program_text))
+
+def main():
+    program = to_ssa("if (x > 0) { y := x * 2; } else { y := 0 - x; } z := y + 1; assert(z > 5);")
+
+    print("STEP 1: Examples differ in their inputs...")
+    generator = SMTGenerator()
+    for example in generator.get_examples(program, 3):
+        print(example)
+
+    print("\nSTEP 2: Examples whose inputs are more than 100 apart...")
+    for example in generator.get_examples(program, 3, diversity=100):
+        print(example)
+
+    print("\nSTEP 3: Reusing a solver that already holds the constraints...")
+    generator.reset()
+    generator.add_constraints(generator.generate_constraints(program))
+    assertions = len(generator.solver.assertions())
+    examples = generator.get_examples(program, 2, solver=generator.solver)
+    print(f"{len(examples)} examples, solver assertions before/after: {assertions}/{len(generator.solver.assertions())}")
+
+    print("\nSTEP 4: Counterexamples of an equivalence check...")
+    generator = SMTGenerator()
+    generator.num_counterexamples = 4
+    is_equivalent, counterexamples = generator.check_equivalence(
+        to_ssa("if (a > 10) { r := a; } else { r := 10; }"), to_ssa("r := a;"), ["r"])
+    print(f"Equivalent: {is_equivalent}")
+    for example in counterexamples:
+        print(example)
+
+    print("\nSTEP 5: A program without inputs has a single example...")
+    print(generator.get_examples(to_ssa("x := 1; y := x + 1;"), 3))
+
+if __name__ == "__main__":
+    main()
@@ -34,8 +34,8 @@ def main():
     ssa_converter.reset()
     ssa_form2 = ssa_converter.convert_to_ssa(statements2)
     
-    print(f"Program 1 SSA form: {ssa_form1}")
-    print(f"Program 2 SSA form: {ssa_form2}")
+    print(f"Program 1 SSA form:\n{ssa_form1}")
+    print(f"Program 2 SSA form:\n{ssa_form2}")
     
     print("\nSTEP 3: Checking equivalence...")
     smt_generator = SMTGenerator()
@@ -87,8 +87,8 @@ def main():
     ssa_converter.reset()
     ssa_form4 = ssa_converter.convert_to_ssa(statements4)
     
-    print(f"Program 3 SSA form: {ssa_form3}")
-    print(f"Program 4 SSA form: {ssa_form4}")
+    print(f"Program 3 SSA form:\n{ssa_form3}")
+    print(f"Program 4 SSA form:\n{ssa_form4}")
     
     smt_generator = SMTGenerator()
     is_equivalent2, counterexamples2 = smt_generator.check_equivalence(ssa_form3, ssa_form4, output_vars2)
@@ -105,6 +105,20 @@ def main():
                 print(f"Example {i}:", example)
         else:
             print("No specific counterexamples were found.")
-    
+
+    print("\nTest with a variable one program assigns and the other reads as input...")
+    ssa_converter.reset()
+    ssa_form5 = ssa_converter.convert_to_ssa(parse_program("x := 0; y := x;"))
+    ssa_converter.reset()
+    ssa_form6 = ssa_converter.convert_to_ssa(parse_program("y := x;"))
+
+    # Leave the answer to the solver
+    smt_generator = SMTGenerator()
+    smt_generator.random_tests = 0
+    is_equivalent3, counterexamples3 = smt_generator.check_equivalence(ssa_form5, ssa_form6, ["y"])
+    print(f"Are the programs equivalent? {is_equivalent3}, answered by: {smt_generator.last_tier}")
+    for i, example in enumerate(counterexamples3, 1):
+        print(f"Example {i}:", example)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
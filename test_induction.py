@@ -0,0 +1,58 @@
+from parser import parse_program
+from ssa import SSAConverter
+from induction import KInduction
+from smt import SMTGenerator
+from pipeline import prove_source
+
+def main():
+    prover = KInduction()
+
+    print("STEP 1: Invariants are checked at every unrolled loop head...")
+    print(SSAConverter().convert_to_ssa(parse_program(
+        "x := 0; while (x < n) { invariant(x <= n || n < 0); x := x + 1; }"), 2))
+
+    print("\nSTEP 2: A loop of 10000 iterations is proved without unrolling it...")
+    print(prover.check(parse_program("x := 0; while (x < 10000) { x := x + 1; } assert(x == 10000);")))
+    print(prover.history)
+
+    print("\nSTEP 3: A property that is not inductive needs an invariant...")
+    sum_loop = """
+sum := 0;
+i := 1;
+while (i <= 5) {
+    %s
+    sum := sum + i;
+    i := i + 1;
+}
+assert(sum == 15);
+"""
+    print(prover.check(parse_program(sum_loop % ""), max_k=3), prover.reason)
+    print(prover.check(parse_program(sum_loop % "invariant(2 * sum == i * (i - 1) && i <= 6);")))
+
+    print("\nSTEP 4: Later loops start from the summary of the earlier ones...")
+    print(prover.check(parse_program("""
+a := 0;
+while (a < 3) { invariant(a <= 3); a := a + 1; }
+b := a;
+for (j := 0; j < 10; j := j + 1) { invariant(j <= 10 && b == a + j); b := b + 1; }
+assert(b == 13);
+""")))
+    print(prover.history)
+
+    print("\nSTEP 5: Failures within the first iterations are real counterexamples...")
+    print(prover.check(parse_program("x := 0; while (x < 5) { invariant(x < 3); x := x + 1; }")))
+    print(prover.check(parse_program("y := 1; assert(y > x); while (y < 3) { y := y + 1; }")))
+
+    print("\nSTEP 6: Nested loops are left to bounded checking...")
+    print(prover.check(parse_program("while (x > 0) { while (y > 0) { y := y - 1; } x := x - 1; }")), prover.reason)
+
+    print("\nSTEP 7: Machine integers wrap around...")
+    doubling = "x := 1; while (x < 100) { x := x * 2; assert(x > 0); }"
+    print(prover.check(parse_program(doubling)), KInduction(SMTGenerator(width=8)).check(parse_program(doubling)))
+
+    print("\nSTEP 8: Pipeline record...")
+    record = prove_source(open("examples/while_example.txt").read())
+    print({key: value for key, value in record.items() if key != "timings"}, sorted(record["timings"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from pipeline import verify_source
+
+def optimize(program_text, unroll_depth=3, live_vars=None):
+    converter = SSAConverter()
+    program = converter.convert_to_ssa(parse_program(program_text), unroll_depth)
+    return program, converter.optimize_ssa(live_vars)
+
+def main():
+    print("STEP 1: A constant program folds down to its final values and one failing assertion...")
+    program, stats = optimize(open("examples/verification/example1.txt").read())
+    print(program)
+    print(stats)
+
+    print("\nSTEP 2: Branches with a constant condition are resolved...")
+    program, stats = optimize(open("examples/verification/example2.txt").read())
+    print(program)
+    print(stats)
+
+    print("\nSTEP 3: Copies are propagated and dead assignments removed...")
+    program, stats = optimize("t := x; u := t * 2; v := u + 1; w := 5; w := w + y; assert(v > 3);")
+    print(program)
+    print(stats)
+
+    print("\nSTEP 4: Slicing keeps only what the chosen outputs and assertions need...")
+    program, stats = optimize("a := x + 1; b := y * y; if (x > 0) { c := b; } else { c := 0; }", live_vars=["a"])
+    print(program)
+    print(stats)
+
+    print("\nSTEP 5: Optimization does not change verification or equivalence results...")
+    generator = SMTGenerator()
+    for path in ("examples/verification/example2.txt", "examples/verification/example3.txt",
+                 "examples/while_example.txt", "examples/equivalence/pair3_prog1.txt"):
+        statements = parse_program(open(path).read())
+        plain = SSAConverter().convert_to_ssa(statements, 5)
+        converter = SSAConverter()
+        optimized = converter.convert_to_ssa(statements, 5)
+        converter.optimize_ssa()
+        print(path, generator.verify(plain)[0], generator.verify(optimized)[0],
+              generator.check_equivalence(plain, optimized, plain.assigned_vars())[0])
+
+    print("\nSTEP 6: The pipeline reports the counts...")
+    record = verify_source(open("examples/verification/example3.txt").read())
+    print(record["result"], record["optimization"])
+
+if __name__ == "__main__":
+    main()
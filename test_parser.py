@@ -0,0 +1,52 @@
+import glob
+import os
+from parser import parse_program, ParseError
+
+def main():
+    # Program exercising every statement form of the grammar
+    program_text = """
+    // Comments are ignored by the lexer
+    x := -3;
+    y := (x + 2) * 4 / 2;
+    if (x < 0 && y != 0) {
+        x := -x;
+    } else if (x == 0) {
+        x := 1;
+    } else {
+        x := x - 1;
+    }
+    while (!(x >= 10)) {
+        x := x + 1;
+    }
+    for (i := 0; i < 3; i := i + 1) {
+        y := y + i;
+    }
+    assert(x == 10 || y > 0);
+    """
+
+    print("STEP 1: Parsing a program with every statement form...")
+    statements = parse_program(program_text)
+    for stmt in statements:
+        print(f"line {stmt.lineno}, col {stmt.col}: {stmt!r}")
+
+    print("\nSTEP 2: Printing expressions back to source form...")
+    print(f"y := {statements[1].expr}")
+    print(f"assert({statements[-1].condition})")
+
+    print("\nSTEP 3: Reporting syntax errors with positions...")
+    for bad_program in ["x := 1;\ny := ;", "x := 1 $ 2;", "if (x < 1) { x := 2;"]:
+        try:
+            parse_program(bad_program)
+            print(f"No error for {bad_program!r}")
+        except ParseError as e:
+            print(f"{bad_program!r}: {e}")
+
+    print("\nSTEP 4: Parsing the bundled examples...")
+    examples_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+    for path in sorted(glob.glob(os.path.join(examples_dir, "**", "*.txt"), recursive=True)):
+        with open(path) as f:
+            statements = parse_program(f.read())
+        print(f"{os.path.relpath(path, examples_dir)}: {len(statements)} statements")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import time
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from portfolio import PORTFOLIO, PortfolioTier, solve_portfolio
+
+def to_ssa(program_text):
+    return SSAConverter().convert_to_ssa(parse_program(program_text))
+
+def main():
+    print("STEP 1: Racing configurations on an SMT-LIB2 query...")
+    query = """
+    (declare-fun x () Int)
+    (declare-fun y () Int)
+    (assert (and (= (* x y) 391) (> x 1) (> y 1)))
+    """
+    result, values, config = solve_portfolio(query, PORTFOLIO[:3], timeout=10000)
+    print(f"Result: {result}, values: {dict(sorted(values.items()))}, answered by: {config}")
+
+    print("\nSTEP 2: Using the portfolio as the only tier of a generator...")
+    generator = SMTGenerator(timeout=10000,
+                             strategy=lambda timeout, rlimit: [PortfolioTier("portfolio", PORTFOLIO[:3], timeout)])
+    start = time.perf_counter()
+    result, model = generator.verify(to_ssa("p := x * y; assert(p == 391 && x > 1 && y > 1 && x < y);"))
+    print(f"Result: {result}, model: {model}, answered by: {generator.last_tier}, "
+          f"took {time.perf_counter() - start:.2f}s")
+
+    print("\nSTEP 3: Equivalence checks go through the portfolio as well...")
+    print(generator.check_equivalence(to_ssa("y := x * 2;"), to_ssa("y := x + x;"), ["y"]),
+          f"answered by: {generator.last_tier}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from session import EquivalenceBatch
+from random_testing import RandomTester
+
+def to_ssa(program_text, width=None):
+    return SSAConverter(width=width).convert_to_ssa(parse_program(program_text))
+
+def main():
+    print("STEP 1: Random inputs refute programs that differ...")
+    program1 = to_ssa("if (x > 10) { y := x * 2; } else { y := x + 1; }")
+    program2 = to_ssa("if (x >= 10) { y := x + x; } else { y := x + 1; }")
+    start = time.perf_counter()
+    counterexamples = RandomTester().find_differences(program1, program2, ["y"], limit=3)
+    print(counterexamples, f"fast: {time.perf_counter() - start < 1}")
+
+    print("\nSTEP 2: Equivalent programs survive and go to the solver...")
+    generator = SMTGenerator()
+    print(generator.check_equivalence(to_ssa("y := x * 2;"), to_ssa("y := x + x;"), ["y"]), generator.last_tier)
+    print(generator.check_equivalence(program1, program2, ["y"]), generator.last_tier)
+    print(f"Refuted: {generator.refuted}")
+
+    print("\nSTEP 3: Only runs where both programs satisfy their assertions count...")
+    assumed = to_ssa("assert(x > 0); y := x;")
+    absolute = to_ssa("if (x < 0) { y := 0 - x; } else { y := x; }")
+    print(RandomTester().find_differences(assumed, absolute, ["y"]))
+    print(generator.check_equivalence(assumed, absolute, ["y"]), generator.last_tier)
+    print(RandomTester().find_differences(to_ssa("y := 10 / x;"), to_ssa("y := 10 / x + 0 * x;"), ["y"]))
+
+    print("\nSTEP 4: Machine integers wrap around...")
+    for width in (None, 8, 64):
+        generator.set_encoding(width)
+        doubled, plain = to_ssa("y := x * 2 / 2;", width), to_ssa("y := x;", width)
+        print(width, generator.check_equivalence(doubled, plain, ["y"])[0], generator.last_tier,
+              RandomTester(width=width).find_differences(doubled, plain, ["y"])[:1])
+    generator.set_encoding(8, check_overflow=True)
+    print(generator.test_pair(doubled, plain, ["y"]))
+    generator.set_encoding(128)
+    wide1, wide2 = to_ssa("y := x + 1;", 128), to_ssa("y := x;", 128)
+    print(generator.test_pair(wide1, wide2, ["y"]), generator.check_equivalence(wide1, wide2, ["y"])[0],
+          generator.last_tier)
+
+    print("\nSTEP 5: Counterexamples are spread out like the solver's...")
+    generator = SMTGenerator()
+    generator.num_counterexamples, generator.diversity = 3, 100
+    print(generator.check_equivalence(to_ssa("y := x;"), to_ssa("y := x + 1;"), ["y"]))
+
+    print("\nSTEP 6: Batches reject candidates before calling the solver...")
+    batch = EquivalenceBatch(to_ssa("y := x * x;"), output_vars=["y"])
+    for candidate in ("y := x * x + 0;", "y := x * 2;", "y := x * x; if (x == 77) { y := 0; }"):
+        print(candidate, batch.check(to_ssa(candidate))[0], batch.generator.last_tier)
+
+    print("\nSTEP 7: Random testing can be turned off...")
+    generator.random_tests = 0
+    print(generator.check_equivalence(to_ssa("y := x;"), to_ssa("y := x + 1;"), ["y"])[0], generator.last_tier)
+
+    print("\nSTEP 8: Constants beyond 64 bits do not stop the tests...")
+    generator.random_tests = 2048
+    huge = "y := x + 100000000000000000000;"
+    print(generator.check_equivalence(to_ssa(huge), to_ssa(huge), ["y"])[0], generator.last_tier)
+    print(generator.check_equivalence(to_ssa(huge), to_ssa("y := x + 100000000000000000001;"), ["y"])[0],
+          generator.last_tier)
+    print(RandomTester(width=64).find_differences(to_ssa(huge, 64), to_ssa("y := x + 7766279631452241920;", 64), ["y"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from parser import parse_program
+from ssa import SSAConverter
+from session import IncrementalSession
+
+def to_ssa(program_text):
+    return SSAConverter().convert_to_ssa(parse_program(program_text))
+
+def main():
+    # A long straight-line program, edited near the end
+    lines = ["x0 := 1;"] + [f"x{i} := x{i - 1} + {i};" for i in range(1, 100)]
+    lines.append("assert(x99 > 0);")
+
+    print("STEP 1: Encoding the original program...")
+    session = IncrementalSession()
+    session.update(to_ssa("\n".join(lines)))
+    print(f"Reused {session.reused}, encoded {session.encoded} instructions")
+    print(f"Result: {session.check()}")
+
+    print("\nSTEP 2: Re-checking after editing line 81...")
+    lines[80] = "x80 := x79 - 100000;"
+    session.update(to_ssa("\n".join(lines)))
+    print(f"Reused {session.reused}, encoded {session.encoded} instructions")
+    print(f"Result: {session.check()}")
+
+    print("\nSTEP 3: Equivalence checks sharing the first program's encoding...")
+    program1_text = "x := 4; if (x > 3) { y := 10; } else { y := 0; }"
+    session = IncrementalSession(chunk_size=1)
+    for program2_text in ["x := 4; if (x > 4) { y := 10; } else { y := 0; }",
+                          "x := 4; if (x >= 4) { y := 10; } else { y := 0; }"]:
+        is_equivalent, counterexamples = session.check_equivalence(
+            to_ssa(program1_text), to_ssa(program2_text), ["y"])
+        print(f"{program2_text!r}: equivalent={is_equivalent}, counterexamples={counterexamples}, "
+              f"reused {session.reused} instructions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from parser import parse_program
+from ssa import SSAConverter, slice_program
+from smt import SMTGenerator
+from session import IncrementalSession, EquivalenceBatch
+from pipeline import convert_source, check_candidates
+
+PROGRAM1 = """
+total := 0;
+for (i := 0; i < n; i := i + 1) {
+    total := total + i * i;
+}
+y := x + 1;
+"""
+
+PROGRAM2 = """
+total := 0;
+i := 0;
+while (i < n) {
+    total := total + i * i * i;
+    i := i + 1;
+}
+y := 1 + x;
+"""
+
+def convert(program_text, unroll_depth=3):
+    return SSAConverter().convert_to_ssa(parse_program(program_text), unroll_depth)
+
+def main():
+    program1, program2 = convert(PROGRAM1), convert(PROGRAM2)
+
+    print("STEP 1: Slicing keeps only the cone of influence of the outputs...")
+    sliced = slice_program(program1, ["y"])
+    print(sliced)
+    print(f"{len(list(program1.instructions()))} -> {len(list(sliced.instructions()))} instructions, "
+          f"inputs read: {[sliced.base_name(value) for value in sliced.used_inputs()]}")
+
+    print("\nSTEP 2: The original program is left unchanged...")
+    print(len(list(program1.instructions())), sorted(program1.dead_values) == [])
+
+    print("\nSTEP 3: Assertions and assumptions stay in the slice...")
+    print(slice_program(convert("a := x * 2; b := a + 1; assert(a > 0); c := b;"), ["c"]))
+    print(slice_program(convert("a := x * 2; b := a + 1; assert(a > 0); c := b;"), []))
+
+    print("\nSTEP 4: Outputs outside the differing loop are equivalent...")
+    generator = SMTGenerator()
+    print(generator.check_equivalence(program1, program2, ["y"]))
+    print(generator.check_equivalence(program1, program2, ["total"]))
+
+    print("\nSTEP 5: Counterexamples only mention the inputs the outputs read...")
+    print(generator.check_equivalence(convert("y := x; z := w;"), convert("y := x + 1; z := w;"), ["y"]))
+
+    print("\nSTEP 6: Incremental session and batch slice the same way...")
+    session = IncrementalSession()
+    print(session.check_equivalence(program1, program2, ["y"]))
+    batch = EquivalenceBatch(program1, output_vars=["y"])
+    print(batch.check(program2), batch.check(program2, ["y"]))
+    try:
+        batch.check(program2, ["total"])
+    except ValueError as e:
+        print(f"ValueError: {e}")
+
+    print("\nSTEP 7: Pipeline candidates with selected outputs...")
+    for record in check_candidates(PROGRAM1, [PROGRAM2, "y := x + 2;"], ["y"]):
+        print(record["result"], record["counterexamples"][:1])
+
+    print("\nSTEP 8: Sliced and unsliced checks agree on the equivalence examples...")
+    for pair in (1, 2, 3):
+        ssa1 = convert_source(open(f"examples/equivalence/pair{pair}_prog1.txt").read())
+        ssa2 = convert_source(open(f"examples/equivalence/pair{pair}_prog2.txt").read())
+        solver = generator.encode_pair(ssa1, ssa2)
+        outputs = ["c", "absX", "y"]
+        full = generator.check_equivalence(ssa1, ssa2, outputs, solver)[0]
+        print(pair, full, generator.check_equivalence(ssa1, ssa2, outputs)[0])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from smtlib import import_query, read_info
+
+def to_ssa(program_text):
+    return SSAConverter().convert_to_ssa(parse_program(program_text))
+
+def main():
+    print("STEP 1: Exporting a verification query...")
+    generator = SMTGenerator()
+    text = generator.export_verification(to_ssa("x := 3; if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);"))
+    print(text)
+
+    print("\nSTEP 2: Replaying it in a new solver...")
+    solver = import_query(text)
+    print(f"Metadata: {read_info(text)}")
+    print(f"Result: {solver.check()}")
+
+    print("\nSTEP 3: Exporting and replaying equivalence queries (unsat means equivalent)...")
+    program1 = "x := 4; if (x > 3) { y := 10; } else { y := 0; }"
+    for program2 in ["x := 4; if (x >= 4) { y := 10; } else { y := 0; }",
+                     "x := 4; if (x > 4) { y := 10; } else { y := 0; }"]:
+        text = generator.export_equivalence(to_ssa(program1), to_ssa(program2), ["y"])
+        print(f"{program2!r}: {import_query(text).check()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import time
+
+from parser import parse_program
+from ssa import SSAConverter
+from smt import SMTGenerator
+from strategy import single_tier
+
+def to_ssa(program_text):
+    return SSAConverter().convert_to_ssa(parse_program(program_text))
+
+def main():
+    print("STEP 1: A linear program is answered by the cheap tier...")
+    generator = SMTGenerator()
+    result, _ = generator.verify(to_ssa("if (x < 5) { y := x + 1; } else { y := x - 1; } assert(y > 0);"))
+    print(f"Result: {result}, answered by: {generator.last_tier}")
+
+    print("\nSTEP 2: A hard nonlinear program escalates through every tier before giving up...")
+    hard = to_ssa("assert(x * x * x + y * y * y == z * z * z + 33 && x > 1 && y > 1 && z > 1);")
+    generator = SMTGenerator(timeout=300)
+    print(f"Tiers: {generator.tiers}")
+    start = time.perf_counter()
+    result, _ = generator.verify(hard)
+    print(f"Result: {result}, answered by: {generator.last_tier}, "
+          f"took {time.perf_counter() - start:.1f}s")
+
+    print("\nSTEP 3: A single-tier strategy with a resource limit...")
+    generator = SMTGenerator(rlimit=100000, strategy=single_tier)
+    result, _ = generator.verify(hard)
+    print(f"Result: {result}, answered by: {generator.last_tier}")
+
+    print("\nSTEP 4: An interrupted generator runs no further tier...")
+    generator = SMTGenerator()
+    generator.interrupted = True
+    start = time.perf_counter()
+    result, _ = generator.verify(hard)
+    print(f"Result: {result}, answered by: {generator.last_tier}, "
+          f"immediate: {time.perf_counter() - start < 0.5}")
+
+if __name__ == "__main__":
+    main()
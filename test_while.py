@@ -21,7 +21,7 @@ def main():
     print("\nSTEP 2: Converting to SSA form with loop unrolling...")
     ssa_converter = SSAConverter()
     ssa_form = ssa_converter.convert_to_ssa(statements, unroll_depth=4)
-    print(f"SSA form: {ssa_form}")
+    print(f"SSA form:\n{ssa_form}")
     
     print("\nSTEP 3: Generating SMT constraints...")
     smt_generator = SMTGenerator()